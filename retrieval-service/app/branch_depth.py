@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .fusion import ScoredHit, chunk_key
+
+
+@dataclass
+class RankedBranch:
+    """One fused input list with the depth it was fetched at and its RRF weight."""
+
+    name: str
+    docs: Sequence[Any]
+    depth: int
+    weight: float = 1.0
+
+    @property
+    def exhausted(self) -> bool:
+        # Fewer hits than requested: nothing deeper exists for this branch.
+        return len(self.docs) < self.depth
+
+
+def unseen_tail(branch: RankedBranch, rrf_k: float) -> float:
+    """Best RRF contribution a chunk not yet in `branch` could still get from it."""
+    if branch.exhausted:
+        return 0.0
+    return branch.weight / (rrf_k + len(branch.docs) + 1)
+
+
+def fused_top_k_is_stable(
+    branches: Sequence[RankedBranch],
+    hits: Sequence[ScoredHit],
+    top_k: int,
+    *,
+    rrf_k: float,
+    language: Optional[str] = None,
+) -> bool:
+    """
+    Threshold check on fused RRF scores: the top_k is stable when its k-th score beats
+    the best score any other chunk could reach by showing up deeper in the branches it
+    is missing from (and a chunk seen nowhere yet). `hits` must be the full fused list in
+    score order. With query rankings joined per branch this is a strong heuristic rather
+    than a proof, because joined ranks are themselves fused.
+    """
+    tails = [unseen_tail(branch, rrf_k) for branch in branches]
+    eligible = [
+        hit
+        for hit in hits
+        if not (language and (hit[1].meta or {}).get("language") not in (None, "", language))
+    ]
+    if len(eligible) < top_k:
+        return not any(tails)
+    kth_score = eligible[top_k - 1][2]
+    if sum(tails) > kth_score:
+        return False
+    members = [{chunk_key(doc) for doc in branch.docs} for branch in branches]
+    for key, _doc, score in eligible[top_k:]:
+        missing = sum(tail for tail, keys in zip(tails, members) if key not in keys)
+        if score + missing > kth_score:
+            return False
+    return True
+
+
+def rank_k_margin(docs: Sequence[Any], top_k: int) -> Optional[float]:
+    """
+    Score drop from rank `top_k` to rank `top_k + 1`, relative to the mean step between
+    ranks inside the top_k. None when the branch has no hit past `top_k`.
+    """
+    if top_k < 1 or len(docs) <= top_k:
+        return None
+    scores = [float(doc.score or 0.0) for doc in docs[: top_k + 1]]
+    gap = scores[top_k - 1] - scores[top_k]
+    if gap <= 0.0:
+        return 0.0
+    mean_step = (scores[0] - scores[top_k - 1]) / max(top_k - 1, 1)
+    return math.inf if mean_step <= 0.0 else gap / mean_step
+
+
+def top_k_has_clear_margin(branches: Sequence[RankedBranch], top_k: int, *, margin: float) -> bool:
+    """
+    Every branch either ran out of hits or drops off after rank `top_k` by at least
+    `margin` mean steps, so deeper hits are weak matches. Unlike the threshold check this
+    reads the branches' own scores, which is what lets easy queries stop after one round.
+    """
+    for branch in branches:
+        if branch.exhausted:
+            continue
+        observed = rank_k_margin(branch.docs, top_k)
+        if observed is None or observed < margin:
+            return False
+    return True
+
+
+class AdaptiveDepthPolicy:
+    """
+    Picks how deep each branch fetches for one search and how far to deepen it.
+
+    The first round fetches `top_k + 1` hits (one look-ahead rank for the margin check),
+    below the static branch depths. Language post-filters scale it by how rare the
+    language is; a language pre-filter caps it at the number of eligible chunks. Later
+    rounds multiply the depth of every branch that still has more hits, until the fused
+    top_k is stable, `max_depth` is reached or `max_rounds` run out.
+    """
+
+    def __init__(self, *, max_depth: int, max_rounds: int = 3, growth: float = 2.0) -> None:
+        self.max_depth = max(1, int(max_depth))
+        self.max_rounds = max(1, int(max_rounds))
+        self.growth = max(1.5, float(growth))
+
+    def initial_depth(
+        self,
+        top_k: int,
+        *,
+        language_share: Optional[float] = None,
+        eligible: Optional[int] = None,
+    ) -> int:
+        """
+        `language_share` is the fraction of chunks in the requested language when results
+        are post-filtered; `eligible` is the pre-filtered candidate count, if known.
+        """
+        depth = top_k + 1
+        if language_share is not None:
+            # Rare languages lose most of a post-filtered page; bounded so one search stays cheap.
+            depth = math.ceil(depth / min(1.0, max(language_share, 0.25)))
+        depth = max(1, min(self.max_depth, depth))
+        if eligible is not None:
+            depth = max(1, min(depth, eligible))
+        return depth
+
+    def next_depth(self, depth: int, *, eligible: Optional[int] = None) -> Optional[int]:
+        limit = self.max_depth if eligible is None else min(self.max_depth, eligible)
+        deeper = min(limit, math.ceil(depth * self.growth))
+        return deeper if deeper > depth else None
+
+
+def language_selectivity(
+    counts: Optional[Dict[str, int]],
+    language: Optional[str],
+) -> Tuple[Optional[int], Optional[float]]:
+    """(eligible chunk count, share of the corpus) for `language`, or Nones when unknown."""
+    if not language or not counts:
+        return None, None
+    total = sum(counts.values())
+    eligible = int(counts.get(language, 0))
+    return eligible, (eligible / total if total else None)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Sequence, Tuple, TypeVar, cast
+
+from .logger import get_logger
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Thread-safe LRU cache with per-entry TTL and hit/miss/eviction counters.
+    `maxsize <= 0` disables caching (every lookup is a miss, nothing is stored).
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        ttl_seconds: float,
+        now_fn: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = int(maxsize)
+        self.ttl_seconds = float(ttl_seconds)
+        self.now_fn = now_fn
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and (now - stored_at) > self.ttl_seconds
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self.get_entry(key)
+        return None if entry is None else entry[1]
+
+    def get_entry(self, key: Hashable) -> Optional[Tuple[float, V]]:
+        """
+        Return `(age_seconds, value)` for a live entry, refreshing its LRU position.
+        """
+        if not self.enabled:
+            return None
+        now = self.now_fn()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if self._expired(stored_at, now):
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return now - stored_at, value
+
+    def put(self, key: Hashable, value: V, *, age_seconds: float = 0.0) -> None:
+        if not self.enabled:
+            return
+        stored_at = self.now_fn() - max(0.0, age_seconds)
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def items(self) -> List[Tuple[Hashable, float, V]]:
+        """
+        Snapshot of live entries as `(key, age_seconds, value)`, oldest first.
+        """
+        now = self.now_fn()
+        with self._lock:
+            return [
+                (key, now - stored_at, value)
+                for key, (stored_at, value) in self._entries.items()
+                if not self._expired(stored_at, now)
+            ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def normalize_cache_text(text: str) -> str:
+    return " ".join(str(text or "").split())
+
+
+class QueryEmbeddingCache:
+    """
+    Caches query embeddings by (model, whitespace-normalized text), optionally persisted
+    to a JSON file so restarted workers start warm. Periodic saves run on a background
+    thread, off the request path.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        ttl_seconds: float,
+        persist_path: Optional[str] = None,
+        persist_every: int = 64,
+        now_fn: Callable[[], float] = time.monotonic,
+        logger=None,
+    ) -> None:
+        self._cache: TTLCache[List[float]] = TTLCache(
+            maxsize=maxsize,
+            ttl_seconds=ttl_seconds,
+            now_fn=now_fn,
+        )
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.persist_every = max(1, int(persist_every))
+        self.logger = logger or get_logger("retrieval-embedding-cache")
+        self._unsaved = 0
+        self._persist_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._save_thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.enabled
+
+    @staticmethod
+    def _key(model: str, text: str) -> Tuple[str, str]:
+        return model, normalize_cache_text(text)
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self._cache.get(self._key(model, text))
+
+    def put(self, model: str, text: str, embedding: Sequence[float]) -> None:
+        if not self.enabled:
+            return
+        self._cache.put(self._key(model, text), [float(value) for value in embedding])
+        if self.persist_path is None:
+            return
+        with self._persist_lock:
+            self._unsaved += 1
+            if self._unsaved < self.persist_every:
+                return
+            if self._save_thread is not None and self._save_thread.is_alive():
+                # The running save leaves these entries counted as unsaved for the next one.
+                return
+            self._unsaved = 0
+            thread = threading.Thread(target=self.save, name="embedding-cache-persist", daemon=True)
+            self._save_thread = thread
+        thread.start()
+
+    def wait_for_save(self, timeout: Optional[float] = None) -> None:
+        thread = self._save_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def get_or_compute(
+        self,
+        model: str,
+        texts: Sequence[str],
+        compute_fn: Callable[[List[str]], List[List[float]]],
+    ) -> List[List[float]]:
+        """
+        Resolve every text from cache, computing only the misses in one `compute_fn` call.
+        """
+        resolved: List[Optional[List[float]]] = [self.get(model, text) for text in texts]
+        missing = [text for text, embedding in zip(texts, resolved) if embedding is None]
+        if missing:
+            computed = iter(compute_fn(missing))
+            for idx, embedding in enumerate(resolved):
+                if embedding is None:
+                    value = [float(item) for item in next(computed)]
+                    resolved[idx] = value
+                    self.put(model, texts[idx], value)
+        return [embedding for embedding in resolved if embedding is not None]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["persist_path"] = str(self.persist_path) if self.persist_path else None
+        return stats
+
+    def save(self) -> None:
+        if self.persist_path is None or not self.enabled:
+            return
+        # One writer at a time, each snapshotting under the lock, so a slow background save
+        # can neither clobber the temp file nor overwrite a newer save from close().
+        with self._save_lock:
+            with self._persist_lock:
+                self._unsaved = 0
+            entries = []
+            for key, age, value in self._cache.items():
+                model, text = cast(Tuple[str, str], key)
+                entries.append([model, text, round(age, 3), value])
+            payload = {"saved_at": time.time(), "entries": entries}
+            try:
+                self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.persist_path.with_name(f"{self.persist_path.name}.{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+                # Atomic swap so concurrent workers never read a half-written file.
+                os.replace(tmp_path, self.persist_path)
+            except OSError as err:
+                self.logger.warning(f"[embedding-cache] persist failed ({err})")
+
+    def load(self) -> int:
+        if self.persist_path is None or not self.enabled or not self.persist_path.exists():
+            return 0
+        try:
+            payload = json.loads(self.persist_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as err:
+            self.logger.warning(f"[embedding-cache] ignoring unreadable cache file ({err})")
+            return 0
+
+        offline_s = max(0.0, time.time() - float(payload.get("saved_at", time.time())))
+        loaded = 0
+        for model, text, age, embedding in payload.get("entries", []):
+            total_age = float(age) + offline_s
+            if self._cache.ttl_seconds > 0 and total_age > self._cache.ttl_seconds:
+                continue
+            self._cache.put((str(model), str(text)), list(embedding), age_seconds=total_age)
+            loaded += 1
+        return loaded
@@ -7,17 +7,48 @@ class Settings:
         self.port = int(os.getenv("PORT", "3004"))
         self.elasticsearch_url = os.getenv("ELASTICSEARCH_URL", "http://elasticsearch:9200")
         self.elasticsearch_index = os.getenv("ELASTICSEARCH_INDEX", "tinge_knowledge_v1")
+        self.elasticsearch_connections_per_node = int(
+            os.getenv("ELASTICSEARCH_CONNECTIONS_PER_NODE", "10")
+        )
+        self.elasticsearch_request_timeout_s = float(
+            os.getenv("ELASTICSEARCH_REQUEST_TIMEOUT_S", "10")
+        )
         self.default_top_k = int(os.getenv("DEFAULT_TOP_K", "5"))
         self.max_top_k = int(os.getenv("MAX_TOP_K", "10"))
         self.default_corpus_path = os.getenv(
             "DEFAULT_CORPUS_PATH",
             "/app/data/corpus.jsonl",
         )
+        self.retrieval_backend = str(os.getenv("RETRIEVAL_BACKEND", "elasticsearch")).strip().lower()
+        self.retrieval_snapshot_path = os.getenv("RETRIEVAL_SNAPSHOT_PATH", "").strip()
+        self.retrieval_index_batch_size = int(os.getenv("RETRIEVAL_INDEX_BATCH_SIZE", "256"))
+        self.retrieval_index_alias_enabled = (
+            str(os.getenv("RETRIEVAL_INDEX_ALIAS_ENABLED", "false")).strip().lower()
+            in {"1", "true", "yes", "on"}
+        )
+        self.retrieval_bulk_writer_enabled = (
+            str(os.getenv("RETRIEVAL_BULK_WRITER_ENABLED", "true")).strip().lower()
+            not in {"0", "false", "no", "off"}
+        )
+        self.retrieval_bulk_chunk_size = int(os.getenv("RETRIEVAL_BULK_CHUNK_SIZE", "64"))
+        self.retrieval_bulk_threads = int(os.getenv("RETRIEVAL_BULK_THREADS", "4"))
+        self.retrieval_bulk_max_retries = int(os.getenv("RETRIEVAL_BULK_MAX_RETRIES", "3"))
+        self.retrieval_bulk_backoff_s = float(os.getenv("RETRIEVAL_BULK_BACKOFF_S", "0.5"))
         self.retrieval_query_join_mode = os.getenv(
             "RETRIEVAL_QUERY_JOIN_MODE",
             "reciprocal_rank_fusion",
         )
         self.retrieval_branch_top_k = int(os.getenv("RETRIEVAL_BRANCH_TOP_K", "0"))
+        self.retrieval_branch_depth_mode = (
+            str(os.getenv("RETRIEVAL_BRANCH_DEPTH_MODE", "static")).strip().lower()
+        )
+        self.retrieval_adaptive_score_margin = float(os.getenv("RETRIEVAL_ADAPTIVE_SCORE_MARGIN", "2.0"))
+        self.retrieval_adaptive_max_rounds = int(os.getenv("RETRIEVAL_ADAPTIVE_MAX_ROUNDS", "3"))
+        self.retrieval_msearch_enabled = (
+            str(os.getenv("RETRIEVAL_MSEARCH_ENABLED", "true")).strip().lower()
+            not in {"0", "false", "no", "off"}
+        )
+        self.retrieval_branch_workers = int(os.getenv("RETRIEVAL_BRANCH_WORKERS", "16"))
         self.retrieval_log_timing = (
             str(os.getenv("RETRIEVAL_LOG_TIMING", "true")).strip().lower()
             not in {"0", "false", "no", "off"}
@@ -34,7 +65,44 @@ class Settings:
             "RETRIEVAL_EMBED_MODEL",
             "sentence-transformers/all-MiniLM-L6-v2",
         )
+        self.retrieval_embed_batch_size = int(os.getenv("RETRIEVAL_EMBED_BATCH_SIZE", "32"))
+        self.retrieval_embed_workers = int(os.getenv("RETRIEVAL_EMBED_WORKERS", "0"))
+        self.retrieval_embed_cache_size = int(os.getenv("RETRIEVAL_EMBED_CACHE_SIZE", "2048"))
+        self.retrieval_embed_cache_ttl_s = float(
+            os.getenv("RETRIEVAL_EMBED_CACHE_TTL_S", "86400")
+        )
+        self.retrieval_embed_cache_path = os.getenv("RETRIEVAL_EMBED_CACHE_PATH", "").strip()
+        self.retrieval_embed_store_path = os.getenv("RETRIEVAL_EMBED_STORE_PATH", "").strip()
+        self.retrieval_embed_store_dtype = (
+            str(os.getenv("RETRIEVAL_EMBED_STORE_DTYPE", "float32")).strip().lower()
+        )
         self.retrieval_dense_top_k = int(os.getenv("RETRIEVAL_DENSE_TOP_K", "8"))
+        # Empty keeps the Elasticsearch default dense_vector index options.
+        self.retrieval_vector_index_type = (
+            str(os.getenv("RETRIEVAL_VECTOR_INDEX_TYPE", "")).strip().lower()
+        )
+        self.retrieval_vector_rescore_oversample = float(
+            os.getenv("RETRIEVAL_VECTOR_RESCORE_OVERSAMPLE", "0")
+        )
+        self.retrieval_language_prefilter = (
+            str(os.getenv("RETRIEVAL_LANGUAGE_PREFILTER", "true")).strip().lower()
+            not in {"0", "false", "no", "off"}
+        )
+        self.retrieval_rrf_k = float(os.getenv("RETRIEVAL_RRF_K", "60"))
+        self.retrieval_rrf_bm25_weight = float(os.getenv("RETRIEVAL_RRF_BM25_WEIGHT", "1.0"))
+        self.retrieval_rrf_dense_weight = float(os.getenv("RETRIEVAL_RRF_DENSE_WEIGHT", "1.0"))
+        self.retrieval_snippet_mode = (
+            str(os.getenv("RETRIEVAL_SNIPPET_MODE", "content")).strip().lower()
+        )
+        self.retrieval_hybrid_mode = (
+            str(os.getenv("RETRIEVAL_HYBRID_MODE", "client")).strip().lower()
+        )
+        self.retrieval_response_cache_size = int(
+            os.getenv("RETRIEVAL_RESPONSE_CACHE_SIZE", "512")
+        )
+        self.retrieval_response_cache_ttl_s = float(
+            os.getenv("RETRIEVAL_RESPONSE_CACHE_TTL_S", "300")
+        )
         self.retrieval_corrective_rag_enabled = (
             str(os.getenv("RETRIEVAL_CORRECTIVE_RAG_ENABLED", "false")).strip().lower()
             in {"1", "true", "yes", "on"}
@@ -48,6 +116,34 @@ class Settings:
         self.retrieval_corrective_dialogue_turns = int(
             os.getenv("RETRIEVAL_CORRECTIVE_DIALOGUE_TURNS", "3")
         )
+        self.retrieval_corrective_speculative = (
+            str(os.getenv("RETRIEVAL_CORRECTIVE_SPECULATIVE", "false")).strip().lower()
+            in {"1", "true", "yes", "on"}
+        )
+        self.retrieval_corrective_fused_grade = (
+            str(os.getenv("RETRIEVAL_CORRECTIVE_FUSED_GRADE", "true")).strip().lower()
+            not in {"0", "false", "no", "off"}
+        )
+        self.retrieval_corrective_cache_size = int(
+            os.getenv("RETRIEVAL_CORRECTIVE_CACHE_SIZE", "256")
+        )
+        self.retrieval_corrective_cache_ttl_s = float(
+            os.getenv("RETRIEVAL_CORRECTIVE_CACHE_TTL_S", "900")
+        )
+        # llm: OpenAI grader when configured (heuristic otherwise); cross_encoder: local model.
+        self.retrieval_corrective_grader = (
+            str(os.getenv("RETRIEVAL_CORRECTIVE_GRADER", "llm")).strip().lower()
+        )
+        self.retrieval_cross_encoder_model = os.getenv(
+            "RETRIEVAL_CROSS_ENCODER_MODEL",
+            "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        )
+        self.retrieval_cross_encoder_backend = (
+            str(os.getenv("RETRIEVAL_CROSS_ENCODER_BACKEND", "torch")).strip().lower()
+        )
+        self.retrieval_cross_encoder_top_n = int(
+            os.getenv("RETRIEVAL_CROSS_ENCODER_TOP_N", "5")
+        )
         self.retrieval_corrective_llm_enabled = (
             str(os.getenv("RETRIEVAL_CORRECTIVE_LLM_ENABLED", "true")).strip().lower()
             not in {"0", "false", "no", "off"}
@@ -59,6 +155,9 @@ class Settings:
         self.retrieval_corrective_llm_timeout_ms = int(
             os.getenv("RETRIEVAL_CORRECTIVE_LLM_TIMEOUT_MS", "900")
         )
+        self.retrieval_corrective_llm_pool_size = int(
+            os.getenv("RETRIEVAL_CORRECTIVE_LLM_POOL_SIZE", "4")
+        )
 
 
 settings = Settings()
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import http.client
 import json
 import os
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from time import perf_counter
-from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, TypedDict
-from urllib import error as urlerror
-from urllib import request as urlrequest
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple, TypedDict, cast
 
+from .caching import TTLCache, normalize_cache_text
+from .llm_http import HttpStatusError, PooledJsonClient, deadline_timeout
 from .logger import get_logger
 
 try:  # pragma: no cover - optional dependency at runtime
@@ -50,8 +52,16 @@ class CorrectiveRagState(TypedDict, total=False):
 
     rewritten_query_en: str
     rewrite_reason: str
+    # Rewrite proposed by a fused grade call, valid only for `for_query`.
+    proposed_rewrite: Dict[str, str]
     rewrite_history: List[str]
 
+    regrade: bool
+    speculation: Dict[str, int]
+    cache_hits: Dict[str, int]
+    # Set once a configured LLM grader/rewriter was skipped or failed and the heuristic ran instead.
+    degraded: bool
+
     final_results: List[Dict[str, Any]]
     status: str
     fallback_reason: str
@@ -137,6 +147,18 @@ def heuristic_rewrite_query(*, query_en: str, dialogue_context: Sequence[str]) -
     }
 
 
+def _top_results_payload(retrieval_results: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": str(item.get("title", "")),
+            "url": str(item.get("url", "")),
+            "score": float(item.get("score", 0.0) or 0.0),
+            "snippet": str(item.get("snippet", ""))[:280],
+        }
+        for item in retrieval_results[:3]
+    ]
+
+
 class OpenAICorrectiveClient:
     def __init__(
         self,
@@ -147,6 +169,7 @@ class OpenAICorrectiveClient:
         logger=None,
         endpoint: str = _DEFAULT_OPENAI_URL,
         now_fn: Callable[[], float] = perf_counter,
+        pool_size: int = 4,
     ) -> None:
         self.api_key = api_key
         self.model = model
@@ -154,15 +177,18 @@ class OpenAICorrectiveClient:
         self.endpoint = endpoint
         self.logger = logger or get_logger("retrieval-corrective-llm")
         self.now_fn = now_fn
+        # Keep-alive connections shared by every grade/rewrite call of the worker.
+        self.http = PooledJsonClient(
+            endpoint,
+            headers={"Authorization": f"Bearer {api_key}"},
+            max_idle=pool_size,
+        )
+
+    def close(self) -> None:
+        self.http.close()
 
     def _remaining_timeout_seconds(self, deadline_monotonic: float) -> float:
-        remaining = deadline_monotonic - self.now_fn()
-        if remaining <= 0:
-            raise TimeoutError("Corrective RAG time budget exhausted")
-        capped = min(self.timeout_ms / 1000.0, max(0.15, remaining - 0.05))
-        if capped <= 0:
-            raise TimeoutError("No remaining timeout budget for LLM call")
-        return capped
+        return deadline_timeout(deadline_monotonic, cap_s=self.timeout_ms / 1000.0, now_fn=self.now_fn)
 
     def _invoke_json(self, messages: List[Dict[str, str]], deadline_monotonic: float) -> Dict[str, Any]:
         timeout_seconds = self._remaining_timeout_seconds(deadline_monotonic)
@@ -172,26 +198,15 @@ class OpenAICorrectiveClient:
             "response_format": {"type": "json_object"},
             "messages": messages,
         }
-        data = json.dumps(payload).encode("utf-8")
-        req = urlrequest.Request(
-            self.endpoint,
-            data=data,
-            method="POST",
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            },
-        )
         try:
-            with urlrequest.urlopen(req, timeout=timeout_seconds) as response:
-                body = response.read().decode("utf-8")
-        except urlerror.HTTPError as err:
-            detail = err.read().decode("utf-8", errors="ignore")
-            raise RuntimeError(f"OpenAI HTTP {err.code}: {detail}") from err
-        except urlerror.URLError as err:
+            decoded = self.http.post_json(payload, timeout_s=timeout_seconds)
+        except HttpStatusError as err:
+            raise RuntimeError(f"OpenAI HTTP {err.status}: {err.detail}") from err
+        except TimeoutError:
+            raise
+        except (OSError, http.client.HTTPException) as err:
             raise RuntimeError(f"OpenAI network error: {err}") from err
 
-        decoded = json.loads(body)
         content = decoded.get("choices", [{}])[0].get("message", {}).get("content", "")
         if not isinstance(content, str) or not content.strip():
             raise RuntimeError("OpenAI response missing JSON content")
@@ -206,17 +221,6 @@ class OpenAICorrectiveClient:
         retrieval_results: Sequence[Dict[str, Any]],
         deadline_monotonic: float,
     ) -> Dict[str, Any]:
-        snippets = []
-        for item in retrieval_results[:3]:
-            snippets.append(
-                {
-                    "title": str(item.get("title", "")),
-                    "url": str(item.get("url", "")),
-                    "score": float(item.get("score", 0.0) or 0.0),
-                    "snippet": str(item.get("snippet", ""))[:280],
-                }
-            )
-
         content = self._invoke_json(
             [
                 {
@@ -235,14 +239,16 @@ class OpenAICorrectiveClient:
                             "query_original": query_original,
                             "query_en": query_en,
                             "dialogue_context": list(dialogue_context),
-                            "top_results": snippets,
+                            "top_results": _top_results_payload(retrieval_results),
                         }
                     ),
                 },
             ],
             deadline_monotonic=deadline_monotonic,
         )
+        return self._parse_grade(content)
 
+    def _parse_grade(self, content: Dict[str, Any]) -> Dict[str, Any]:
         label = str(content.get("label", "")).strip().lower()
         if label not in _VALID_RELEVANCE_LABELS:
             label = "low"
@@ -255,6 +261,56 @@ class OpenAICorrectiveClient:
             "model": self.model,
         }
 
+    def grade_and_rewrite(
+        self,
+        *,
+        query_original: str,
+        query_en: str,
+        dialogue_context: Sequence[str],
+        retrieval_results: Sequence[Dict[str, Any]],
+        deadline_monotonic: float,
+    ) -> Dict[str, Any]:
+        """
+        `grade_relevance` and `rewrite_query` in one request. Returns the grade plus a
+        `rewrite` dict (`query_en`, `reason`) when the label is low or none.
+        """
+        content = self._invoke_json(
+            [
+                {
+                    "role": "system",
+                    "content": (
+                        "You grade retrieval relevance for citation quality and repair weak queries. "
+                        "Return JSON with keys: label, score, reason, query_en, rewrite_reason. "
+                        "label must be one of high, medium, low, none. "
+                        "score must be a number between 0 and 1. "
+                        "When label is low or none, query_en is a rewrite of the English retrieval query "
+                        "that improves citation relevance: short, specific, and retrieval-friendly. "
+                        "Otherwise query_en is an empty string."
+                    ),
+                },
+                {
+                    "role": "user",
+                    "content": json.dumps(
+                        {
+                            "query_original": query_original,
+                            "query_en": query_en,
+                            "dialogue_context": list(dialogue_context),
+                            "top_results": _top_results_payload(retrieval_results),
+                        }
+                    ),
+                },
+            ],
+            deadline_monotonic=deadline_monotonic,
+        )
+        grade = self._parse_grade(content)
+        rewritten = str(content.get("query_en", "")).strip()
+        if grade["label"] in {"low", "none"} and rewritten:
+            grade["rewrite"] = {
+                "query_en": rewritten,
+                "reason": str(content.get("rewrite_reason", "LLM rewrite."))[:320],
+            }
+        return grade
+
     def rewrite_query(
         self,
         *,
@@ -312,6 +368,11 @@ class CorrectiveRagWorkflow:
         now_fn: Callable[[], float] = perf_counter,
         logger=None,
         use_langgraph: bool = True,
+        speculative: bool = False,
+        executor: Optional[Executor] = None,
+        fused_grade: bool = True,
+        grade_cache: Optional[TTLCache[Dict[str, Any]]] = None,
+        rewrite_cache: Optional[TTLCache[Dict[str, str]]] = None,
     ) -> None:
         self.retrieve_fn = retrieve_fn
         self.llm_client = llm_client
@@ -322,6 +383,17 @@ class CorrectiveRagWorkflow:
         self.dialogue_turns = max(1, int(dialogue_turns))
         self.now_fn = now_fn
         self.logger = logger or get_logger("retrieval-corrective-rag")
+        # Speculative mode rewrites + re-retrieves while the grade is still in flight.
+        self.speculative = bool(speculative)
+        self._executor = executor
+        self._owns_executor = executor is None
+        # One LLM call grades and proposes the rewrite. Speculation already has a rewrite
+        # in flight while grading, so it keeps the plain grade call.
+        self.fused_grade = bool(fused_grade) and not self.speculative
+        # Grades keyed by query + result fingerprint, rewrites by query + dialogue context.
+        # Only grader/rewriter outputs are cached, never heuristic fallbacks.
+        self.grade_cache = grade_cache
+        self.rewrite_cache = rewrite_cache
         self.graph = self._build_graph() if use_langgraph else None
 
     def _build_graph(self):  # pragma: no cover - depends on optional dependency
@@ -329,6 +401,19 @@ class CorrectiveRagWorkflow:
             return None
         try:
             graph = StateGraph(dict)
+            if self.speculative:
+                graph.add_node("retrieve", self._node_retrieve)
+                graph.add_node("grade", self._node_grade_speculative)
+                graph.add_node("finalize", self._node_finalize)
+                graph.set_entry_point("retrieve")
+                graph.add_edge("retrieve", "grade")
+                graph.add_conditional_edges(
+                    "grade",
+                    self._route_after_speculative_grade,
+                    {"grade": "grade", "finalize": "finalize"},
+                )
+                graph.set_finish_point("finalize")
+                return graph.compile()
             graph.add_node("retrieve", self._node_retrieve)
             graph.add_node("grade", self._node_grade)
             graph.add_node("rewrite", self._node_rewrite)
@@ -389,27 +474,74 @@ class CorrectiveRagWorkflow:
             updates["first_pass_results"] = results
         return updates
 
+    @staticmethod
+    def _context_key(state: CorrectiveRagState) -> Tuple[str, ...]:
+        return tuple(normalize_cache_text(turn).lower() for turn in state.get("dialogue_context", []))
+
+    def _grade_cache_key(self, state: CorrectiveRagState) -> Tuple[Any, ...]:
+        fingerprint = tuple(
+            str(item.get("chunk_id") or item.get("doc_id") or "") for item in state.get("retrieval_results", [])
+        )
+        return (
+            normalize_cache_text(state["query_original"]).lower(),
+            normalize_cache_text(state.get("current_query_en", state.get("query_en", ""))).lower(),
+            self._context_key(state),
+            fingerprint,
+            self.fused_grade,
+        )
+
+    def _rewrite_cache_key(self, state: CorrectiveRagState) -> Tuple[Any, ...]:
+        return (
+            normalize_cache_text(state["query_original"]).lower(),
+            normalize_cache_text(state.get("current_query_en", state.get("query_en", ""))).lower(),
+            self._context_key(state),
+        )
+
+    def _cached_grade(self, state: CorrectiveRagState) -> Optional[Dict[str, Any]]:
+        if self.grade_cache is None:
+            return None
+        return self.grade_cache.get(self._grade_cache_key(state))
+
+    @staticmethod
+    def _count_hit(state: CorrectiveRagState, name: str) -> Dict[str, int]:
+        hits = dict(state.get("cache_hits", {}))
+        hits[name] = hits.get(name, 0) + 1
+        return hits
+
     def _node_grade(self, state: CorrectiveRagState) -> Dict[str, Any]:
         started = self.now_fn()
         grade: Dict[str, Any]
-        if self.grade_fn is not None:
+        cacheable = False
+        degraded = False
+        cache_hits = dict(state.get("cache_hits", {}))
+        cached = self._cached_grade(state)
+        if cached is not None:
+            grade = cached
+            cache_hits = self._count_hit(state, "grade")
+        elif self.grade_fn is not None:
             grade = self.grade_fn(
                 query_original=state["query_original"],
                 query_en=state.get("current_query_en", state.get("query_en", "")),
                 dialogue_context=state.get("dialogue_context", []),
                 retrieval_results=state.get("retrieval_results", []),
             )
+            cacheable = True
         elif self.llm_client is not None and self._remaining_budget_ms(state) > 200:
+            grade_call = self.llm_client.grade_relevance
+            if self.fused_grade and hasattr(self.llm_client, "grade_and_rewrite"):
+                grade_call = self.llm_client.grade_and_rewrite
             try:
-                grade = self.llm_client.grade_relevance(
+                grade = grade_call(
                     query_original=state["query_original"],
                     query_en=state.get("current_query_en", state.get("query_en", "")),
                     dialogue_context=state.get("dialogue_context", []),
                     retrieval_results=state.get("retrieval_results", []),
                     deadline_monotonic=float(state["deadline_monotonic"]),
                 )
+                cacheable = True
             except Exception as err:
                 self.logger.warning(f"[corrective-rag] LLM grade failed, using heuristic ({err})")
+                degraded = True
                 grade = heuristic_grade_relevance(
                     query_original=state["query_original"],
                     query_en=state.get("current_query_en", state.get("query_en", "")),
@@ -424,6 +556,9 @@ class CorrectiveRagWorkflow:
                 retrieval_results=state.get("retrieval_results", []),
             )
 
+        if cacheable and self.grade_cache is not None:
+            self.grade_cache.put(self._grade_cache_key(state), dict(grade))
+
         label = str(grade.get("label", "low")).strip().lower()
         if label not in _VALID_RELEVANCE_LABELS:
             label = "low"
@@ -434,7 +569,19 @@ class CorrectiveRagWorkflow:
 
         history = list(state.get("relevance_history", []))
         history.append(label)
-        return {
+        reranked = self._apply_rerank(state, grade.get("rerank_order"))
+        proposed: Dict[str, str] = {}
+        rewrite = grade.get("rewrite")
+        if isinstance(rewrite, dict) and str(rewrite.get("query_en", "")).strip():
+            proposed = {
+                "for_query": str(state.get("current_query_en", state.get("query_en", ""))),
+                "query_en": str(rewrite["query_en"]).strip(),
+                "reason": str(rewrite.get("reason", "LLM rewrite.")),
+            }
+        updates: Dict[str, Any] = {
+            **reranked,
+            "cache_hits": cache_hits,
+            "proposed_rewrite": proposed,
             "relevance_label": label,
             "relevance_score": score,
             "relevance_reason": reason,
@@ -445,6 +592,21 @@ class CorrectiveRagWorkflow:
                 "grade_total": state.get("timings_ms", {}).get("grade_total", 0.0) + elapsed_ms,
             },
         }
+        if degraded:
+            updates["degraded"] = True
+        return updates
+
+    @staticmethod
+    def _apply_rerank(state: CorrectiveRagState, order: Any) -> Dict[str, Any]:
+        """Reorder the graded results by a grader's `rerank_order` permutation, if any."""
+        results = list(state.get("retrieval_results", []))
+        if not isinstance(order, list) or sorted(order) != list(range(len(results))):
+            return {}
+        reranked = [results[idx] for idx in order]
+        updates: Dict[str, Any] = {"retrieval_results": reranked}
+        if int(state.get("attempt", 0)) == 0:
+            updates["first_pass_results"] = reranked
+        return updates
 
     def _route_after_grade(self, state: CorrectiveRagState) -> str:
         label = str(state.get("relevance_label", "none"))
@@ -459,14 +621,26 @@ class CorrectiveRagWorkflow:
         started = self.now_fn()
         current_query = str(state.get("current_query_en", state.get("query_en", ""))).strip()
         rewritten: Dict[str, str]
-
-        if self.rewrite_fn is not None:
+        cacheable = False
+        degraded = False
+        cache_hits = dict(state.get("cache_hits", {}))
+        proposed = state.get("proposed_rewrite") or {}
+        cached = self.rewrite_cache.get(self._rewrite_cache_key(state)) if self.rewrite_cache is not None else None
+
+        if proposed and proposed.get("for_query") == current_query:
+            rewritten = {"query_en": proposed["query_en"], "reason": proposed.get("reason", "")}
+            cacheable = True
+        elif cached is not None:
+            rewritten = cached
+            cache_hits = self._count_hit(state, "rewrite")
+        elif self.rewrite_fn is not None:
             rewritten = self.rewrite_fn(
                 query_original=state["query_original"],
                 query_en=current_query,
                 dialogue_context=state.get("dialogue_context", []),
                 retrieval_results=state.get("retrieval_results", []),
             )
+            cacheable = True
         elif self.llm_client is not None and self._remaining_budget_ms(state) > 200:
             try:
                 rewritten = self.llm_client.rewrite_query(
@@ -476,8 +650,10 @@ class CorrectiveRagWorkflow:
                     retrieval_results=state.get("retrieval_results", []),
                     deadline_monotonic=float(state["deadline_monotonic"]),
                 )
+                cacheable = True
             except Exception as err:
                 self.logger.warning(f"[corrective-rag] LLM rewrite failed, using heuristic ({err})")
+                degraded = True
                 rewritten = heuristic_rewrite_query(
                     query_en=current_query,
                     dialogue_context=state.get("dialogue_context", []),
@@ -490,13 +666,20 @@ class CorrectiveRagWorkflow:
 
         rewritten_query = str(rewritten.get("query_en", "")).strip() or current_query
         rewrite_reason = str(rewritten.get("reason", "Rewrite attempt."))[:320]
+        if cacheable and self.rewrite_cache is not None:
+            self.rewrite_cache.put(
+                self._rewrite_cache_key(state),
+                {"query_en": rewritten_query, "reason": rewrite_reason},
+            )
         elapsed_ms = (self.now_fn() - started) * 1000.0
 
         rewrite_history = list(state.get("rewrite_history", []))
         rewrite_history.append(rewritten_query)
-        return {
+        updates: Dict[str, Any] = {
+            "cache_hits": cache_hits,
             "current_query_en": rewritten_query,
             "rewritten_query_en": rewritten_query,
+            "proposed_rewrite": {},
             "rewrite_reason": rewrite_reason,
             "attempt": int(state.get("attempt", 0)) + 1,
             "rewrite_history": rewrite_history,
@@ -505,6 +688,84 @@ class CorrectiveRagWorkflow:
                 "rewrite_total": state.get("timings_ms", {}).get("rewrite_total", 0.0) + elapsed_ms,
             },
         }
+        if degraded:
+            updates["degraded"] = True
+        return updates
+
+    def _speculation_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="corrective-speculative")
+        return self._executor
+
+    def close(self) -> None:
+        """
+        Shut down the speculation pool this workflow created (running branches finish)
+        and the LLM client's keep-alive connections.
+        """
+        executor, self._executor = self._executor, None
+        if executor is not None and self._owns_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        close_client = getattr(self.llm_client, "close", None)
+        if callable(close_client):
+            close_client()
+
+    def _speculate(self, state: CorrectiveRagState) -> Dict[str, Any]:
+        # Same rewrite + retrieve the serial loop would run after a low grade; neither
+        # depends on the grade. Timings and cache hits start empty so they can be added
+        # on adoption.
+        base = cast(CorrectiveRagState, {**state, "timings_ms": {}, "cache_hits": {}})
+        updates = self._node_rewrite(base)
+        updates.update(self._node_retrieve(cast(CorrectiveRagState, {**base, **updates})))
+        return updates
+
+    def _node_grade_speculative(self, state: CorrectiveRagState) -> Dict[str, Any]:
+        """
+        Grade while the rewrite and the retrieval for the rewritten query already run on
+        the speculation pool. A low grade adopts the speculative branch (and routes back
+        to grading); a high/medium grade, or no attempts/budget left, discards it.
+        """
+        counts = dict(state.get("speculation", {"launched": 0, "used": 0, "discarded": 0}))
+        future: Optional[Future] = None
+        attempts = int(state.get("attempt", 0))
+        can_rewrite = (
+            attempts < int(state.get("max_attempts", self.max_attempts)) and self._remaining_budget_ms(state) > 200
+        )
+        # A cached grade returns at once, so there is nothing to overlap with.
+        if can_rewrite and self._cached_grade(state) is None:
+            future = self._speculation_executor().submit(self._speculate, state.copy())
+            counts["launched"] += 1
+
+        updates = self._node_grade(state)
+        graded = cast(CorrectiveRagState, {**state, **updates})
+        if self._route_after_grade(graded) != "rewrite":
+            if future is not None:
+                # Still-running branches finish in the background; their results are dropped.
+                future.cancel()
+                counts["discarded"] += 1
+            return {**updates, "regrade": False, "speculation": counts}
+
+        if future is None:
+            speculative = self._speculate(graded)
+        else:
+            speculative = future.result()
+            counts["used"] += 1
+        timings = dict(graded.get("timings_ms", {}))
+        for name, elapsed_ms in speculative.pop("timings_ms", {}).items():
+            timings[name] = timings.get(name, 0.0) + elapsed_ms
+        cache_hits = dict(graded.get("cache_hits", {}))
+        for name, hits in speculative.pop("cache_hits", {}).items():
+            cache_hits[name] = cache_hits.get(name, 0) + hits
+        return {
+            **updates,
+            **speculative,
+            "timings_ms": timings,
+            "cache_hits": cache_hits,
+            "regrade": True,
+            "speculation": counts,
+        }
+
+    def _route_after_speculative_grade(self, state: CorrectiveRagState) -> str:
+        return "grade" if state.get("regrade") else "finalize"
 
     def _node_finalize(self, state: CorrectiveRagState) -> Dict[str, Any]:
         label = str(state.get("relevance_label", "none"))
@@ -534,10 +795,17 @@ class CorrectiveRagWorkflow:
             "relevance_model": str(state.get("relevance_model", "heuristic")),
             "relevance_history": list(state.get("relevance_history", [])),
             "rewrite_history": list(state.get("rewrite_history", [])),
+            "status": status,
+            "degraded": bool(state.get("degraded", False)),
             "fallback_reason": fallback_reason or None,
             "timings_ms": dict(state.get("timings_ms", {})),
             "budget_remaining_ms": self._remaining_budget_ms(state),
         }
+        meta["fused_grade"] = self.fused_grade
+        hits = state.get("cache_hits", {})
+        meta["cache"] = {"grade_hits": int(hits.get("grade", 0)), "rewrite_hits": int(hits.get("rewrite", 0))}
+        if self.speculative:
+            meta["speculation"] = dict(state.get("speculation", {"launched": 0, "used": 0, "discarded": 0}))
         return {
             "final_results": final_results,
             "status": status,
@@ -545,16 +813,24 @@ class CorrectiveRagWorkflow:
             "meta_corrective_rag": meta,
         }
 
-    def _run_manual(self, state: CorrectiveRagState) -> CorrectiveRagState:
-        state = dict(state)
-        state.update(self._node_retrieve(state))
+    def _run_manual(self, initial: CorrectiveRagState) -> CorrectiveRagState:
+        # Nodes return plain dict updates; `state` is a typed view of the same dict.
+        updates: Dict[str, Any] = dict(initial)
+        state = cast(CorrectiveRagState, updates)
+        updates.update(self._node_retrieve(state))
+        if self.speculative:
+            while True:
+                updates.update(self._node_grade_speculative(state))
+                if self._route_after_speculative_grade(state) != "grade":
+                    updates.update(self._node_finalize(state))
+                    return state
         while True:
-            state.update(self._node_grade(state))
+            updates.update(self._node_grade(state))
             if self._route_after_grade(state) != "rewrite":
-                state.update(self._node_finalize(state))
+                updates.update(self._node_finalize(state))
                 return state
-            state.update(self._node_rewrite(state))
-            state.update(self._node_retrieve(state))
+            updates.update(self._node_rewrite(state))
+            updates.update(self._node_retrieve(state))
 
     def run(
         self,
@@ -615,6 +891,7 @@ def build_corrective_llm_client_from_env(
     model: str,
     timeout_ms: int,
     logger=None,
+    pool_size: int = 4,
 ) -> Optional[OpenAICorrectiveClient]:
     api_key = str(os.getenv("OPENAI_API_KEY", "")).strip()
     if not api_key:
@@ -624,4 +901,5 @@ def build_corrective_llm_client_from_env(
         model=model,
         timeout_ms=timeout_ms,
         logger=logger,
+        pool_size=pool_size,
     )
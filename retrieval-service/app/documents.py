@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Top-level `_source` keys that are Document fields rather than flattened meta.
+DOCUMENT_FIELDS = {"id", "content", "embedding", "sparse_embedding", "blob", "dataframe", "score"}
+
+
+@dataclass
+class RetrievedDocument:
+    """
+    Lightweight search hit with the same `content` / `meta` / `score` / `id` surface as a
+    Haystack `Document`, so joiners and result assembly work on either.
+    """
+
+    id: str
+    content: Optional[str]
+    meta: Dict[str, Any] = field(default_factory=dict)
+    score: Optional[float] = None
+    embedding: Optional[List[float]] = None
+
+
+@dataclass
+class BranchQuery:
+    """
+    One ranked sub-query of a search: a `bm25` text query or a `dense` kNN query,
+    optionally restricted to chunks of one `language`. A non-zero `offset` asks only
+    for ranks `offset..top_k` (the tail beyond an earlier, shallower fetch).
+    """
+
+    branch: str
+    query: str
+    top_k: int
+    embedding: Optional[List[float]] = None
+    language: Optional[str] = None
+    offset: int = 0
+
+
+def document_from_source(
+    doc_id: str,
+    source: Dict[str, Any],
+    score: Optional[float],
+) -> RetrievedDocument:
+    meta = {key: value for key, value in source.items() if key not in DOCUMENT_FIELDS}
+    return RetrievedDocument(
+        id=str(source.get("id") or doc_id),
+        content=source.get("content"),
+        meta=meta,
+        score=score,
+        embedding=source.get("embedding"),
+    )
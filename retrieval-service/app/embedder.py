@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Sequence
+
+
+class SharedSentenceEmbedder:
+    """
+    One warm SentenceTransformer per worker, shared by query and document embedding.
+
+    Replaces separate Haystack text/document embedder components so the model weights
+    are resident once, and lets all query strings of a search encode in one forward pass.
+    Output matches the Haystack embedders' defaults (no normalization, no prefixes).
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        batch_size: int = 32,
+        device: Optional[str] = None,
+        backend: Optional[Any] = None,
+    ) -> None:
+        self.model_name = model
+        self.batch_size = max(1, int(batch_size))
+        if backend is None:
+            from sentence_transformers import SentenceTransformer
+
+            backend = SentenceTransformer(model, device=device)
+        self._model = backend
+
+    def _encode(self, texts: Sequence[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors = self._model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=False,
+        )
+        return [[float(value) for value in vector] for vector in vectors]
+
+    def embed_queries(self, texts: Sequence[str]) -> List[List[float]]:
+        return self._encode(texts)
+
+    def embed_documents(self, docs: List[Any]) -> List[Any]:
+        embeddings = self._encode([doc.content or "" for doc in docs])
+        for doc, embedding in zip(docs, embeddings):
+            doc.embedding = embedding
+        return docs
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .embedder import SharedSentenceEmbedder
+
+# One model per worker process, loaded by the pool initializer.
+_worker_embedder: Optional[SharedSentenceEmbedder] = None
+
+
+def _init_worker(model: str, batch_size: int, torch_threads: int) -> None:
+    global _worker_embedder
+    try:
+        import torch
+
+        # Workers split the cores between them instead of each grabbing all of them.
+        torch.set_num_threads(max(1, torch_threads))
+    except Exception:
+        pass
+    _worker_embedder = SharedSentenceEmbedder(model=model, batch_size=batch_size, device="cpu")
+
+
+def _encode_shard(texts: Sequence[str]) -> Tuple[int, List[List[float]], float]:
+    if _worker_embedder is None:
+        raise RuntimeError("Embedding worker was not initialized")
+    started = perf_counter()
+    vectors = _worker_embedder.embed_queries(texts)
+    return os.getpid(), vectors, perf_counter() - started
+
+
+class ProcessPoolDocumentEmbedder:
+    """
+    Shards document batches across worker processes that each hold one loaded model.
+    Results come back in submission order, so `embed_documents` is a drop-in for
+    `SharedSentenceEmbedder.embed_documents`.
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        workers: int,
+        batch_size: int = 32,
+        shard_size: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        encode_fn: Callable[[Sequence[str]], Tuple[int, List[List[float]], float]] = _encode_shard,
+    ) -> None:
+        self.workers = max(1, int(workers))
+        self.shard_size = max(1, int(shard_size or batch_size))
+        if executor is None:
+            torch_threads = max(1, (os.cpu_count() or self.workers) // self.workers)
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # Spawned workers avoid inheriting torch/tokenizer thread state from the server.
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model, batch_size, torch_threads),
+            )
+        self._executor = executor
+        self._encode = encode_fn
+        self._lock = threading.Lock()
+        self._per_worker: Dict[int, Dict[str, float]] = {}
+
+    def embed_documents(self, docs: List[Any]) -> List[Any]:
+        texts = [doc.content or "" for doc in docs]
+        shards = [texts[start : start + self.shard_size] for start in range(0, len(texts), self.shard_size)]
+        offset = 0
+        for worker_id, vectors, seconds in self._executor.map(self._encode, shards):
+            for doc, vector in zip(docs[offset : offset + len(vectors)], vectors):
+                doc.embedding = vector
+            offset += len(vectors)
+            with self._lock:
+                entry = self._per_worker.setdefault(worker_id, {"texts": 0, "seconds": 0.0})
+                entry["texts"] += len(vectors)
+                entry["seconds"] += seconds
+        return docs
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._per_worker.clear()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "worker": worker_id,
+                    "texts": int(entry["texts"]),
+                    "seconds": round(entry["seconds"], 3),
+                    "texts_per_second": round(entry["texts"] / entry["seconds"], 1) if entry["seconds"] > 0 else 0.0,
+                }
+                for worker_id, entry in sorted(self._per_worker.items())
+            ]
+
+    def close(self, *, wait: bool = False) -> None:
+        """`wait=True` returns only after the worker processes (and their models) are gone."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .logger import get_logger
+
+_DTYPES = {"float32", "float16"}
+
+
+def embedding_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class PersistentEmbeddingStore:
+    """
+    Append-only on-disk store of document embeddings keyed by sha256(model, chunk text).
+
+    Vectors live in one raw row-major matrix read through `numpy.memmap`; a JSON index
+    maps key -> row. Each model gets its own subdirectory, so a model switch never
+    returns vectors of the wrong space or dimension.
+    """
+
+    def __init__(self, *, path: str, model: str, dtype: str = "float32", logger=None) -> None:
+        import numpy as np
+
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported embedding store dtype: {dtype}")
+        self._np = np
+        self.model = model
+        self.dtype = dtype
+        self.directory = Path(path) / re.sub(r"[^A-Za-z0-9._-]+", "_", model)
+        self.logger = logger or get_logger("retrieval-embedding-store")
+        self._matrix_path = self.directory / f"vectors.{dtype}"
+        self._index_path = self.directory / "index.json"
+        self._rows: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._view = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not self._index_path.exists() or not self._matrix_path.exists():
+            return
+        try:
+            payload = json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as err:
+            self.logger.warning(f"[embedding-store] ignoring unreadable index ({err})")
+            return
+        if payload.get("dtype") != self.dtype:
+            self.logger.warning("[embedding-store] dtype changed; starting a fresh store")
+            return
+        dim = int(payload.get("dim") or 0)
+        rows = {str(key): int(row) for key, row in payload.get("rows", {}).items()}
+        itemsize = self._np.dtype(self.dtype).itemsize
+        stored_rows = self._matrix_path.stat().st_size // (dim * itemsize) if dim else 0
+        # Rows appended after the last index flush are unreachable; truncate them away.
+        self._rows = {key: row for key, row in rows.items() if row < stored_rows}
+        self._dim = dim or None
+        if len(self._rows) != stored_rows:
+            self._truncate(len(self._rows))
+
+    def _truncate(self, rows: int) -> None:
+        if self._dim is None:
+            return
+        with self._matrix_path.open("r+b") as handle:
+            handle.truncate(rows * self._dim * self._np.dtype(self.dtype).itemsize)
+
+    def _matrix(self):
+        if self._view is None and self._rows and self._dim:
+            self._view = self._np.memmap(
+                self._matrix_path,
+                dtype=self.dtype,
+                mode="r",
+                shape=(len(self._rows), self._dim),
+            )
+        return self._view
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        with self._lock:
+            rows = [self._rows.get(embedding_key(self.model, text)) for text in texts]
+            matrix = self._matrix()
+            found = [
+                None if row is None or matrix is None else [float(value) for value in matrix[row]]
+                for row in rows
+            ]
+            hits = sum(1 for vector in found if vector is not None)
+            self.hits += hits
+            self.misses += len(found) - hits
+            return found
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> int:
+        with self._lock:
+            pending: Dict[str, Sequence[float]] = {}
+            for text, vector in zip(texts, vectors):
+                key = embedding_key(self.model, text)
+                if key not in self._rows:
+                    pending[key] = vector
+            if not pending:
+                return 0
+            block = self._np.asarray(list(pending.values()), dtype=self.dtype)
+            if self._dim is None:
+                self._dim = int(block.shape[1])
+            elif block.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {block.shape[1]} does not match store dimension {self._dim}")
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self._matrix_path.open("ab") as handle:
+                handle.write(block.tobytes(order="C"))
+            start = len(self._rows)
+            for offset, key in enumerate(pending):
+                self._rows[key] = start + offset
+            self._view = None
+            self._dirty = True
+            return len(pending)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"model": self.model, "dtype": self.dtype, "dim": self._dim, "rows": self._rows}
+            try:
+                tmp_path = self._index_path.with_name(f"{self._index_path.name}.{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+                os.replace(tmp_path, self._index_path)
+                self._dirty = False
+            except OSError as err:
+                self.logger.warning(f"[embedding-store] index flush failed ({err})")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": str(self.directory),
+                "dtype": self.dtype,
+                "rows": len(self._rows),
+                "dim": self._dim,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def embed_with_store(
+    store: Optional[PersistentEmbeddingStore],
+    docs: List[Any],
+    embed_fn,
+) -> List[Any]:
+    """
+    Fill `doc.embedding` from the store, running `embed_fn` only on the misses and
+    appending their vectors for the next run.
+    """
+    if store is None:
+        return embed_fn(docs)
+    cached = store.get_many([doc.content or "" for doc in docs])
+    missing = [doc for doc, vector in zip(docs, cached) if vector is None]
+    for doc, vector in zip(docs, cached):
+        if vector is not None:
+            doc.embedding = vector
+    if missing:
+        embedded = [doc for doc in embed_fn(missing) if doc.embedding is not None]
+        store.put_many(
+            [doc.content or "" for doc in embedded],
+            [doc.embedding for doc in embedded],
+        )
+    return docs
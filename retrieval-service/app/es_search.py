@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+from .documents import BranchQuery, RetrievedDocument, document_from_source
+from .indexing import SNIPPET_CHARS
+
+# Vectors are only needed for indexing; never ship them back on search.
+_SOURCE_EXCLUDES = ["embedding"]
+# Everything `SearchResult` needs; chunk bodies stay in Elasticsearch.
+SEARCH_SOURCE_FIELDS = [
+    "id",
+    "chunk_id",
+    "doc_id",
+    "title",
+    "url",
+    "source",
+    "language",
+    "published_at",
+    "snippet",
+]
+# stored: index-time `snippet` field; highlight: query-aware fragment of `content`
+# (stored snippet when nothing matches); content: legacy full `_source` minus vectors.
+SNIPPET_MODES = ("stored", "highlight", "content")
+
+
+def source_filter(snippet_mode: str = "content") -> Dict[str, Any]:
+    if snippet_mode not in SNIPPET_MODES:
+        raise ValueError(f"Unsupported snippet mode: {snippet_mode}")
+    if snippet_mode == "content":
+        return {"excludes": _SOURCE_EXCLUDES}
+    return {"includes": SEARCH_SOURCE_FIELDS}
+
+
+def highlight_clause(text: str, fragment_size: int = SNIPPET_CHARS) -> Dict[str, Any]:
+    """
+    One plain-text fragment of `content` around the query terms. The explicit
+    `highlight_query` lets kNN hits be highlighted against the query text too.
+    """
+    return {
+        "pre_tags": [""],
+        "post_tags": [""],
+        "fields": {
+            "content": {
+                "type": "unified",
+                "fragment_size": fragment_size,
+                "number_of_fragments": 1,
+                "no_match_size": 0,
+                "highlight_query": {"match": {"content": text}},
+            }
+        },
+    }
+
+
+def _apply_snippet_mode(body: Dict[str, Any], text: str, snippet_mode: str) -> Dict[str, Any]:
+    body["_source"] = source_filter(snippet_mode)
+    if snippet_mode == "highlight":
+        body["highlight"] = highlight_clause(text)
+    return body
+
+
+def language_filter(query: BranchQuery) -> Optional[Dict[str, Any]]:
+    """
+    Pre-filter clause for `query.language`. `language` is a keyword field (Haystack's
+    dynamic string template), so this is a cached, non-scoring term filter.
+    """
+    if not query.language:
+        return None
+    return {"term": {"language": query.language}}
+
+
+def _page(body: Dict[str, Any], query: BranchQuery) -> Dict[str, Any]:
+    # Tail fetch: ranks below `offset` were returned by an earlier round.
+    if query.offset > 0:
+        body["from"] = query.offset
+        body["size"] = max(query.top_k - query.offset, 0)
+    return body
+
+
+def build_bm25_body(query: BranchQuery, *, snippet_mode: str = "content") -> Dict[str, Any]:
+    """
+    Same query shape as Haystack's `ElasticsearchBM25Retriever` (most_fields, fuzzy)
+    so rankings match the pipeline path.
+    """
+    bool_query: Dict[str, Any] = {
+        "must": [
+            {
+                "multi_match": {
+                    "query": query.query,
+                    "type": "most_fields",
+                    "operator": "OR",
+                    "fuzziness": "AUTO",
+                }
+            }
+        ]
+    }
+    clause = language_filter(query)
+    if clause is not None:
+        bool_query["filter"] = [clause]
+    body = {
+        "size": query.top_k,
+        "query": {"bool": bool_query},
+    }
+    return _apply_snippet_mode(_page(body, query), query.query, snippet_mode)
+
+
+def build_knn_body(
+    query: BranchQuery,
+    *,
+    rescore_oversample: float = 0.0,
+    snippet_mode: str = "content",
+) -> Dict[str, Any]:
+    """
+    Top-level kNN search. With `rescore_oversample > 1`, the approximate (possibly
+    quantized) kNN query gathers `top_k * oversample` candidates and an exact cosine
+    `script_score` over the stored float vectors reorders them before the final cut.
+    """
+    if query.embedding is None:
+        raise ValueError(f"Dense branch query has no embedding: {query.query!r}")
+    # kNN `filter` is applied during the HNSW search, so all k neighbours are eligible.
+    clause = language_filter(query)
+    if rescore_oversample <= 1.0:
+        knn: Dict[str, Any] = {
+            "field": "embedding",
+            "query_vector": list(query.embedding),
+            "k": query.top_k,
+            "num_candidates": query.top_k * 10,
+        }
+        if clause is not None:
+            knn["filter"] = clause
+        return _apply_snippet_mode(_page({"size": query.top_k, "knn": knn}, query), query.query, snippet_mode)
+
+    window = max(query.top_k, math.ceil(query.top_k * rescore_oversample))
+    query_vector = list(query.embedding)
+    knn_query: Dict[str, Any] = {
+        "field": "embedding",
+        "query_vector": query_vector,
+        "num_candidates": max(window, query.top_k * 10),
+    }
+    if clause is not None:
+        knn_query["filter"] = clause
+    body = {
+        "size": query.top_k,
+        # Query-form kNN so the standard `rescore` phase can run on its candidates.
+        "query": {"knn": knn_query},
+        "rescore": {
+            "window_size": window,
+            "query": {
+                "rescore_query": {
+                    "script_score": {
+                        "query": {"match_all": {}},
+                        "script": {
+                            # Same scale as ES kNN cosine scores: (1 + cos) / 2.
+                            "source": "(cosineSimilarity(params.query_vector, 'embedding') + 1.0) / 2.0",
+                            "params": {"query_vector": query_vector},
+                        },
+                    }
+                },
+                "query_weight": 0.0,
+                "rescore_query_weight": 1.0,
+            },
+        },
+    }
+    return _apply_snippet_mode(_page(body, query), query.query, snippet_mode)
+
+
+def build_search_body(
+    query: BranchQuery,
+    *,
+    rescore_oversample: float = 0.0,
+    snippet_mode: str = "content",
+) -> Dict[str, Any]:
+    if query.branch == "bm25":
+        return build_bm25_body(query, snippet_mode=snippet_mode)
+    if query.branch == "dense":
+        return build_knn_body(query, rescore_oversample=rescore_oversample, snippet_mode=snippet_mode)
+    raise ValueError(f"Unknown branch type: {query.branch}")
+
+
+def _bm25_query_clause(query: BranchQuery) -> Dict[str, Any]:
+    return build_bm25_body(query)["query"]
+
+
+def build_hybrid_rrf_body(
+    queries: Sequence[BranchQuery],
+    *,
+    top_k: int,
+    rank_constant: int = 60,
+    snippet_mode: str = "content",
+) -> Dict[str, Any]:
+    """
+    Single request that lets Elasticsearch fuse every BM25 and kNN sub-query with its
+    `rrf` retriever, so only the final top_k hits cross the wire.
+    """
+    retrievers: List[Dict[str, Any]] = []
+    for query in queries:
+        if query.branch == "bm25":
+            retrievers.append({"standard": {"query": _bm25_query_clause(query)}})
+        elif query.branch == "dense":
+            retrievers.append({"knn": build_knn_body(query)["knn"]})
+        else:
+            raise ValueError(f"Unknown branch type: {query.branch}")
+    window = max([top_k, *(query.top_k for query in queries)])
+    body = {
+        "size": top_k,
+        "retriever": {
+            "rrf": {
+                "retrievers": retrievers,
+                "rank_constant": rank_constant,
+                "rank_window_size": window,
+            }
+        },
+    }
+    texts = list(dict.fromkeys(query.query for query in queries))
+    return _apply_snippet_mode(body, " ".join(texts), snippet_mode)
+
+
+def is_rejected_request(err: BaseException) -> bool:
+    """
+    True for a 4xx the cluster will keep returning (bad request, unlicensed or unknown
+    feature), as opposed to timeouts, throttling or 5xx. Reads `status_code` (7.x
+    `TransportError`) or `meta.status` (8.x `ApiError`) so the client stays optional.
+    """
+    status = getattr(err, "status_code", None)
+    if not isinstance(status, int):
+        status = getattr(getattr(err, "meta", None), "status", None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in {408, 429}
+
+
+def hits_to_documents(response: Dict[str, Any]) -> List[RetrievedDocument]:
+    documents: List[RetrievedDocument] = []
+    for hit in response.get("hits", {}).get("hits", []):
+        doc = document_from_source(str(hit.get("_id", "")), hit.get("_source") or {}, hit.get("_score"))
+        fragments = (hit.get("highlight") or {}).get("content")
+        if fragments:
+            doc.meta["highlight"] = " … ".join(fragments)
+        documents.append(doc)
+    return documents
+
+
+class ElasticsearchMultiSearch:
+    """
+    Packs every branch of a search into one `_msearch` round trip over a pooled,
+    keep-alive client shared by all requests in the worker.
+    """
+
+    def __init__(
+        self,
+        *,
+        hosts: str,
+        index: str,
+        connections_per_node: int = 10,
+        request_timeout_s: float = 10.0,
+        rescore_oversample: float = 0.0,
+        snippet_mode: str = "content",
+        client: Optional[Any] = None,
+    ) -> None:
+        if client is None:
+            from elasticsearch import Elasticsearch
+
+            client = Elasticsearch(
+                hosts,
+                connections_per_node=max(1, connections_per_node),
+                request_timeout=request_timeout_s,
+            )
+        self._client = client
+        self.index = index
+        self.rescore_oversample = float(rescore_oversample)
+        if snippet_mode not in SNIPPET_MODES:
+            raise ValueError(f"Unsupported snippet mode: {snippet_mode}")
+        self.snippet_mode = snippet_mode
+
+    @property
+    def client(self) -> Any:
+        return self._client
+
+    def search_many(self, queries: Sequence[BranchQuery]) -> List[List[RetrievedDocument]]:
+        if not queries:
+            return []
+        searches: List[Dict[str, Any]] = []
+        for query in queries:
+            searches.append({"index": self.index})
+            searches.append(
+                build_search_body(
+                    query,
+                    rescore_oversample=self.rescore_oversample,
+                    snippet_mode=self.snippet_mode,
+                )
+            )
+
+        response = self._client.msearch(searches=searches)
+        # elasticsearch-py wraps bodies in ObjectApiResponse; unwrap for plain dict access.
+        body = getattr(response, "body", response)
+        responses = list(body.get("responses", []))
+        if len(responses) != len(queries):
+            raise RuntimeError(
+                f"msearch returned {len(responses)} responses for {len(queries)} searches"
+            )
+
+        rankings: List[List[RetrievedDocument]] = []
+        for query, item in zip(queries, responses):
+            if "error" in item:
+                raise RuntimeError(f"msearch {query.branch} branch failed: {item['error']}")
+            rankings.append(hits_to_documents(item))
+        return rankings
+
+    def language_counts(self) -> Dict[str, int]:
+        """Chunks per `language` value (one terms aggregation, no hits)."""
+        response = self._client.search(
+            index=self.index,
+            size=0,
+            aggs={"languages": {"terms": {"field": "language", "size": 100}}},
+        )
+        body = getattr(response, "body", response)
+        buckets = body.get("aggregations", {}).get("languages", {}).get("buckets", [])
+        return {str(bucket["key"]): int(bucket["doc_count"]) for bucket in buckets}
+
+    def search_hybrid(
+        self,
+        queries: Sequence[BranchQuery],
+        *,
+        top_k: int,
+        rank_constant: int = 60,
+    ) -> List[RetrievedDocument]:
+        body = build_hybrid_rrf_body(
+            queries,
+            top_k=top_k,
+            rank_constant=rank_constant,
+            snippet_mode=self.snippet_mode,
+        )
+        response = self._client.search(index=self.index, **body)
+        return hits_to_documents(getattr(response, "body", response))
+
+    def close(self) -> None:
+        try:
+            self._client.close()
+        except Exception:  # pragma: no cover - network dependent
+            pass
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import heapq
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+
+    _HAS_NUMPY = True
+except ImportError:  # pragma: no cover - numpy ships with sentence-transformers
+    _HAS_NUMPY = False
+
+# (chunk_id, document, score); the document itself is never mutated.
+ScoredHit = Tuple[str, Any, float]
+
+
+def chunk_key(doc: Any) -> str:
+    meta = doc.meta or {}
+    chunk_id = meta.get("chunk_id")
+    if chunk_id:
+        return chunk_id if type(chunk_id) is str else str(chunk_id)
+    return f"{meta.get('doc_id', 'unknown')}::chunk::na"
+
+
+def top_k_indices(scores: Any, k: int, candidates: Any = None) -> Any:
+    """
+    Indices of the k highest scores (descending, ties by index) without a full sort.
+    """
+    if candidates is None:
+        candidates = np.arange(scores.shape[0])
+    if k <= 0 or candidates.size == 0:
+        return candidates[:0]
+    if candidates.size > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def _ranking_keys(ranking: Sequence[Any], key_fn: Callable[[Any], str]) -> List[str]:
+    if key_fn is not chunk_key:
+        return [key_fn(doc) for doc in ranking]
+    # Inlined default key: one comprehension instead of a Python call per document.
+    keys = [(doc.meta or {}).get("chunk_id") or chunk_key(doc) for doc in ranking]
+    if set(map(type, keys)) - {str}:
+        return [chunk_key(doc) for doc in ranking]
+    return keys
+
+
+def _weighted_rrf_numpy(
+    rankings: Sequence[Sequence[Any]],
+    weights: Sequence[float],
+    k: float,
+    top_k: Optional[int],
+    key_fn: Callable[[Any], str],
+) -> List[ScoredHit]:
+    keys: List[str] = []
+    docs: List[Any] = []
+    for ranking in rankings:
+        keys.extend(_ranking_keys(ranking, key_fn))
+        docs.extend(ranking)
+    # Dense slot per chunk_id in first-seen order; one dict probe per candidate.
+    slot_of: Dict[str, int] = {}
+    slots = np.fromiter((slot_of.setdefault(key, len(slot_of)) for key in keys), dtype=np.intp, count=len(keys))
+    contributions = np.concatenate(
+        [weight / (k + np.arange(1, len(ranking) + 1, dtype=np.float64)) for ranking, weight in zip(rankings, weights)]
+    )
+    scores = np.bincount(slots, weights=contributions, minlength=len(slot_of))
+    # Slots are numbered in first-seen order, so a slot's first position is where the running max grows.
+    first_seen = np.flatnonzero(slots > np.maximum.accumulate(np.concatenate(([-1], slots[:-1]))))
+    # Ties resolve by slot, i.e. like a stable sort of the old merge.
+    order = top_k_indices(scores, len(slot_of) if top_k is None else top_k)
+    positions = first_seen[order].tolist()
+    return [(keys[pos], docs[pos], float(scores[slot])) for slot, pos in zip(order.tolist(), positions)]
+
+
+def _weighted_rrf_python(
+    rankings: Sequence[Sequence[Any]],
+    weights: Sequence[float],
+    k: float,
+    top_k: Optional[int],
+    key_fn: Callable[[Any], str],
+) -> List[ScoredHit]:
+    scores: Dict[str, float] = {}
+    first_doc: Dict[str, Any] = {}
+    for ranking, weight in zip(rankings, weights):
+        contributions = [weight / (k + rank) for rank in range(1, len(ranking) + 1)]
+        for key, doc, contribution in zip(_ranking_keys(ranking, key_fn), ranking, contributions):
+            if key in scores:
+                scores[key] += contribution
+            else:
+                scores[key] = contribution
+                first_doc[key] = doc
+    # nlargest(key=...) is stable, matching the numpy tie order.
+    keys = heapq.nlargest(len(scores) if top_k is None else top_k, scores, key=scores.__getitem__)
+    return [(key, first_doc[key], scores[key]) for key in keys]
+
+
+def weighted_rrf(
+    rankings: Sequence[Sequence[Any]],
+    *,
+    weights: Optional[Sequence[float]] = None,
+    k: float = 60.0,
+    top_k: Optional[int] = None,
+    key_fn: Callable[[Any], str] = chunk_key,
+    use_numpy: Optional[bool] = None,
+) -> List[ScoredHit]:
+    """
+    Weighted reciprocal-rank fusion: score(d) = sum_i w_i / (k + rank_i(d)).
+
+    Each document is keyed once; contributions are scattered into one array with
+    `bincount` and only the top_k are selected (`argpartition`), instead of fully sorting
+    every candidate. Falls back to a dict + `heapq` pass when numpy is unavailable.
+    """
+    weights = [1.0] * len(rankings) if weights is None else [float(weight) for weight in weights]
+    if len(weights) != len(rankings):
+        raise ValueError(f"Got {len(weights)} weights for {len(rankings)} rankings")
+    if not any(rankings):
+        return []
+    if use_numpy is None:
+        use_numpy = _HAS_NUMPY
+    fuse = _weighted_rrf_numpy if use_numpy else _weighted_rrf_python
+    return fuse(rankings, weights, float(k), top_k, key_fn)
+
+
+def scored_hits(docs: Sequence[Any], key_fn: Callable[[Any], str] = chunk_key) -> List[ScoredHit]:
+    return [(key_fn(doc), doc, float(doc.score or 0.0)) for doc in docs]
+
+
+def select_top_hits(
+    hits: Sequence[ScoredHit],
+    k: int,
+    *,
+    language: Optional[str] = None,
+) -> List[ScoredHit]:
+    """
+    Keep the best-scoring hit per chunk_id, drop other-language chunks, and return the
+    top k in score order (stable for ties).
+    """
+    best: dict = {}
+    for hit in hits:
+        meta = hit[1].meta or {}
+        if language and meta.get("language") and meta.get("language") != language:
+            continue
+        existing = best.get(hit[0])
+        if existing is None or hit[2] > existing[2]:
+            best[hit[0]] = hit
+    return heapq.nlargest(k, best.values(), key=lambda hit: hit[2])
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .logger import get_logger
+
+
+VECTOR_INDEX_TYPES = {
+    "hnsw",
+    "int8_hnsw",
+    "int4_hnsw",
+    "bbq_hnsw",
+    "flat",
+    "int8_flat",
+    "int4_flat",
+    "bbq_flat",
+}
+
+
+def document_store_mapping(vector_index_type: str, similarity: str = "cosine") -> Dict[str, Any]:
+    """
+    Haystack's default Elasticsearch mapping with an explicit `dense_vector.index_options`
+    type, so quantized (int8/int4/bbq) HNSW graphs can be chosen per deployment.
+    """
+    if vector_index_type not in VECTOR_INDEX_TYPES:
+        raise ValueError(f"Unsupported vector index type: {vector_index_type}")
+    return {
+        "properties": {
+            "embedding": {
+                "type": "dense_vector",
+                "index": True,
+                "similarity": similarity,
+                "index_options": {"type": vector_index_type},
+            },
+            "content": {"type": "text"},
+        },
+        "dynamic_templates": [
+            {
+                "strings": {
+                    "path_match": "*",
+                    "match_mapping_type": "string",
+                    "mapping": {"type": "keyword", "ignore_above": 256},
+                }
+            }
+        ],
+    }
+
+
+def document_to_action(doc: Any, index: str) -> Dict[str, Any]:
+    """
+    Bulk `index` action with the same `_source` layout Haystack's document store writes
+    (flattened meta, `embedding` at top level), so both write paths stay interchangeable.
+    """
+    source = doc.to_dict() if hasattr(doc, "to_dict") else dict(doc)
+    source.pop("sparse_embedding", None)
+    return {"_op_type": "index", "_index": index, "_id": str(source.get("id")), "_source": source}
+
+
+def existing_chunk_hashes(
+    client: Any,
+    index: str,
+    *,
+    scan_fn: Optional[Callable[..., Any]] = None,
+    page_size: int = 1000,
+) -> Dict[str, List[Tuple[str, Optional[str]]]]:
+    """
+    Map `chunk_id -> [(_id, content_hash), ...]` for every stored chunk, reading only
+    those two fields. Several entries for one chunk_id mean older versions linger.
+    """
+    if scan_fn is None:
+        from elasticsearch.helpers import scan
+
+        scan_fn = scan
+    existing: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+    for hit in scan_fn(
+        client,
+        index=index,
+        query={"query": {"match_all": {}}, "_source": ["chunk_id", "content_hash"]},
+        size=page_size,
+    ):
+        source = hit.get("_source") or {}
+        chunk_id = source.get("chunk_id")
+        if chunk_id is None:
+            continue
+        existing.setdefault(str(chunk_id), []).append((str(hit["_id"]), source.get("content_hash")))
+    return existing
+
+
+def _bulk_item(info: Any) -> Dict[str, Any]:
+    """The per-action result inside a bulk response item such as `{"index": {...}}`."""
+    if not isinstance(info, dict):
+        return {}
+    return next(iter(info.values()), {})
+
+
+def delete_documents(
+    client: Any,
+    index: str,
+    ids: Sequence[str],
+    *,
+    bulk_fn: Optional[Callable[..., Any]] = None,
+    chunk_size: int = 500,
+) -> int:
+    """
+    Bulk-delete documents by `_id`; ids that are already gone count as deleted.
+    """
+    if not ids:
+        return 0
+    if bulk_fn is None:
+        from elasticsearch.helpers import bulk
+
+        bulk_fn = bulk
+    actions = [{"_op_type": "delete", "_index": index, "_id": doc_id} for doc_id in ids]
+    _ok, errors = bulk_fn(client, actions, chunk_size=chunk_size, raise_on_error=False)
+    failures = [item for item in errors or [] if _bulk_item(item).get("status") != 404]
+    if failures:
+        raise RuntimeError(f"Bulk delete failed for {len(failures)} docs: {failures[0]}")
+    return len(ids)
+
+
+def versioned_index_name(alias: str, now: Optional[datetime] = None) -> str:
+    stamp = (now or datetime.now(timezone.utc)).strftime("%Y%m%d%H%M%S%f")
+    return f"{alias}__{stamp}"
+
+
+def alias_targets(client: Any, alias: str) -> List[str]:
+    """Concrete indices `alias` points at; empty when the name is not an alias."""
+    if not client.indices.exists_alias(name=alias):
+        return []
+    response = client.indices.get_alias(name=alias)
+    return list(getattr(response, "body", response))
+
+
+def drop_index(client: Any, name: str) -> List[str]:
+    """
+    Delete what `name` resolves to: the indices behind it when a blue/green rebuild left
+    it as an alias (the alias goes with them), else the index itself. Returns the
+    deleted indices; a name that does not exist deletes nothing.
+    """
+    targets = alias_targets(client, name)
+    if not targets:
+        if not client.indices.exists(index=name):
+            return []
+        targets = [name]
+    client.indices.delete(index=targets)
+    return targets
+
+
+def swap_alias(client: Any, alias: str, new_index: str) -> List[str]:
+    """
+    Point `alias` at `new_index` in one atomic `_aliases` request and return the
+    indices it used to point at (left in place for the caller to delete).
+    """
+    previous = [name for name in alias_targets(client, alias) if name != new_index]
+
+    actions: List[Dict[str, Any]] = []
+    if not previous and client.indices.exists(index=alias):
+        # First swap: a concrete index still owns the name; drop it in the same atomic request.
+        actions.append({"remove_index": {"index": alias}})
+    actions.extend({"remove": {"index": name, "alias": alias}} for name in previous)
+    actions.append({"add": {"index": new_index, "alias": alias}})
+    client.indices.update_aliases(actions=actions)
+    return previous
+
+
+class ElasticsearchBulkWriter:
+    """
+    Writes document batches with `helpers.parallel_bulk`, retrying failed items with
+    exponential backoff. Use `ingest()` around a full run to pause index refreshes.
+    """
+
+    def __init__(
+        self,
+        *,
+        client: Any,
+        index: str,
+        chunk_size: int = 64,
+        thread_count: int = 4,
+        max_retries: int = 3,
+        backoff_s: float = 0.5,
+        logger=None,
+        parallel_bulk_fn: Optional[Callable[..., Any]] = None,
+        sleep_fn: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if parallel_bulk_fn is None:
+            from elasticsearch.helpers import parallel_bulk
+
+            parallel_bulk_fn = parallel_bulk
+        self.client = client
+        self.index = index
+        self.chunk_size = max(1, int(chunk_size))
+        self.thread_count = max(1, int(thread_count))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_s = max(0.0, float(backoff_s))
+        self.logger = logger or get_logger("retrieval-index-writer")
+        self._parallel_bulk: Callable[..., Any] = parallel_bulk_fn
+        self._sleep = sleep_fn
+        self.retried_items = 0
+
+    def _current_refresh_interval(self) -> Optional[str]:
+        response = self.client.indices.get_settings(index=self.index, name="index.refresh_interval")
+        body = getattr(response, "body", response)
+        for index_settings in body.values():
+            value = index_settings.get("settings", {}).get("index", {}).get("refresh_interval")
+            if value is not None:
+                return str(value)
+        return None
+
+    @contextmanager
+    def ingest(self) -> Iterator["ElasticsearchBulkWriter"]:
+        """
+        Disable refresh while bulk loading, then restore the previous interval
+        (or the cluster default) and refresh once so new docs become searchable.
+        """
+        previous: Optional[str] = None
+        paused = False
+        try:
+            previous = self._current_refresh_interval()
+            self.client.indices.put_settings(
+                index=self.index,
+                settings={"index": {"refresh_interval": "-1"}},
+            )
+            paused = True
+        except Exception as err:
+            self.logger.warning(f"[index-writer] could not pause refresh; continuing ({err})")
+        try:
+            yield self
+        finally:
+            if paused:
+                try:
+                    self.client.indices.put_settings(
+                        index=self.index,
+                        settings={"index": {"refresh_interval": previous}},
+                    )
+                except Exception as err:
+                    self.logger.warning(f"[index-writer] could not restore refresh interval ({err})")
+            try:
+                self.client.indices.refresh(index=self.index)
+            except Exception as err:
+                self.logger.warning(f"[index-writer] final refresh failed ({err})")
+
+    def _send(self, actions: Sequence[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Any]]:
+        by_id = {action["_id"]: action for action in actions}
+        failures: List[Tuple[Dict[str, Any], Any]] = []
+        for ok, info in self._parallel_bulk(
+            self.client,
+            actions,
+            chunk_size=self.chunk_size,
+            thread_count=self.thread_count,
+            raise_on_error=False,
+            raise_on_exception=False,
+        ):
+            if ok:
+                continue
+            item = _bulk_item(info)
+            action = by_id.get(str(item.get("_id")))
+            if action is None:
+                raise RuntimeError(f"Bulk write failed without a retryable item: {info}")
+            failures.append((action, item.get("error", info)))
+        return failures
+
+    def write(self, docs: Sequence[Any]) -> int:
+        if not docs:
+            return 0
+        pending = [document_to_action(doc, self.index) for doc in docs]
+        for attempt in range(self.max_retries + 1):
+            failures = self._send(pending)
+            if not failures:
+                return len(docs)
+            if attempt == self.max_retries:
+                raise RuntimeError(
+                    f"Bulk write failed for {len(failures)} docs after {attempt} retries: "
+                    f"{failures[0][1]}"
+                )
+            pending = [action for action, _error in failures]
+            self.retried_items += len(pending)
+            delay = self.backoff_s * (2**attempt)
+            self.logger.warning(
+                f"[index-writer] retrying {len(pending)} failed docs in {delay:.2f}s "
+                f"(attempt {attempt + 1}/{self.max_retries})"
+            )
+            self._sleep(delay)
+        return len(docs)
@@ -1,6 +1,28 @@
+import hashlib
 import json
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+# Stored with every chunk so searches can return it without transferring the chunk body.
+SNIPPET_CHARS = 420
+
+_FINGERPRINT_META_FIELDS = (
+    "doc_id",
+    "chunk_index",
+    "title",
+    "url",
+    "source",
+    "language",
+    "published_at",
+    "snippet",
+)
+
+
+def make_snippet(content: str, max_chars: int = SNIPPET_CHARS) -> str:
+    return (content or "")[:max_chars]
 
 
 def _chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
@@ -21,39 +43,74 @@ def _chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
     return chunks
 
 
-def load_corpus_records(path: str) -> List[Dict]:
-    corpus_path = Path(path)
-    if not corpus_path.exists():
-        raise FileNotFoundError(f"Corpus file not found: {path}")
-
-    records: List[Dict] = []
+def _read_corpus_lines(corpus_path: Path) -> Iterator[Dict]:
     with corpus_path.open("r", encoding="utf-8") as handle:
         for line in handle:
             line = line.strip()
             if not line:
                 continue
-            records.append(json.loads(line))
-    return records
+            yield json.loads(line)
 
 
-def build_chunk_records(records: Iterable[Dict], chunk_size: int, chunk_overlap: int) -> List[Dict]:
-    chunk_records: List[Dict] = []
+def iter_corpus_records(path: str) -> Iterator[Dict]:
+    """
+    Lazily yield corpus records one JSONL line at a time.
+    The existence check runs eagerly so callers fail before touching the index.
+    """
+    corpus_path = Path(path)
+    if not corpus_path.exists():
+        raise FileNotFoundError(f"Corpus file not found: {path}")
+    return _read_corpus_lines(corpus_path)
+
+
+def load_corpus_records(path: str) -> List[Dict]:
+    return list(iter_corpus_records(path))
+
+
+def iter_chunk_records(records: Iterable[Dict], chunk_size: int, chunk_overlap: int) -> Iterator[Dict]:
     for rec in records:
         content = rec.get("content", "")
         chunks = _chunk_text(content, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
         for idx, chunk in enumerate(chunks):
-            chunk_records.append(
-                {
-                    "chunk_id": f"{rec['id']}::chunk::{idx}",
-                    "doc_id": rec["id"],
-                    "chunk_index": idx,
-                    "content": chunk,
-                    "title": rec.get("title", ""),
-                    "url": rec.get("url", ""),
-                    "source": rec.get("source", ""),
-                    "language": rec.get("language", "en"),
-                    "published_at": rec.get("published_at"),
-                }
-            )
-    return chunk_records
+            yield {
+                "chunk_id": f"{rec['id']}::chunk::{idx}",
+                "doc_id": rec["id"],
+                "chunk_index": idx,
+                "content": chunk,
+                "snippet": make_snippet(chunk),
+                "title": rec.get("title", ""),
+                "url": rec.get("url", ""),
+                "source": rec.get("source", ""),
+                "language": rec.get("language", "en"),
+                "published_at": rec.get("published_at"),
+            }
+
+
+def build_chunk_records(records: Iterable[Dict], chunk_size: int, chunk_overlap: int) -> List[Dict]:
+    return list(iter_chunk_records(records, chunk_size=chunk_size, chunk_overlap=chunk_overlap))
+
+
+def chunk_fingerprint(chunk: Dict, *, chunk_size: int, chunk_overlap: int, embed_model: str = "") -> str:
+    """
+    Stable hash of everything that determines a chunk's stored form: text, chunking
+    params, embedding model (empty when no vectors are written) and record metadata.
+    """
+    payload = {
+        "content": chunk.get("content", ""),
+        "chunk_size": int(chunk_size),
+        "chunk_overlap": int(chunk_overlap),
+        "embed_model": embed_model or "",
+        "meta": {key: chunk.get(key) for key in _FINGERPRINT_META_FIELDS},
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
 
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(items)
+    size = max(1, int(size))
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import http.client
+import json
+import ssl
+import threading
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Errors that mean a pooled keep-alive connection went stale (peer closed it while idle).
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+    ConnectionAbortedError,
+)
+
+
+class HttpStatusError(RuntimeError):
+    def __init__(self, status: int, detail: str) -> None:
+        super().__init__(f"HTTP {status}: {detail}")
+        self.status = status
+        self.detail = detail
+
+
+def deadline_timeout(
+    deadline_monotonic: float,
+    *,
+    cap_s: float,
+    now_fn: Callable[[], float] = perf_counter,
+    floor_s: float = 0.15,
+    margin_s: float = 0.05,
+) -> float:
+    """
+    Seconds one call may take: the time left before `deadline_monotonic` (minus a small
+    margin for response handling), capped at `cap_s` and never below `floor_s`.
+    """
+    remaining = deadline_monotonic - now_fn()
+    if remaining <= 0:
+        raise TimeoutError("Corrective RAG time budget exhausted")
+    timeout = min(cap_s, max(floor_s, remaining - margin_s))
+    if timeout <= 0:
+        raise TimeoutError("No remaining timeout budget for LLM call")
+    return timeout
+
+
+class _Endpoint:
+    def __init__(self, url: str) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Unsupported endpoint URL: {url}")
+        self.url = url
+        self.tls = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.tls else 80)
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+
+def _decode_json(status: int, body: bytes) -> Dict[str, Any]:
+    text = body.decode("utf-8", errors="replace")
+    if status >= 400:
+        raise HttpStatusError(status, text[:2000])
+    return json.loads(text)
+
+
+class PooledJsonClient:
+    """
+    Blocking JSON-over-HTTP(S) POST client that keeps up to `max_idle` keep-alive
+    connections per endpoint, so repeated calls skip the TCP and TLS handshakes.
+    Thread-safe: each call checks a connection out of the pool for its duration.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        max_idle: int = 4,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        self._endpoint = _Endpoint(endpoint)
+        self._headers = {"Content-Type": "application/json", **(headers or {})}
+        self._max_idle = max(1, int(max_idle))
+        self._ssl_context = ssl_context
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _connect(self, timeout_s: float) -> http.client.HTTPConnection:
+        endpoint = self._endpoint
+        self.connections_opened += 1
+        if endpoint.tls:
+            context = self._ssl_context or ssl.create_default_context()
+            return http.client.HTTPSConnection(endpoint.host, endpoint.port, timeout=timeout_s, context=context)
+        return http.client.HTTPConnection(endpoint.host, endpoint.port, timeout=timeout_s)
+
+    def _checkout(self, timeout_s: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(timeout_s), False
+
+    def _checkin(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def post_json(self, payload: Dict[str, Any], *, timeout_s: float) -> Dict[str, Any]:
+        """POST `payload`; the whole exchange must finish within `timeout_s`."""
+        body = json.dumps(payload).encode("utf-8")
+        deadline = perf_counter() + timeout_s
+        conn, reused = self._checkout(timeout_s)
+        try:
+            try:
+                status, data, keep_alive = self._exchange(conn, body, deadline)
+            except _STALE_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                # The pooled socket died while idle; the request never reached the server.
+                conn = self._connect(timeout_s)
+                status, data, keep_alive = self._exchange(conn, body, deadline)
+        except BaseException:
+            conn.close()
+            raise
+        if keep_alive:
+            self._checkin(conn)
+        else:
+            conn.close()
+        return _decode_json(status, data)
+
+    def _exchange(
+        self,
+        conn: http.client.HTTPConnection,
+        body: bytes,
+        deadline: float,
+    ) -> Tuple[int, bytes, bool]:
+        self._set_timeout(conn, deadline)
+        conn.request("POST", self._endpoint.path, body=body, headers=self._headers)
+        self._set_timeout(conn, deadline)
+        response = conn.getresponse()
+        self._set_timeout(conn, deadline)
+        data = response.read()
+        if perf_counter() > deadline:
+            raise TimeoutError("LLM call exceeded its deadline")
+        return response.status, data, not response.will_close
+
+    @staticmethod
+    def _set_timeout(conn: http.client.HTTPConnection, deadline: float) -> None:
+        remaining = deadline - perf_counter()
+        if remaining <= 0:
+            raise TimeoutError("LLM call exceeded its deadline")
+        conn.timeout = remaining
+        if conn.sock is not None:
+            conn.sock.settimeout(remaining)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+CROSS_ENCODER_BACKENDS = ("torch", "onnx")
+
+
+class CrossEncoderGrader:
+    """
+    Local relevance grader for the corrective loop: one batched cross-encoder pass
+    scores (query, result) pairs for the top `top_n` results. Raw logits order the
+    rerank; their sigmoid probabilities set the label from the best pair.
+
+    `grade_relevance` has the `grade_fn` signature of `CorrectiveRagWorkflow`. It
+    returns `rerank_order` (a permutation of result positions), which the workflow
+    applies to the graded results.
+    """
+
+    # Lower bounds on the best pair probability for each label.
+    HIGH = 0.7
+    MEDIUM = 0.4
+    LOW = 0.1
+
+    def __init__(
+        self,
+        *,
+        model: str = DEFAULT_CROSS_ENCODER_MODEL,
+        top_n: int = 5,
+        batch_size: int = 16,
+        device: Optional[str] = None,
+        backend: str = "torch",
+        encoder: Optional[Any] = None,
+    ) -> None:
+        """`encoder` must return raw logits from `predict`, like the model built here."""
+        if backend not in CROSS_ENCODER_BACKENDS:
+            raise ValueError(f"Unsupported cross-encoder backend: {backend}")
+        self.model_name = model
+        self.top_n = max(1, int(top_n))
+        self.batch_size = max(1, int(batch_size))
+        self._predict_kwargs: Dict[str, Any] = {}
+        if encoder is None:
+            import torch
+            from sentence_transformers import CrossEncoder
+
+            # The ONNX backend needs `optimum[onnxruntime]` and runs well on CPU-only workers.
+            encoder = CrossEncoder(model, device=device, backend=backend)
+            # Whatever activation the model config declares, take logits and apply the
+            # sigmoid here, so it is applied exactly once.
+            self._predict_kwargs["activation_fn"] = torch.nn.Identity()
+        self._encoder = encoder
+
+    @staticmethod
+    def _passage(result: Dict[str, Any]) -> str:
+        title = str(result.get("title", "")).strip()
+        snippet = str(result.get("snippet", "")).strip()
+        return f"{title}. {snippet}" if title and snippet else (title or snippet)
+
+    def logits(self, query: str, results: Sequence[Dict[str, Any]]) -> List[float]:
+        """Raw relevance logit of `query` against each of `results`, in one forward pass."""
+        if not results:
+            return []
+        scores = self._encoder.predict(
+            [(query, self._passage(result)) for result in results],
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            **self._predict_kwargs,
+        )
+        return [float(value) for value in scores]
+
+    @staticmethod
+    def probability(logit: float) -> float:
+        if logit >= 0:
+            return 1.0 / (1.0 + math.exp(-logit))
+        odds = math.exp(logit)
+        return odds / (1.0 + odds)
+
+    def score(self, query: str, results: Sequence[Dict[str, Any]]) -> List[float]:
+        """Relevance probability of `query` against each of `results`."""
+        return [self.probability(logit) for logit in self.logits(query, results)]
+
+    def _label(self, score: float) -> str:
+        if score >= self.HIGH:
+            return "high"
+        if score >= self.MEDIUM:
+            return "medium"
+        if score >= self.LOW:
+            return "low"
+        return "none"
+
+    def grade_relevance(
+        self,
+        *,
+        query_original: str,
+        query_en: str,
+        dialogue_context: Sequence[str],
+        retrieval_results: Sequence[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        _ = dialogue_context
+        if not retrieval_results:
+            return {
+                "label": "none",
+                "score": 0.0,
+                "reason": "No retrieval results available.",
+                "model": self.model_name,
+            }
+        head = list(retrieval_results[: self.top_n])
+        logits = self.logits(query_en.strip() or query_original, head)
+        # Rank on logits, which do not saturate. Stable: ties keep their retrieval order;
+        # results past top_n stay behind.
+        order = sorted(range(len(head)), key=lambda idx: -logits[idx])
+        order.extend(range(len(head), len(retrieval_results)))
+        best = self.probability(max(logits))
+        return {
+            "label": self._label(best),
+            "score": round(best, 3),
+            "reason": f"Cross-encoder grade over top {len(head)} results (best={best:.3f}).",
+            "model": self.model_name,
+            "rerank_order": order,
+        }
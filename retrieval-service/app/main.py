@@ -1,6 +1,10 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 
 from .models import (
+    BatchSearchRequest,
+    BatchSearchResponse,
     HealthResponse,
     IndexRequest,
     IndexResponse,
@@ -9,16 +13,28 @@ from .models import (
 )
 from .search import RetrievalService
 
-app = FastAPI(title="Tinge Retrieval Service", version="0.1.0")
 service = RetrievalService()
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    yield
+    # Flush persisted caches so the next worker starts warm.
+    service.close()
+
+
+app = FastAPI(title="Tinge Retrieval Service", version="0.1.0", lifespan=lifespan)
+
+
 @app.get("/health", response_model=HealthResponse)
 def health() -> HealthResponse:
     return HealthResponse(
         status="ok",
         service="retrieval-service",
-        elasticsearch_reachable=service.ping(),
+        elasticsearch_reachable=service.elasticsearch_reachable(),
+        backend=service.backend_name,
+        caches=service.cache_stats(),
+        server_hybrid=service.server_hybrid_status(),
     )
 
 
@@ -30,9 +46,11 @@ def index_corpus(request: IndexRequest) -> IndexResponse:
             recreate_index=request.recreate_index,
             chunk_size=request.chunk_size,
             chunk_overlap=request.chunk_overlap,
+            incremental=request.incremental,
+            snapshot=request.snapshot,
         )
         return IndexResponse(**result)
-    except FileNotFoundError as err:
+    except (FileNotFoundError, ValueError) as err:
         raise HTTPException(status_code=400, detail=str(err)) from err
     except RuntimeError as err:
         raise HTTPException(status_code=503, detail=str(err)) from err
@@ -41,9 +59,9 @@ def index_corpus(request: IndexRequest) -> IndexResponse:
 
 
 @app.post("/search", response_model=SearchResponse)
-def search(request: SearchRequest) -> SearchResponse:
+async def search(request: SearchRequest) -> SearchResponse:
     try:
-        result = service.search(
+        result = await service.search_async(
             query_original=request.query_original,
             query_en=request.query_en,
             language=request.language,
@@ -55,3 +73,14 @@ def search(request: SearchRequest) -> SearchResponse:
         raise HTTPException(status_code=503, detail=str(err)) from err
     except Exception as err:  # pragma: no cover - defensive
         raise HTTPException(status_code=500, detail=f"Search failed: {err}") from err
+
+
+@app.post("/search/batch", response_model=BatchSearchResponse)
+async def search_batch(request: BatchSearchRequest) -> BatchSearchResponse:
+    try:
+        results = await service.search_batch_async([item.model_dump() for item in request.searches])
+        return BatchSearchResponse(responses=[SearchResponse(**result) for result in results])
+    except RuntimeError as err:
+        raise HTTPException(status_code=503, detail=str(err)) from err
+    except Exception as err:  # pragma: no cover - defensive
+        raise HTTPException(status_code=500, detail=f"Batch search failed: {err}") from err
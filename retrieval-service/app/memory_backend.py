@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import re
+import shutil
+import time
+from collections import Counter
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, overload
+
+import numpy as np
+
+from .documents import BranchQuery, RetrievedDocument
+from .fusion import top_k_indices
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, close to the Elasticsearch standard analyzer."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _document_text(doc: RetrievedDocument) -> str:
+    title = str((doc.meta or {}).get("title") or "")
+    return f"{title} {doc.content or ''}" if title else (doc.content or "")
+
+
+SNAPSHOT_VERSION = 1
+_MANIFEST = "manifest.json"
+
+
+def _pack_strings(values: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(item) for item in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class MappedTermDictionary:
+    """
+    Sorted term dictionary over a UTF-8 blob + offsets (both memory-mapped); lookups
+    binary-search the blob, so opening a snapshot never materializes the vocabulary.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return int(self._offsets.shape[0]) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        return bytes(self._blob[self._offsets[idx] : self._offsets[idx + 1]]).decode("utf-8")
+
+    def get(self, term: str) -> Optional[int]:
+        # UTF-8 byte order equals code point order, so Python string comparison is consistent.
+        idx = bisect.bisect_left(self, term)
+        if idx < len(self) and self[idx] == term:
+            return idx
+        return None
+
+
+class MappedDocuments(Sequence[RetrievedDocument]):
+    """Chunk metadata stored as JSON lines in a memory-mapped blob, decoded per hit."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return int(self._offsets.shape[0]) - 1
+
+    @overload
+    def __getitem__(self, idx: int) -> RetrievedDocument: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> List[RetrievedDocument]: ...
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[RetrievedDocument, List[RetrievedDocument]]:
+        if isinstance(idx, slice):
+            return [self[pos] for pos in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("document index out of range")
+        raw = bytes(self._blob[self._offsets[idx] : self._offsets[idx + 1]])
+        return RetrievedDocument(**json.loads(raw.decode("utf-8")))
+
+
+def snapshot_exists(path: str) -> bool:
+    return (Path(path) / _MANIFEST).exists()
+
+
+def _snapshot_versions(target: Path) -> List[Path]:
+    prefix = f"{target.name}.v"
+    return [entry for entry in target.parent.iterdir() if entry.name.startswith(prefix) and entry.is_dir()]
+
+
+def _publish_snapshot(target: Path, version: Path) -> None:
+    """
+    Point `target` (a symlink) at `version` with one atomic rename, then drop older
+    versions. The version it replaced is kept, so a reader that resolved the link just
+    before the swap can still open its files.
+    """
+    previous: Optional[str] = None
+    if target.is_symlink():
+        previous = os.readlink(target)
+    elif target.is_dir():
+        # Snapshot written before versioned layouts: move it aside once so the link can take its name.
+        legacy = target.with_name(f"{target.name}.v0-legacy")
+        shutil.rmtree(legacy, ignore_errors=True)
+        os.replace(target, legacy)
+        previous = legacy.name
+    link = target.with_name(f"{target.name}.{os.getpid()}.link")
+    if link.is_symlink():
+        link.unlink()
+    os.symlink(version.name, link)
+    os.replace(link, target)
+    for entry in _snapshot_versions(target):
+        if entry.name not in {version.name, previous}:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+class InMemoryRetrievalBackend:
+    """
+    Elasticsearch-free BM25 + dense engine over the chunked corpus.
+
+    BM25 postings are stored CSR-style (`indptr` per term into flat `doc_ids` and
+    precomputed per-posting `impacts`), so a query term costs one vectorized
+    scatter-add. Dense search is a brute-force dot product over L2-normalized vectors.
+    Implements `search_many` like `ElasticsearchMultiSearch`, so the service can swap it in.
+    """
+
+    def __init__(
+        self,
+        *,
+        documents: Sequence[RetrievedDocument],
+        terms: Any,
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        impacts: np.ndarray,
+        idf: np.ndarray,
+        vectors: Optional[np.ndarray] = None,
+        languages: Optional[Sequence[str]] = None,
+        doc_languages: Optional[np.ndarray] = None,
+    ) -> None:
+        self.documents = documents
+        # `term -> id` lookup: a dict when built in-process, `MappedTermDictionary` from a snapshot.
+        self.terms = terms
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.impacts = impacts
+        self.idf = idf
+        self.vectors = vectors
+        # Per-chunk language as a code into `languages`; the pre-filter for language-scoped queries.
+        if languages is None or doc_languages is None:
+            languages, doc_languages = self._encode_languages(documents)
+        self.languages = list(languages)
+        self.doc_languages = doc_languages
+        self._language_candidates: Dict[str, np.ndarray] = {}
+        self.metadata: Dict[str, Any] = {}
+
+    @staticmethod
+    def _encode_languages(documents: Sequence[RetrievedDocument]) -> Tuple[List[str], np.ndarray]:
+        values = [str((doc.meta or {}).get("language") or "") for doc in documents]
+        languages = sorted(set(values))
+        code_of = {language: code for code, language in enumerate(languages)}
+        return languages, np.asarray([code_of[value] for value in values], dtype=np.int32)
+
+    def candidates_for_language(self, language: str) -> np.ndarray:
+        """Row indices of chunks in `language` (cached per language)."""
+        candidates = self._language_candidates.get(language)
+        if candidates is None:
+            if language in self.languages:
+                candidates = np.flatnonzero(self.doc_languages == self.languages.index(language))
+            else:
+                candidates = np.empty(0, dtype=np.intp)
+            self._language_candidates[language] = candidates
+        return candidates
+
+    @classmethod
+    def build(
+        cls,
+        documents: Sequence[RetrievedDocument],
+        *,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "InMemoryRetrievalBackend":
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(len(documents), dtype=np.float32)
+        for doc_idx, doc in enumerate(documents):
+            tokens = tokenize(_document_text(doc))
+            lengths[doc_idx] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, {})[doc_idx] = tf
+
+        terms = sorted(postings)
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        for idx, term in enumerate(terms):
+            indptr[idx + 1] = indptr[idx] + len(postings[term])
+        doc_ids = np.empty(int(indptr[-1]), dtype=np.int32)
+        tfs = np.empty(int(indptr[-1]), dtype=np.float32)
+        for idx, term in enumerate(terms):
+            start, end = indptr[idx], indptr[idx + 1]
+            items = sorted(postings[term].items())
+            doc_ids[start:end] = [doc_idx for doc_idx, _tf in items]
+            tfs[start:end] = [tf for _doc_idx, tf in items]
+
+        avgdl = float(lengths.mean()) if len(documents) and lengths.mean() > 0 else 1.0
+        norm = k1 * (1.0 - b + b * lengths[doc_ids] / avgdl)
+        impacts = (tfs * (k1 + 1.0) / (tfs + norm)).astype(np.float32)
+        df = np.diff(indptr).astype(np.float32)
+        # Lucene's BM25 idf, so scores are on the same scale as Elasticsearch.
+        idf = np.log1p((len(documents) - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        vectors = None
+        if documents and all(doc.embedding is not None for doc in documents):
+            matrix = np.asarray([doc.embedding for doc in documents], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            vectors = matrix / np.where(norms > 0, norms, 1.0)
+
+        stored = [replace(doc, embedding=None) for doc in documents]
+        return cls(
+            documents=stored,
+            terms={term: idx for idx, term in enumerate(terms)},
+            indptr=indptr,
+            doc_ids=doc_ids,
+            impacts=impacts,
+            idf=idf,
+            vectors=vectors,
+        )
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _hits(self, indices: np.ndarray, scores: np.ndarray) -> List[RetrievedDocument]:
+        return [replace(self.documents[idx], score=float(scores[idx])) for idx in indices]
+
+    def language_counts(self) -> Dict[str, int]:
+        counts = np.bincount(np.asarray(self.doc_languages), minlength=len(self.languages))
+        return {language: int(count) for language, count in zip(self.languages, counts) if count}
+
+    def search_bm25(self, query: str, top_k: int, language: Optional[str] = None) -> List[RetrievedDocument]:
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        matched = False
+        for term, qtf in Counter(tokenize(query)).items():
+            term_id = self.terms.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            # doc_ids are unique within one posting list, so plain fancy-index add is safe.
+            scores[self.doc_ids[start:end]] += self.idf[term_id] * qtf * self.impacts[start:end]
+            matched = True
+        if not matched:
+            return []
+        if language:
+            candidates = self.candidates_for_language(language)
+            candidates = candidates[scores[candidates] > 0]
+        else:
+            candidates = np.flatnonzero(scores > 0)
+        return self._hits(top_k_indices(scores, top_k, candidates), scores)
+
+    def search_dense(
+        self,
+        embedding: Sequence[float],
+        top_k: int,
+        language: Optional[str] = None,
+    ) -> List[RetrievedDocument]:
+        if self.vectors is None or not len(self.documents):
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0:
+            return []
+        candidates = self.candidates_for_language(language) if language else None
+        if candidates is not None and candidates.size == 0:
+            return []
+        # Same scale as Elasticsearch cosine kNN scores: (1 + cos) / 2.
+        scores = (1.0 + self.vectors @ (query / norm)) / 2.0
+        return self._hits(top_k_indices(scores, top_k, candidates), scores)
+
+    def search_many(self, queries: Sequence[BranchQuery]) -> List[List[RetrievedDocument]]:
+        rankings: List[List[RetrievedDocument]] = []
+        for query in queries:
+            if query.branch == "bm25":
+                rankings.append(self.search_bm25(query.query, query.top_k, query.language)[query.offset :])
+            elif query.branch == "dense":
+                if query.embedding is None:
+                    raise ValueError(f"Dense branch query has no embedding: {query.query!r}")
+                rankings.append(self.search_dense(query.embedding, query.top_k, query.language)[query.offset :])
+            else:
+                raise ValueError(f"Unknown branch type: {query.branch}")
+        return rankings
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chunks": len(self.documents),
+            "terms": len(self.terms),
+            "postings": int(self.doc_ids.shape[0]),
+            "vectors": None if self.vectors is None else list(self.vectors.shape),
+        }
+
+    def save_snapshot(self, path: str, *, metadata: Optional[Dict[str, Any]] = None) -> Path:
+        """
+        Write a snapshot directory (term blob, CSR postings, doc metadata, vectors) as a
+        new version next to `path`, then repoint the `path` symlink at it, so readers
+        always see either the old or the new snapshot, never a partial or missing one.
+        """
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+
+        terms = sorted(self.terms, key=self.terms.__getitem__) if isinstance(self.terms, dict) else list(self.terms)
+        term_blob, term_offsets = _pack_strings(terms)
+        doc_rows = [
+            json.dumps(asdict(replace(doc, embedding=None, score=None)), default=str)
+            for doc in self.documents
+        ]
+        doc_blob, doc_offsets = _pack_strings(doc_rows)
+        arrays = {
+            "terms": term_blob,
+            "term_offsets": term_offsets,
+            "indptr": self.indptr,
+            "doc_ids": self.doc_ids,
+            "impacts": self.impacts,
+            "idf": self.idf,
+            "docs": doc_blob,
+            "doc_offsets": doc_offsets,
+            "doc_languages": np.asarray(self.doc_languages, dtype=np.int32),
+        }
+        if self.vectors is not None:
+            arrays["vectors"] = np.ascontiguousarray(self.vectors, dtype=np.float32)
+        for name, array in arrays.items():
+            np.save(staging / f"{name}.npy", array, allow_pickle=False)
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "created_at": time.time(),
+            "chunks": len(self.documents),
+            "terms": len(terms),
+            "has_vectors": self.vectors is not None,
+            "languages": self.languages,
+            **(metadata or {}),
+        }
+        (staging / _MANIFEST).write_text(json.dumps(manifest), encoding="utf-8")
+
+        # Workers that already mapped the old files keep valid pages after the swap.
+        version = target.with_name(f"{target.name}.v{time.time_ns()}-{os.getpid()}")
+        os.replace(staging, version)
+        _publish_snapshot(target, version)
+        return target
+
+    @classmethod
+    def load_snapshot(cls, path: str, *, load_vectors: bool = True) -> "InMemoryRetrievalBackend":
+        """
+        Open a snapshot with every array memory-mapped read-only: O(1) startup, and all
+        worker processes share the same page-cache copy.
+        """
+        # Resolve the symlink once, so every file comes from the same version even if a
+        # new snapshot is published while this one is opening.
+        root = Path(path).resolve()
+        manifest = json.loads((root / _MANIFEST).read_text(encoding="utf-8"))
+        if manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+
+        def mapped(name: str) -> np.ndarray:
+            try:
+                return np.load(root / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+            except ValueError:
+                # Zero-length arrays (empty corpus) cannot be mapped.
+                return np.load(root / f"{name}.npy", allow_pickle=False)
+
+        vectors = mapped("vectors") if load_vectors and manifest.get("has_vectors") else None
+        # Snapshots written before language codes existed derive them from the documents.
+        languages = manifest.get("languages")
+        doc_languages = mapped("doc_languages") if languages is not None else None
+        backend = cls(
+            documents=MappedDocuments(mapped("docs"), mapped("doc_offsets")),
+            terms=MappedTermDictionary(mapped("terms"), mapped("term_offsets")),
+            indptr=mapped("indptr"),
+            doc_ids=mapped("doc_ids"),
+            impacts=mapped("impacts"),
+            idf=mapped("idf"),
+            vectors=vectors,
+            languages=languages,
+            doc_languages=doc_languages,
+        )
+        backend.metadata = manifest
+        return backend
+
+    def close(self) -> None:
+        return None
@@ -6,7 +6,10 @@ from pydantic import BaseModel, Field
 class HealthResponse(BaseModel):
     status: str
     service: str
-    elasticsearch_reachable: bool
+    elasticsearch_reachable: Optional[bool] = None
+    backend: Optional[str] = None
+    caches: Optional[Dict[str, Any]] = None
+    server_hybrid: Optional[Dict[str, Any]] = None
 
 
 class IndexRequest(BaseModel):
@@ -14,12 +17,21 @@ class IndexRequest(BaseModel):
     recreate_index: bool = False
     chunk_size: int = Field(default=900, ge=200, le=2000)
     chunk_overlap: int = Field(default=100, ge=0, le=400)
+    incremental: bool = False
+    snapshot: bool = False
 
 
 class IndexResponse(BaseModel):
     indexed_documents: int
     indexed_chunks: int
     index_name: str
+    elapsed_ms: Optional[float] = None
+    docs_per_second: Optional[float] = None
+    skipped_chunks: Optional[int] = None
+    deleted_chunks: Optional[int] = None
+    physical_index: Optional[str] = None
+    embedding_workers: Optional[List[Dict[str, Any]]] = None
+    snapshot_path: Optional[str] = None
 
 
 class SearchRequest(BaseModel):
@@ -30,6 +42,10 @@ class SearchRequest(BaseModel):
     dialogue_context: Optional[List[str]] = Field(default=None, max_length=3)
 
 
+class BatchSearchRequest(BaseModel):
+    searches: List[SearchRequest] = Field(min_length=1, max_length=64)
+
+
 class SearchResult(BaseModel):
     chunk_id: str
     doc_id: str
@@ -47,3 +63,7 @@ class SearchResponse(BaseModel):
     used_queries: List[str]
     index_name: str
     meta: Optional[Dict[str, Any]] = None
+
+
+class BatchSearchResponse(BaseModel):
+    responses: List[SearchResponse]
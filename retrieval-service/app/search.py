@@ -1,37 +1,233 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 from time import perf_counter
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, Iterator, List, Optional, Sequence, Set, Tuple
 
+from .branch_depth import (
+    AdaptiveDepthPolicy,
+    RankedBranch,
+    fused_top_k_is_stable,
+    language_selectivity,
+    top_k_has_clear_margin,
+)
+from .caching import QueryEmbeddingCache, TTLCache, normalize_cache_text
 from .config import settings
 from .corrective_rag_graph import (
     CorrectiveRagWorkflow,
     build_corrective_llm_client_from_env,
+    normalize_dialogue_context,
+)
+from .documents import BranchQuery, RetrievedDocument
+from .embedder import SharedSentenceEmbedder
+from .embedding_pool import ProcessPoolDocumentEmbedder
+from .embedding_store import PersistentEmbeddingStore, embed_with_store
+from .es_search import ElasticsearchMultiSearch, is_rejected_request
+from .fusion import ScoredHit, chunk_key, scored_hits, select_top_hits, weighted_rrf
+from .index_writer import (
+    ElasticsearchBulkWriter,
+    delete_documents,
+    document_store_mapping,
+    drop_index,
+    existing_chunk_hashes,
+    swap_alias,
+    versioned_index_name,
 )
-from .indexing import build_chunk_records, load_corpus_records
+from .indexing import batched, chunk_fingerprint, iter_chunk_records, iter_corpus_records, make_snippet
 from .logger import get_logger
 
+if TYPE_CHECKING:
+    # Imported lazily at runtime, only when the in-memory backend is selected.
+    from .memory_backend import InMemoryRetrievalBackend
+
 logger = get_logger("retrieval-service")
 
 
 class RetrievalService:
     def __init__(self) -> None:
-        self._document_store = None
-        self._retriever = None
-        self._pipeline_single = None
-        self._pipeline_dual = None
-        self._dense_retriever = None
-        self._pipeline_dense_single = None
-        self._pipeline_dense_dual = None
-        self._query_embedder = None
-        self._document_embedder = None
+        self._document_store: Any = None
+        self._retriever: Any = None
+        self._pipeline_single: Any = None
+        self._query_joiner: Any = None
+        self._dense_retriever: Any = None
+        self._pipeline_dense_single: Any = None
+        self._embedder: Optional[SharedSentenceEmbedder] = None
+        self._es_search: Optional[ElasticsearchMultiSearch] = None
+        self._embedding_cache = QueryEmbeddingCache(
+            maxsize=settings.retrieval_embed_cache_size,
+            ttl_seconds=settings.retrieval_embed_cache_ttl_s,
+            persist_path=settings.retrieval_embed_cache_path or None,
+            logger=logger,
+        )
+        self._embedding_cache.load()
+        # Document vectors by chunk text; opened on first use so BM25-only workers skip numpy.
+        self._embedding_store: Optional[PersistentEmbeddingStore] = None
+        self._embedding_store_checked = False
+        # Index-time only: CPU workers that each hold a model copy (RETRIEVAL_EMBED_WORKERS > 0).
+        # Started on the first batch of an /index call and shut down when that call returns.
+        self._embedding_pool: Optional[ProcessPoolDocumentEmbedder] = None
+        # Bumped by every /index call; part of the response-cache key so stale hits vanish.
+        self._index_generation = 0
+        self._response_cache: TTLCache[Dict[str, Any]] = TTLCache(
+            maxsize=settings.retrieval_response_cache_size,
+            ttl_seconds=settings.retrieval_response_cache_ttl_s,
+        )
+        # Corrective-loop grades (by query + result fingerprint) and rewrites (by query + context).
+        self._grade_cache: TTLCache[Dict[str, Any]] = TTLCache(
+            maxsize=settings.retrieval_corrective_cache_size,
+            ttl_seconds=settings.retrieval_corrective_cache_ttl_s,
+        )
+        self._rewrite_cache: TTLCache[Dict[str, str]] = TTLCache(
+            maxsize=settings.retrieval_corrective_cache_size,
+            ttl_seconds=settings.retrieval_corrective_cache_ttl_s,
+        )
+        # (index generation, chunks per language) for adaptive branch depth.
+        self._language_counts: Optional[Tuple[int, Optional[Dict[str, int]]]] = None
         self._index_name = settings.elasticsearch_index
         self._bootstrap_error: Optional[str] = None
         self._pipeline_warning: Optional[str] = None
         self._dense_warning: Optional[str] = None
         self._corrective_workflow: Optional[CorrectiveRagWorkflow] = None
-        self._init_haystack()
+        # Set when the cluster rejects the rrf retriever; es_rrf stays off until restart.
+        self._server_hybrid_error: Optional[str] = None
+        # Per-query branch calls (bm25/dense x original/en) fan out onto this pool.
+        self._branch_executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.retrieval_branch_workers),
+            thread_name_prefix="retrieval-branch",
+        )
+        # Set only with RETRIEVAL_BACKEND=memory; serves every branch in-process.
+        self._memory_backend: Optional[InMemoryRetrievalBackend] = None
+        self._backend = "memory" if settings.retrieval_backend == "memory" else "elasticsearch"
+        if self._backend == "memory":
+            self._init_memory_backend()
+        else:
+            self._init_haystack()
+
+    def _init_memory_backend(self) -> None:
+        if settings.retrieval_dense_enabled and self._embedder is None:
+            try:
+                self._embedder = SharedSentenceEmbedder(
+                    model=settings.retrieval_embed_model,
+                    batch_size=settings.retrieval_embed_batch_size,
+                )
+            except Exception as err:
+                self._dense_warning = f"Dense retrieval unavailable; using BM25 only. Detail: {err}"
+                logger.warning(self._dense_warning)
+        try:
+            if settings.retrieval_snapshot_path and self._open_snapshot():
+                self._bootstrap_error = None
+                return
+            self._load_memory_backend(settings.default_corpus_path, chunk_size=900, chunk_overlap=100)
+            self._bootstrap_error = None
+        except Exception as err:
+            self._bootstrap_error = f"In-memory retrieval backend unavailable. Detail: {err}"
+            logger.warning(self._bootstrap_error)
+
+    def _open_snapshot(self) -> bool:
+        from .memory_backend import InMemoryRetrievalBackend, snapshot_exists
+
+        if not snapshot_exists(settings.retrieval_snapshot_path):
+            return False
+        started = perf_counter()
+        backend = InMemoryRetrievalBackend.load_snapshot(settings.retrieval_snapshot_path)
+        snapshot_model = backend.metadata.get("embed_model")
+        if backend.vectors is not None and snapshot_model != settings.retrieval_embed_model:
+            logger.warning(
+                f"[retrieval] snapshot vectors were built with {snapshot_model}; "
+                f"serving BM25 only from the snapshot"
+            )
+            backend.vectors = None
+        self._memory_backend = backend
+        if settings.retrieval_log_timing:
+            elapsed = (perf_counter() - started) * 1000.0
+            logger.info(
+                f"[retrieval] mode=memory_snapshot_open path={settings.retrieval_snapshot_path} "
+                f"chunks={len(backend)} elapsed_ms={elapsed:.1f}"
+            )
+        return True
+
+    def _load_memory_backend(
+        self,
+        path: str,
+        *,
+        chunk_size: int,
+        chunk_overlap: int,
+        snapshot: bool = False,
+        activate: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Chunk (and embed) the corpus into a fresh in-memory engine, then swap it in whole
+        so concurrent searches never see a half-built index. With `snapshot`, the engine
+        is also written to `RETRIEVAL_SNAPSHOT_PATH` and served from the mapped files.
+        """
+        from .memory_backend import InMemoryRetrievalBackend
+
+        if snapshot and not settings.retrieval_snapshot_path:
+            raise ValueError("Snapshot requested but RETRIEVAL_SNAPSHOT_PATH is not set")
+
+        started = perf_counter()
+        records = list(iter_corpus_records(path))
+        documents: List[RetrievedDocument] = []
+        chunks = iter_chunk_records(records, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        for batch in batched(chunks, settings.retrieval_index_batch_size):
+            docs = [
+                RetrievedDocument(id=chunk["chunk_id"], content=chunk["content"], meta=self._chunk_meta(chunk))
+                for chunk in batch
+            ]
+            documents.extend(self._maybe_embed_documents(docs))
+        backend = InMemoryRetrievalBackend.build(documents)
+
+        snapshot_path = None
+        if snapshot:
+            snapshot_path = str(
+                backend.save_snapshot(
+                    settings.retrieval_snapshot_path,
+                    metadata={
+                        "corpus_path": path,
+                        "chunk_size": chunk_size,
+                        "chunk_overlap": chunk_overlap,
+                        "embed_model": settings.retrieval_embed_model if backend.vectors is not None else None,
+                    },
+                )
+            )
+            # Serve from the mapped files too, so this worker shares pages with the others.
+            backend = InMemoryRetrievalBackend.load_snapshot(snapshot_path)
+        if activate:
+            self._memory_backend = backend
+
+        elapsed = (perf_counter() - started) * 1000.0
+        docs_per_second = len(documents) / (elapsed / 1000.0) if elapsed > 0 else 0.0
+        if settings.retrieval_log_timing:
+            logger.info(
+                f"[retrieval] mode=memory_index docs={len(records)} chunks={len(documents)} "
+                f"terms={len(backend.terms)} vectors={backend.vectors is not None} "
+                f"snapshot={snapshot_path} elapsed_ms={elapsed:.1f}"
+            )
+        return {
+            "indexed_documents": len(records),
+            "indexed_chunks": len(documents),
+            "index_name": self._index_name,
+            "elapsed_ms": round(elapsed, 1),
+            "docs_per_second": round(docs_per_second, 1),
+            "snapshot_path": snapshot_path,
+        }
+
+    @property
+    def backend_name(self) -> str:
+        return self._backend
+
+    @property
+    def _branch_backend(self) -> Any:
+        """Executes a whole branch plan in one call: the in-memory engine or `_msearch`."""
+        return self._memory_backend if self._memory_backend is not None else self._es_search
+
+    def _ready(self) -> bool:
+        return self._retriever is not None or self._memory_backend is not None
 
     def _init_haystack(self) -> None:
         try:
@@ -51,16 +247,18 @@ class RetrievalService:
         self._document_store = ElasticsearchDocumentStore(
             hosts=settings.elasticsearch_url,
             index=self._index_name,
+            **self._document_store_options(),
         )
         self._retriever = ElasticsearchBM25Retriever(document_store=self._document_store)
         self._pipeline_warning = None
+        self._init_multi_search()
 
         try:
             from haystack import Pipeline
             from haystack.components.joiners import DocumentJoiner
         except Exception as err:
             self._pipeline_single = None
-            self._pipeline_dual = None
+            self._query_joiner = None
             self._pipeline_warning = (
                 "Haystack pipeline components unavailable; using direct BM25 fallback. "
                 f"Detail: {err}"
@@ -76,28 +274,13 @@ class RetrievalService:
                 ElasticsearchBM25Retriever(document_store=self._document_store),
             )
 
-            dual = Pipeline()
-            dual.add_component(
-                "bm25_original",
-                ElasticsearchBM25Retriever(document_store=self._document_store),
-            )
-            dual.add_component(
-                "bm25_en",
-                ElasticsearchBM25Retriever(document_store=self._document_store),
-            )
-            dual.add_component(
-                "join",
-                DocumentJoiner(join_mode=settings.retrieval_query_join_mode),
-            )
-            dual.connect("bm25_original.documents", "join.documents")
-            dual.connect("bm25_en.documents", "join.documents")
-
             self._pipeline_single = single
-            self._pipeline_dual = dual
+            # Sub-queries run concurrently, so their rankings are joined outside the graph.
+            self._query_joiner = DocumentJoiner(join_mode=settings.retrieval_query_join_mode)
         except Exception as err:
             # Keep service available even if pipeline graph init fails.
             self._pipeline_single = None
-            self._pipeline_dual = None
+            self._query_joiner = None
             self._pipeline_warning = (
                 "Haystack pipeline graph unavailable; using direct BM25 fallback. "
                 f"Detail: {err}"
@@ -106,72 +289,34 @@ class RetrievalService:
 
         self._dense_retriever = None
         self._pipeline_dense_single = None
-        self._pipeline_dense_dual = None
-        self._query_embedder = None
-        self._document_embedder = None
         self._dense_warning = None
 
         if settings.retrieval_dense_enabled:
             try:
                 from haystack import Pipeline
-                from haystack.components.embedders import (
-                    SentenceTransformersDocumentEmbedder,
-                    SentenceTransformersTextEmbedder,
-                )
-                from haystack.components.joiners import DocumentJoiner
                 from haystack_integrations.components.retrievers.elasticsearch import (
                     ElasticsearchEmbeddingRetriever,
                 )
 
-                self._query_embedder = SentenceTransformersTextEmbedder(
-                    model=settings.retrieval_embed_model
-                )
-                self._document_embedder = SentenceTransformersDocumentEmbedder(
-                    model=settings.retrieval_embed_model
-                )
-                # Warmup may download/load model; keep service alive if this fails.
-                self._query_embedder.warm_up()
-                self._document_embedder.warm_up()
+                # Model load may download weights; keep service alive if this fails.
+                # The instance survives index resets so the model is loaded once per worker.
+                if self._embedder is None:
+                    self._embedder = SharedSentenceEmbedder(
+                        model=settings.retrieval_embed_model,
+                        batch_size=settings.retrieval_embed_batch_size,
+                    )
                 self._dense_retriever = ElasticsearchEmbeddingRetriever(
                     document_store=self._document_store
                 )
 
+                # Query embeddings come from the cached embedder, so the graph is retrieval-only.
                 dense_single = Pipeline()
-                dense_single.add_component("query_embedder", self._query_embedder)
                 dense_single.add_component(
                     "dense",
                     ElasticsearchEmbeddingRetriever(document_store=self._document_store),
                 )
-                dense_single.connect("query_embedder.embedding", "dense.query_embedding")
-
-                dense_dual = Pipeline()
-                dense_dual.add_component(
-                    "query_embedder_original",
-                    SentenceTransformersTextEmbedder(model=settings.retrieval_embed_model),
-                )
-                dense_dual.add_component(
-                    "query_embedder_en",
-                    SentenceTransformersTextEmbedder(model=settings.retrieval_embed_model),
-                )
-                dense_dual.add_component(
-                    "dense_original",
-                    ElasticsearchEmbeddingRetriever(document_store=self._document_store),
-                )
-                dense_dual.add_component(
-                    "dense_en",
-                    ElasticsearchEmbeddingRetriever(document_store=self._document_store),
-                )
-                dense_dual.add_component(
-                    "join",
-                    DocumentJoiner(join_mode=settings.retrieval_query_join_mode),
-                )
-                dense_dual.connect("query_embedder_original.embedding", "dense_original.query_embedding")
-                dense_dual.connect("query_embedder_en.embedding", "dense_en.query_embedding")
-                dense_dual.connect("dense_original.documents", "join.documents")
-                dense_dual.connect("dense_en.documents", "join.documents")
 
                 self._pipeline_dense_single = dense_single
-                self._pipeline_dense_dual = dense_dual
             except Exception as err:
                 self._dense_warning = (
                     "Dense retrieval unavailable; using BM25 only. "
@@ -181,7 +326,45 @@ class RetrievalService:
 
         self._bootstrap_error = None
 
+    @staticmethod
+    def _document_store_options() -> Dict[str, Any]:
+        # Only applies when the store creates the index; existing indexes keep their mapping.
+        if not settings.retrieval_vector_index_type:
+            return {}
+        return {"custom_mapping": document_store_mapping(settings.retrieval_vector_index_type)}
+
+    def _init_multi_search(self) -> None:
+        # The pooled client outlives index resets, so only build it once per worker.
+        if self._es_search is not None or not settings.retrieval_msearch_enabled:
+            return
+        try:
+            self._es_search = ElasticsearchMultiSearch(
+                hosts=settings.elasticsearch_url,
+                index=self._index_name,
+                connections_per_node=settings.elasticsearch_connections_per_node,
+                request_timeout_s=settings.elasticsearch_request_timeout_s,
+                rescore_oversample=settings.retrieval_vector_rescore_oversample,
+                snippet_mode=settings.retrieval_snippet_mode,
+            )
+        except Exception as err:
+            self._es_search = None
+            logger.warning(f"[retrieval] msearch client unavailable; using per-branch pipelines ({err})")
+
+    def server_hybrid_status(self) -> Optional[Dict[str, Any]]:
+        if settings.retrieval_hybrid_mode != "es_rrf":
+            return None
+        return {
+            "enabled": self._server_hybrid_error is None,
+            "disabled_reason": self._server_hybrid_error,
+        }
+
+    def elasticsearch_reachable(self) -> Optional[bool]:
+        # None with the memory backend: it never talks to Elasticsearch (see `backend_name`).
+        return None if self.backend_name == "memory" else self.ping()
+
     def ping(self) -> bool:
+        if self.backend_name == "memory":
+            return self._memory_backend is not None
         if self._document_store is None:
             return False
         try:
@@ -212,57 +395,301 @@ class RetrievalService:
         recreate_index: bool = False,
         chunk_size: int = 900,
         chunk_overlap: int = 100,
+        incremental: bool = False,
+        snapshot: bool = False,
     ) -> Dict[str, Any]:
+        if self.backend_name == "memory" or snapshot:
+            # Rebuilding in memory is cheap, so every call is a full rebuild. On the
+            # Elasticsearch backend a snapshot run only compiles files for memory workers.
+            try:
+                return self._load_memory_backend(
+                    path or settings.default_corpus_path,
+                    chunk_size=chunk_size,
+                    chunk_overlap=chunk_overlap,
+                    snapshot=snapshot,
+                    activate=self.backend_name == "memory",
+                )
+            finally:
+                self._close_embedding_pool(wait=True)
+                self._bump_index_generation()
         if self._document_store is None:
             raise RuntimeError(self._bootstrap_error or "Document store not initialized")
 
-        records = load_corpus_records(path or settings.default_corpus_path)
-        chunks = build_chunk_records(records, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        records = iter_corpus_records(path or settings.default_corpus_path)
+        try:
+            if recreate_index and settings.retrieval_index_alias_enabled:
+                return self._index_blue_green(records, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+            return self._index_stream(
+                records,
+                recreate_index=recreate_index,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                incremental=incremental,
+            )
+        finally:
+            self._close_embedding_pool(wait=True)
+            if self._embedding_store is not None:
+                self._embedding_store.flush()
+            self._bump_index_generation()
+
+    def _index_blue_green(
+        self,
+        records: Iterator[Dict[str, Any]],
+        *,
+        chunk_size: int,
+        chunk_overlap: int,
+    ) -> Dict[str, Any]:
+        """
+        Rebuild into a fresh versioned index and atomically repoint the alias, so searches
+        keep hitting the previous index until the new one is complete.
+        """
+        from haystack_integrations.document_stores.elasticsearch import (
+            ElasticsearchDocumentStore,
+        )
+
+        client = self._es_client()
+        target = versioned_index_name(self._index_name)
+        store = ElasticsearchDocumentStore(
+            hosts=settings.elasticsearch_url,
+            index=target,
+            **self._document_store_options(),
+        )
+        try:
+            result = self._index_stream(
+                records,
+                recreate_index=False,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                document_store=store,
+                index_name=target,
+            )
+            retired = swap_alias(client, self._index_name, target)
+        except Exception:
+            try:
+                client.indices.delete(index=target, ignore_unavailable=True)
+            except Exception as cleanup_err:
+                logger.warning(f"[retrieval] could not drop partial index {target} ({cleanup_err})")
+            raise
+
+        for old_index in retired:
+            try:
+                client.indices.delete(index=old_index, ignore_unavailable=True)
+            except Exception as err:
+                logger.warning(f"[retrieval] could not drop retired index {old_index} ({err})")
+        result["physical_index"] = target
+        return result
+
+    @staticmethod
+    def _chunk_meta(chunk: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "chunk_id": chunk["chunk_id"],
+            "doc_id": chunk["doc_id"],
+            "chunk_index": chunk["chunk_index"],
+            "title": chunk["title"],
+            "url": chunk["url"],
+            "source": chunk["source"],
+            "language": chunk["language"],
+            "published_at": chunk["published_at"],
+            "snippet": chunk.get("snippet") or make_snippet(chunk["content"]),
+            "content_hash": chunk.get("content_hash"),
+        }
+
+    @staticmethod
+    def _mark_unembedded(
+        docs: List[Any],
+        chunks: List[Dict[str, Any]],
+        *,
+        chunk_size: int,
+        chunk_overlap: int,
+    ) -> None:
+        """
+        Re-fingerprint docs whose embedding failed as BM25-only, so the next incremental
+        run sees a hash mismatch and embeds them instead of skipping them forever.
+        """
+        by_chunk_id = {chunk["chunk_id"]: chunk for chunk in chunks}
+        for doc in docs:
+            chunk = by_chunk_id.get(doc.meta.get("chunk_id"))
+            if getattr(doc, "embedding", None) is not None or chunk is None:
+                continue
+            doc.meta["content_hash"] = chunk_fingerprint(chunk, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    def _fingerprint_model(self) -> str:
+        # Vectors are part of the stored chunk only when they are actually written.
+        if settings.retrieval_dense_enabled and settings.retrieval_write_embeddings and self._embedder is not None:
+            return settings.retrieval_embed_model
+        return ""
+
+    def _es_client(self) -> Any:
+        if self._es_search is not None:
+            return self._es_search.client
+        return self._document_store.client
+
+    def _index_stream(
+        self,
+        records: Iterator[Dict[str, Any]],
+        *,
+        recreate_index: bool,
+        chunk_size: int,
+        chunk_overlap: int,
+        incremental: bool = False,
+        document_store: Any = None,
+        index_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Read line -> chunk -> embed -> write in fixed-size batches, so memory stays bounded
+        by the batch size and the first writes land before the corpus is fully read.
 
+        With `incremental`, chunks whose fingerprint matches the stored `content_hash` are
+        skipped before embedding, and superseded or orphaned chunk versions are deleted.
+        """
         from haystack import Document
         from haystack.document_stores.types import DuplicatePolicy
 
         if recreate_index:
             self._reset_index_hard()
+        incremental = incremental and not recreate_index
+        store = document_store or self._document_store
+        target_index = index_name or self._index_name
 
-        docs = []
-        for chunk in chunks:
-            meta = {
-                "chunk_id": chunk["chunk_id"],
-                "doc_id": chunk["doc_id"],
-                "chunk_index": chunk["chunk_index"],
-                "title": chunk["title"],
-                "url": chunk["url"],
-                "source": chunk["source"],
-                "language": chunk["language"],
-                "published_at": chunk["published_at"],
-            }
-            docs.append(Document(content=chunk["content"], meta=meta))
+        record_count = 0
+
+        def counted(source: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            nonlocal record_count
+            for record in source:
+                record_count += 1
+                yield record
 
-        docs = self._maybe_embed_documents(docs)
-        self._document_store.write_documents(docs, policy=DuplicatePolicy.OVERWRITE)
+        started = perf_counter()
+        # Creates the index with the store's mapping before scans or bulk actions reference it.
+        store.count_documents()
+        existing = existing_chunk_hashes(self._es_client(), target_index) if incremental else {}
+        embed_model = self._fingerprint_model()
+        seen_chunk_ids: Set[str] = set()
+        superseded_ids: List[str] = []
+        written_ids: Set[str] = set()
+        skipped_count = 0
+
+        def changed(source: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            nonlocal skipped_count
+            for chunk in source:
+                chunk["content_hash"] = chunk_fingerprint(
+                    chunk,
+                    chunk_size=chunk_size,
+                    chunk_overlap=chunk_overlap,
+                    embed_model=embed_model,
+                )
+                if incremental:
+                    seen_chunk_ids.add(chunk["chunk_id"])
+                    prior = existing.get(chunk["chunk_id"], [])
+                    if len(prior) == 1 and prior[0][1] == chunk["content_hash"]:
+                        skipped_count += 1
+                        continue
+                    superseded_ids.extend(doc_id for doc_id, _hash in prior)
+                yield chunk
+
+        def to_documents(batch: List[Dict[str, Any]]) -> List[Any]:
+            docs = [Document(content=chunk["content"], meta=self._chunk_meta(chunk)) for chunk in batch]
+            if incremental:
+                written_ids.update(doc.id for doc in docs)
+            docs = self._maybe_embed_documents(docs)
+            if embed_model:
+                self._mark_unembedded(docs, batch, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+            return docs
+
+        def stale_ids() -> List[str]:
+            orphaned = [
+                doc_id
+                for chunk_id, versions in existing.items()
+                if chunk_id not in seen_chunk_ids
+                for doc_id, _hash in versions
+            ]
+            # A rewritten chunk may keep its _id; never delete what this run just wrote.
+            return [doc_id for doc_id in superseded_ids + orphaned if doc_id not in written_ids]
+
+        writer = self._bulk_writer(target_index)
+        chunk_count = 0
+        deleted_count = 0
+        chunks = changed(iter_chunk_records(counted(records), chunk_size=chunk_size, chunk_overlap=chunk_overlap))
+        if writer is None:
+            for batch in batched(chunks, settings.retrieval_index_batch_size):
+                docs = to_documents(batch)
+                store.write_documents(docs, policy=DuplicatePolicy.OVERWRITE)
+                chunk_count += len(docs)
+            if incremental:
+                deleted = stale_ids()
+                if deleted:
+                    store.delete_documents(deleted)
+                deleted_count = len(deleted)
+        else:
+            # Double-buffer: embed batch N+1 while batch N is being bulk-written.
+            with writer.ingest(), ThreadPoolExecutor(max_workers=1) as write_executor:
+                pending = None
+                for batch in batched(chunks, settings.retrieval_index_batch_size):
+                    docs = to_documents(batch)
+                    if pending is not None:
+                        chunk_count += pending.result()
+                    pending = write_executor.submit(writer.write, docs)
+                if pending is not None:
+                    chunk_count += pending.result()
+                if incremental:
+                    # Inside ingest() so the closing refresh publishes writes and deletes together.
+                    deleted_count = delete_documents(writer.client, target_index, stale_ids())
+
+        elapsed = (perf_counter() - started) * 1000.0
+        docs_per_second = chunk_count / (elapsed / 1000.0) if elapsed > 0 else 0.0
+        worker_stats = self._embedding_pool.stats() if self._embedding_pool is not None else None
+        if settings.retrieval_log_timing:
+            logger.info(
+                f"[retrieval] mode=index writer={'parallel_bulk' if writer else 'document_store'} "
+                f"incremental={incremental} docs={record_count} chunks={chunk_count} "
+                f"skipped={skipped_count} deleted={deleted_count} elapsed_ms={elapsed:.1f} "
+                f"docs_per_second={docs_per_second:.1f}"
+            )
+            for worker in worker_stats or []:
+                logger.info(
+                    f"[retrieval] mode=index_embed_worker worker={worker['worker']} "
+                    f"texts={worker['texts']} texts_per_second={worker['texts_per_second']}"
+                )
         return {
-            "indexed_documents": len(records),
-            "indexed_chunks": len(docs),
+            "indexed_documents": record_count,
+            "indexed_chunks": chunk_count,
             "index_name": self._index_name,
+            "elapsed_ms": round(elapsed, 1),
+            "docs_per_second": round(docs_per_second, 1),
+            "skipped_chunks": skipped_count,
+            "deleted_chunks": deleted_count,
+            "embedding_workers": worker_stats,
         }
 
+    def _bulk_writer(self, index_name: Optional[str] = None) -> Optional[ElasticsearchBulkWriter]:
+        if not settings.retrieval_bulk_writer_enabled or self._es_search is None:
+            return None
+        try:
+            return ElasticsearchBulkWriter(
+                client=self._es_search.client,
+                index=index_name or self._index_name,
+                chunk_size=settings.retrieval_bulk_chunk_size,
+                thread_count=settings.retrieval_bulk_threads,
+                max_retries=settings.retrieval_bulk_max_retries,
+                backoff_s=settings.retrieval_bulk_backoff_s,
+                logger=logger,
+            )
+        except Exception as err:
+            logger.warning(f"[retrieval] bulk writer unavailable; using document store writes ({err})")
+            return None
+
     def _reset_index_hard(self) -> None:
         """
-        Hard-reset index so stale docs from prior runs cannot leak into results.
+        Hard-reset index so stale docs from prior runs cannot leak into results. A name
+        that a blue/green rebuild left as an alias is resolved to the indices behind it.
+        Raises instead of indexing on top of the old docs when the reset fails.
         """
         try:
-            from elasticsearch import Elasticsearch
-
-            client = Elasticsearch(settings.elasticsearch_url)
-            client.indices.delete(index=self._index_name, ignore_unavailable=True)
-            client.close()
-        except Exception:
-            # Fall back to document-store deletion if direct index delete is unavailable.
-            try:
-                self._document_store.delete_documents()
-            except Exception:
-                pass
+            dropped = drop_index(self._es_client(), self._index_name)
+        except Exception as err:
+            raise RuntimeError(f"Could not reset index {self._index_name}: {err}") from err
+        if settings.retrieval_log_timing:
+            logger.info(f"[retrieval] mode=index_reset name={self._index_name} dropped={','.join(dropped) or '-'}")
 
         # Reinitialize store/retriever so they point to a fresh index state.
         self._init_haystack()
@@ -272,12 +699,19 @@ class RetrievalService:
             return docs
         if not settings.retrieval_dense_enabled or not settings.retrieval_write_embeddings:
             return docs
-        if self._document_embedder is None:
+        if self._embedder is None:
             return docs
         try:
             started = perf_counter()
-            output = self._document_embedder.run(documents=docs)
-            embedded_docs = output.get("documents", docs)
+            store = self._document_embedding_store()
+            try:
+                embedded_docs = embed_with_store(store, docs, self._document_embed_fn())
+            except BrokenProcessPool as err:
+                # A worker died (e.g. OOM-killed). Drop the pool so the next batch gets a
+                # fresh one, and embed this batch in-process instead of writing it BM25-only.
+                logger.warning(f"[retrieval] embedding worker pool broke; embedding batch in-process ({err})")
+                self._close_embedding_pool()
+                embedded_docs = embed_with_store(store, docs, self._embedder.embed_documents)
             if settings.retrieval_log_timing:
                 elapsed = (perf_counter() - started) * 1000.0
                 logger.info(
@@ -286,27 +720,85 @@ class RetrievalService:
                 )
             return embedded_docs
         except Exception as err:
-            if settings.retrieval_log_timing:
-                logger.warning(
-                    f"[retrieval] dense document embedding failed; indexing BM25-only docs ({err})"
-                )
+            logger.warning(f"[retrieval] dense document embedding failed; indexing BM25-only docs ({err})")
             return docs
 
+    def _close_embedding_pool(self, *, wait: bool = False) -> None:
+        pool, self._embedding_pool = self._embedding_pool, None
+        if pool is not None:
+            pool.close(wait=wait)
+
+    def _document_embed_fn(self) -> Callable[[List[Any]], List[Any]]:
+        if settings.retrieval_embed_workers <= 0:
+            if self._embedder is None:
+                raise RuntimeError("Document embedder not initialized")
+            return self._embedder.embed_documents
+        if self._embedding_pool is None:
+            self._embedding_pool = ProcessPoolDocumentEmbedder(
+                model=settings.retrieval_embed_model,
+                workers=settings.retrieval_embed_workers,
+                batch_size=settings.retrieval_embed_batch_size,
+            )
+        return self._embedding_pool.embed_documents
+
+    def _document_embedding_store(self) -> Optional[PersistentEmbeddingStore]:
+        if self._embedding_store_checked or not settings.retrieval_embed_store_path:
+            return self._embedding_store
+        self._embedding_store_checked = True
+        try:
+            self._embedding_store = PersistentEmbeddingStore(
+                path=settings.retrieval_embed_store_path,
+                model=settings.retrieval_embed_model,
+                dtype=settings.retrieval_embed_store_dtype,
+                logger=logger,
+            )
+        except Exception as err:
+            logger.warning(f"[retrieval] embedding store unavailable; embedding every chunk ({err})")
+        return self._embedding_store
+
     def _resolve_branch_top_k(self, final_top_k: int) -> int:
-        if settings.retrieval_branch_top_k <= 0:
+        # Adaptive depth already picked the per-branch depth.
+        if settings.retrieval_branch_top_k <= 0 or self._adaptive_depth_enabled():
             return final_top_k
         return min(max(final_top_k, settings.retrieval_branch_top_k), settings.max_top_k)
 
     @staticmethod
     def _doc_chunk_id(doc: Any) -> str:
-        meta = doc.meta or {}
-        return str(meta.get("chunk_id") or f"{meta.get('doc_id', 'unknown')}::chunk::na")
+        return chunk_key(doc)
+
+    def _join_query_rankings(self, rankings: Sequence[List[Any]]) -> List[Any]:
+        if not rankings:
+            return []
+        if len(rankings) == 1:
+            return list(rankings[0])
+        if self._query_joiner is not None:
+            output = self._query_joiner.run(documents=list(rankings))
+            return output.get("documents", [])
+        return self._rrf_merge_documents(
+            ranked_lists=[(f"query_{idx}", docs) for idx, docs in enumerate(rankings)]
+        )
+
+    @staticmethod
+    def _prefilter_language(language: Optional[str]) -> Optional[str]:
+        return language if language and settings.retrieval_language_prefilter else None
 
-    def _run_legacy_bm25(self, queries: Sequence[str], top_k: int) -> List[Any]:
+    @staticmethod
+    def _haystack_filters(language: Optional[str]) -> Dict[str, Any]:
+        # Haystack 2.x filter syntax; the document store turns it into the same term filter.
+        if not language:
+            return {}
+        return {"filters": {"field": "meta.language", "operator": "==", "value": language}}
+
+    def _run_legacy_bm25(
+        self,
+        queries: Sequence[str],
+        top_k: int,
+        language: Optional[str] = None,
+    ) -> List[Any]:
         merged: "OrderedDict[str, Any]" = OrderedDict()
 
         for query in queries:
-            result = self._retriever.run(query=query, top_k=top_k)
+            result = self._retriever.run(query=query, top_k=top_k, **self._haystack_filters(language))
             docs = result.get("documents", [])
             for doc in docs:
                 key = self._doc_chunk_id(doc)
@@ -316,193 +808,662 @@ class RetrievalService:
 
         return sorted(merged.values(), key=lambda doc: float(doc.score or 0.0), reverse=True)
 
-    def _run_pipeline_bm25(self, queries: Sequence[str], top_k: int) -> List[Any]:
+    def _run_bm25_query(self, query: str, top_k: int, language: Optional[str] = None) -> List[Any]:
+        output = self._pipeline_single.run(
+            data={"bm25": {"query": query, "top_k": top_k, **self._haystack_filters(language)}},
+            include_outputs_from={"bm25"},
+        )
+        return output.get("bm25", {}).get("documents", [])
+
+    def _run_dense_query(
+        self,
+        embedding: List[float],
+        top_k: int,
+        language: Optional[str] = None,
+    ) -> List[Any]:
+        output = self._pipeline_dense_single.run(
+            data={"dense": {"query_embedding": embedding, "top_k": top_k, **self._haystack_filters(language)}},
+            include_outputs_from={"dense"},
+        )
+        return output.get("dense", {}).get("documents", [])
+
+    def _bm25_calls(
+        self,
+        queries: Sequence[str],
+        top_k: int,
+        language: Optional[str] = None,
+        offset: int = 0,
+    ) -> List[Callable[[], List[Any]]]:
+        if top_k <= offset:
+            return []
         if self._pipeline_single is None:
-            return self._run_legacy_bm25(queries, top_k)
+            return [partial(self._run_legacy_bm25, queries, top_k, language)]
+        branch_top_k = top_k if len(queries) == 1 else self._resolve_branch_top_k(top_k)
+        return [partial(self._run_bm25_query, query, branch_top_k, language) for query in queries]
 
+    def _dense_calls(
+        self,
+        queries: Sequence[str],
+        top_k: int,
+        language: Optional[str] = None,
+        offset: int = 0,
+    ) -> List[Callable[[], List[Any]]]:
+        if top_k <= offset or not self._dense_available() or self._pipeline_dense_single is None:
+            return []
         try:
-            if len(queries) == 1:
-                started = perf_counter()
-                output = self._pipeline_single.run(
-                    data={"bm25": {"query": queries[0], "top_k": top_k}},
-                    include_outputs_from={"bm25"},
+            embeddings = self._embed_queries(queries)
+        except Exception as err:
+            if settings.retrieval_log_timing:
+                logger.warning(f"[retrieval] query embedding failed; using BM25-only ({err})")
+            return []
+        return [partial(self._run_dense_query, embedding, top_k, language) for embedding in embeddings]
+
+    def _dense_available(self) -> bool:
+        return settings.retrieval_dense_enabled and self._embedder is not None
+
+    def _embed_queries(self, queries: Sequence[str]) -> List[List[float]]:
+        if self._embedder is None:
+            raise RuntimeError("Query embedder not initialized")
+        return self._embedding_cache.get_or_compute(
+            settings.retrieval_embed_model,
+            list(queries),
+            # All cache misses of a search (original + en) encode in one batched forward pass.
+            self._embedder.embed_queries,
+        )
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {
+            "query_embedding": self._embedding_cache.stats(),
+            "search_response": {
+                **self._response_cache.stats(),
+                "index_generation": self._index_generation,
+            },
+            "corrective_grade": self._grade_cache.stats(),
+            "corrective_rewrite": self._rewrite_cache.stats(),
+            "document_embedding_store": (
+                self._embedding_store.stats() if self._embedding_store is not None else None
+            ),
+        }
+
+    def close(self) -> None:
+        self._embedding_cache.save()
+        self._close_embedding_pool()
+        if self._embedding_store is not None:
+            self._embedding_store.flush()
+        self._branch_executor.shutdown(wait=False)
+        if self._corrective_workflow is not None:
+            self._corrective_workflow.close()
+        if self._es_search is not None:
+            self._es_search.close()
+
+    def _branch_plan(
+        self,
+        queries: Sequence[str],
+        bm25_top_k: int,
+        dense_top_k: int,
+        language: Optional[str] = None,
+        embeddings: Optional[Dict[str, List[float]]] = None,
+        offset: int = 0,
+    ) -> List[BranchQuery]:
+        """
+        `embeddings` (query text -> vector) comes from a batched encode of many searches;
+        a query missing from it gets no dense branch. With an `offset`, each branch asks
+        only for ranks `offset..depth`, and a branch no deeper than `offset` is left out.
+        """
+        branch_top_k = bm25_top_k if len(queries) == 1 else self._resolve_branch_top_k(bm25_top_k)
+        plan = [
+            BranchQuery(branch="bm25", query=query, top_k=branch_top_k, language=language, offset=offset)
+            for query in queries
+            if branch_top_k > offset
+        ]
+
+        wants_dense = dense_top_k > offset and self._dense_available()
+        if wants_dense and (embeddings is None or all(query in embeddings for query in queries)):
+            try:
+                vectors = self._embed_queries(queries) if embeddings is None else [embeddings[q] for q in queries]
+                plan.extend(
+                    BranchQuery(
+                        branch="dense",
+                        query=query,
+                        top_k=dense_top_k,
+                        embedding=embedding,
+                        language=language,
+                        offset=offset,
+                    )
+                    for query, embedding in zip(queries, vectors)
                 )
-                docs = output.get("bm25", {}).get("documents", [])
+            except Exception as err:
                 if settings.retrieval_log_timing:
-                    elapsed = (perf_counter() - started) * 1000.0
-                    logger.info(
-                        f"[retrieval] mode=bm25_pipeline_single "
-                        f"query_len={len(queries[0])} docs={len(docs)} elapsed_ms={elapsed:.1f}"
-                    )
-                return docs
+                    logger.warning(f"[retrieval] query embedding failed; using BM25-only ({err})")
+        return plan
 
-            if self._pipeline_dual is None:
-                return self._run_legacy_bm25(queries, top_k)
+    def _run_msearch(
+        self,
+        queries: Sequence[str],
+        bm25_top_k: int,
+        dense_top_k: int,
+        language: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Any], List[Any]]:
+        """
+        Pack original/en x bm25/dense into a single `_msearch` round trip
+        (or one in-process call with the memory backend).
+        """
+        started = perf_counter()
+        plan = self._branch_plan(queries, bm25_top_k, dense_top_k, language, offset=offset)
+        rankings = self._branch_backend.search_many(plan)
+        bm25_docs, dense_docs = self._join_plan_rankings(plan, rankings)
+        if settings.retrieval_log_timing:
+            elapsed = (perf_counter() - started) * 1000.0
+            logger.info(
+                f"[retrieval] mode={'memory' if self._memory_backend is not None else 'msearch'} "
+                f"queries={len(queries)} searches={len(plan)} language={language or '*'} "
+                f"bm25_docs={len(bm25_docs)} dense_docs={len(dense_docs)} "
+                f"join={settings.retrieval_query_join_mode} elapsed_ms={elapsed:.1f}"
+            )
+        return bm25_docs, dense_docs
 
-            branch_top_k = self._resolve_branch_top_k(top_k)
-            started = perf_counter()
-            output = self._pipeline_dual.run(
-                data={
-                    "bm25_original": {"query": queries[0], "top_k": branch_top_k},
-                    "bm25_en": {"query": queries[1], "top_k": branch_top_k},
-                },
-                include_outputs_from={"bm25_original", "bm25_en", "join"},
-            )
-            docs = output.get("join", {}).get("documents", [])
-            if settings.retrieval_log_timing:
-                elapsed = (perf_counter() - started) * 1000.0
-                count_original = len(output.get("bm25_original", {}).get("documents", []))
-                count_en = len(output.get("bm25_en", {}).get("documents", []))
-                logger.info(
-                    f"[retrieval] mode=bm25_pipeline_dual join={settings.retrieval_query_join_mode} "
-                    f"branch_top_k={branch_top_k} original_docs={count_original} "
-                    f"query_en_docs={count_en} merged_docs={len(docs)} elapsed_ms={elapsed:.1f}"
-                )
-            return docs
+    def _join_plan_rankings(
+        self,
+        plan: Sequence[BranchQuery],
+        rankings: Sequence[List[Any]],
+    ) -> Tuple[List[Any], List[Any]]:
+        bm25_docs = self._join_query_rankings(
+            [docs for query, docs in zip(plan, rankings) if query.branch == "bm25"]
+        )
+        dense_rankings = [docs for query, docs in zip(plan, rankings) if query.branch == "dense"]
+        dense_docs = self._join_query_rankings(dense_rankings) if dense_rankings else []
+        return bm25_docs, dense_docs
+
+    def _server_hybrid_enabled(self) -> bool:
+        return (
+            settings.retrieval_hybrid_mode == "es_rrf"
+            and self._server_hybrid_error is None
+            and self._memory_backend is None
+            and self._es_search is not None
+            and self._dense_available()
+        )
+
+    def _run_server_hybrid(
+        self,
+        queries: Sequence[str],
+        top_k: int,
+        dense_top_k: int,
+        language: Optional[str] = None,
+    ) -> Optional[List[Any]]:
+        """
+        Let Elasticsearch fuse BM25 + kNN (rrf retriever) and return only the final top_k.
+        Returns None when the client-side fusion path should be used instead.
+        """
+        if self._es_search is None:
+            return None
+        started = perf_counter()
+        try:
+            plan = self._branch_plan(queries, top_k, dense_top_k, language)
+            if not any(query.branch == "dense" for query in plan):
+                return None
+            docs = self._es_search.search_hybrid(plan, top_k=top_k, rank_constant=int(settings.retrieval_rrf_k))
         except Exception as err:
+            if is_rejected_request(err):
+                if self._server_hybrid_error is None:
+                    self._server_hybrid_error = str(err)
+                    logger.warning(
+                        f"[retrieval] es_rrf hybrid rejected by the cluster; using client-side fusion "
+                        f"until restart ({err})"
+                    )
+                return None
             if settings.retrieval_log_timing:
-                logger.warning(f"[retrieval] pipeline run failed; falling back to legacy bm25 ({err})")
-            return self._run_legacy_bm25(queries, top_k)
+                logger.warning(f"[retrieval] es_rrf hybrid failed; using client-side fusion ({err})")
+            return None
+        if settings.retrieval_log_timing:
+            elapsed = (perf_counter() - started) * 1000.0
+            logger.info(
+                f"[retrieval] mode=es_rrf_hybrid queries={len(queries)} retrievers={len(plan)} "
+                f"docs={len(docs)} elapsed_ms={elapsed:.1f}"
+            )
+        return docs
 
-    def _run_pipeline_dense(self, queries: Sequence[str], top_k: int) -> List[Any]:
-        if not settings.retrieval_dense_enabled:
-            return []
-        if self._pipeline_dense_single is None:
-            return []
-        try:
-            if len(queries) == 1:
-                started = perf_counter()
-                output = self._pipeline_dense_single.run(
-                    data={
-                        "query_embedder": {"text": queries[0]},
-                        "dense": {"top_k": top_k},
-                    },
-                    include_outputs_from={"dense"},
+    def _branch_calls(
+        self,
+        queries: Sequence[str],
+        bm25_top_k: int,
+        dense_top_k: int,
+        language: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Callable[[], List[Any]]], List[Callable[[], List[Any]]]]:
+        return (
+            self._bm25_calls(queries, bm25_top_k, language, offset),
+            self._dense_calls(queries, dense_top_k, language, offset),
+        )
+
+    def _run_branches(
+        self,
+        queries: Sequence[str],
+        bm25_top_k: int,
+        dense_top_k: int,
+        language: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Any], List[Any]]:
+        """
+        Issue every BM25 and dense sub-query at once so latency is max(branch), not sum.
+        A `language` is pushed into every branch as a pre-filter; a non-zero `offset`
+        returns only the ranks below it (pipelines cannot page, so they are sliced).
+        """
+        if self._branch_backend is not None:
+            try:
+                return self._run_msearch(queries, bm25_top_k, dense_top_k, language, offset)
+            except Exception as err:
+                if self._memory_backend is not None:
+                    raise
+                if settings.retrieval_log_timing:
+                    logger.warning(f"[retrieval] msearch failed; using per-branch pipelines ({err})")
+
+        bm25_calls, dense_calls = self._branch_calls(queries, bm25_top_k, dense_top_k, language, offset)
+        started = perf_counter()
+        futures = [self._branch_executor.submit(call) for call in [*bm25_calls, *dense_calls]]
+        outcomes: List[Any] = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except Exception as err:
+                outcomes.append(err)
+        return self._finish_branches(queries, bm25_top_k, len(bm25_calls), outcomes, started, language, offset)
+
+    async def _run_branches_async(
+        self,
+        queries: Sequence[str],
+        bm25_top_k: int,
+        dense_top_k: int,
+        language: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Any], List[Any]]:
+        loop = asyncio.get_running_loop()
+        if self._branch_backend is not None:
+            try:
+                return await loop.run_in_executor(
+                    self._branch_executor,
+                    partial(self._run_msearch, queries, bm25_top_k, dense_top_k, language, offset),
                 )
-                docs = output.get("dense", {}).get("documents", [])
+            except Exception as err:
+                if self._memory_backend is not None:
+                    raise
                 if settings.retrieval_log_timing:
-                    elapsed = (perf_counter() - started) * 1000.0
-                    logger.info(
-                        f"[retrieval] mode=dense_pipeline_single model={settings.retrieval_embed_model} "
-                        f"query_len={len(queries[0])} docs={len(docs)} elapsed_ms={elapsed:.1f}"
-                    )
-                return docs
+                    logger.warning(f"[retrieval] msearch failed; using per-branch pipelines ({err})")
 
-            if self._pipeline_dense_dual is None:
-                return []
+        # Building the dense calls encodes the queries; keep that forward pass off the event loop.
+        bm25_calls, dense_calls = await loop.run_in_executor(
+            self._branch_executor,
+            partial(self._branch_calls, queries, bm25_top_k, dense_top_k, language, offset),
+        )
+        started = perf_counter()
+        outcomes = await asyncio.gather(
+            *(loop.run_in_executor(self._branch_executor, call) for call in [*bm25_calls, *dense_calls]),
+            return_exceptions=True,
+        )
+        return self._finish_branches(
+            queries, bm25_top_k, len(bm25_calls), list(outcomes), started, language, offset
+        )
 
-            started = perf_counter()
-            output = self._pipeline_dense_dual.run(
-                data={
-                    "query_embedder_original": {"text": queries[0]},
-                    "query_embedder_en": {"text": queries[1]},
-                    "dense_original": {"top_k": top_k},
-                    "dense_en": {"top_k": top_k},
-                },
-                include_outputs_from={"dense_original", "dense_en", "join"},
-            )
-            docs = output.get("join", {}).get("documents", [])
+    def _finish_branches(
+        self,
+        queries: Sequence[str],
+        bm25_top_k: int,
+        bm25_count: int,
+        outcomes: List[Any],
+        started: float,
+        language: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Any], List[Any]]:
+        if offset:
+            outcomes = [item if isinstance(item, BaseException) else item[offset:] for item in outcomes]
+        bm25_docs = self._collect_bm25(queries, bm25_top_k, outcomes[:bm25_count], language, offset)
+        dense_docs = self._collect_dense(outcomes[bm25_count:])
+        if settings.retrieval_log_timing:
+            elapsed = (perf_counter() - started) * 1000.0
+            logger.info(
+                f"[retrieval] mode=concurrent_branches queries={len(queries)} "
+                f"calls={len(outcomes)} bm25_docs={len(bm25_docs)} dense_docs={len(dense_docs)} "
+                f"join={settings.retrieval_query_join_mode} elapsed_ms={elapsed:.1f}"
+            )
+        return bm25_docs, dense_docs
+
+    @staticmethod
+    def _raise_failed(outcomes: Sequence[Any]) -> List[List[Any]]:
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        return list(outcomes)
+
+    def _collect_bm25(
+        self,
+        queries: Sequence[str],
+        top_k: int,
+        outcomes: Sequence[Any],
+        language: Optional[str] = None,
+        offset: int = 0,
+    ) -> List[Any]:
+        try:
+            return self._join_query_rankings(self._raise_failed(outcomes))
+        except Exception as err:
+            if self._pipeline_single is None:
+                raise
             if settings.retrieval_log_timing:
-                elapsed = (perf_counter() - started) * 1000.0
-                count_original = len(output.get("dense_original", {}).get("documents", []))
-                count_en = len(output.get("dense_en", {}).get("documents", []))
-                logger.info(
-                    f"[retrieval] mode=dense_pipeline_dual model={settings.retrieval_embed_model} "
-                    f"join={settings.retrieval_query_join_mode} original_docs={count_original} "
-                    f"query_en_docs={count_en} merged_docs={len(docs)} elapsed_ms={elapsed:.1f}"
-                )
-            return docs
+                logger.warning(f"[retrieval] pipeline run failed; falling back to legacy bm25 ({err})")
+            return self._run_legacy_bm25(queries, top_k, language)[offset:]
+
+    def _collect_dense(self, outcomes: Sequence[Any]) -> List[Any]:
+        if not outcomes:
+            return []
+        try:
+            return self._join_query_rankings(self._raise_failed(outcomes))
         except Exception as err:
             if settings.retrieval_log_timing:
                 logger.warning(f"[retrieval] dense pipeline failed; using BM25-only ({err})")
             return []
 
-    def _rrf_merge_documents(self, ranked_lists: Sequence[Tuple[str, List[Any]]]) -> List[Any]:
-        k = 60.0
-        scores: Dict[str, float] = {}
-        docs_by_chunk: Dict[str, Any] = {}
-        source_by_chunk: Dict[str, str] = {}
-
-        for source_name, ranked_docs in ranked_lists:
-            for rank, doc in enumerate(ranked_docs, start=1):
-                chunk_id = self._doc_chunk_id(doc)
-                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
-                if chunk_id not in docs_by_chunk:
-                    docs_by_chunk[chunk_id] = doc
-                    source_by_chunk[chunk_id] = source_name
-
-        ordered = sorted(scores.items(), key=lambda item: item[1], reverse=True)
-        fused_docs: List[Any] = []
-        for chunk_id, fused_score in ordered:
-            doc = docs_by_chunk[chunk_id]
-            try:
-                doc.score = fused_score
-            except Exception:
-                pass
-            fused_docs.append(doc)
+    @staticmethod
+    def _branch_weight(name: str) -> float:
+        return {
+            "bm25": settings.retrieval_rrf_bm25_weight,
+            "dense": settings.retrieval_rrf_dense_weight,
+        }.get(name, 1.0)
 
+    def _weighted_rrf(
+        self,
+        ranked_lists: Sequence[Tuple[str, List[Any]]],
+        top_k: Optional[int] = None,
+    ) -> List[ScoredHit]:
+        hits = weighted_rrf(
+            [docs for _name, docs in ranked_lists],
+            weights=[self._branch_weight(name) for name, _docs in ranked_lists],
+            k=settings.retrieval_rrf_k,
+            top_k=top_k,
+        )
         if settings.retrieval_log_timing:
             counts = ", ".join(f"{name}:{len(docs)}" for name, docs in ranked_lists)
             logger.info(
-                f"[retrieval] mode=rrf_merge lists=[{counts}] fused_docs={len(fused_docs)} "
-                f"k={k:.0f}"
+                f"[retrieval] mode=rrf_merge lists=[{counts}] fused_docs={len(hits)} "
+                f"k={settings.retrieval_rrf_k:.0f}"
             )
-        return fused_docs
+        return hits
 
-    def _search_once(
+    def _rrf_merge_documents(self, ranked_lists: Sequence[Tuple[str, List[Any]]]) -> List[Any]:
+        # Shallow copies carry the fused score, so shared/cached documents stay untouched.
+        merged: List[Any] = []
+        for _key, doc, score in self._weighted_rrf(ranked_lists):
+            scored = copy.copy(doc)
+            scored.score = score
+            merged.append(scored)
+        return merged
+
+    def _plan_queries(
         self,
-        *,
         query_original: str,
-        query_en: Optional[str] = None,
-        language: Optional[str] = None,
-        top_k: Optional[int] = None,
-    ) -> Dict[str, Any]:
+        query_en: Optional[str],
+        top_k: Optional[int],
+    ) -> Tuple[List[str], int, int]:
         k = min(top_k or settings.default_top_k, settings.max_top_k)
         queries = [query_original.strip()]
         if query_en and query_en.strip() and query_en.strip() not in queries:
             queries.append(query_en.strip())
-
-        bm25_docs = self._run_pipeline_bm25(queries=queries, top_k=k)
         dense_top_k = min(max(k, settings.retrieval_dense_top_k), settings.max_top_k)
-        dense_docs = self._run_pipeline_dense(queries=queries, top_k=dense_top_k)
-        if dense_docs:
-            docs = self._rrf_merge_documents(
-                ranked_lists=[
-                    ("bm25", bm25_docs),
-                    ("dense", dense_docs),
-                ]
-            )
-        else:
-            docs = bm25_docs
-        merged: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        return queries, k, dense_top_k
 
-        for doc in docs:
-            meta = doc.meta or {}
-            if language and meta.get("language") and meta.get("language") != language:
-                continue
-            chunk_id = self._doc_chunk_id(doc)
-            score = float(doc.score or 0.0)
-            existing = merged.get(chunk_id)
-            if existing and existing["score"] >= score:
-                continue
-            merged[chunk_id] = {
-                "chunk_id": chunk_id,
-                "doc_id": str(meta.get("doc_id", "unknown")),
-                "score": score,
-                "snippet": (doc.content or "")[:420],
-                "title": str(meta.get("title", "")),
-                "url": str(meta.get("url", "")),
-                "source": str(meta.get("source", "")),
-                "language": str(meta.get("language", "en")),
-                "published_at": meta.get("published_at"),
-            }
+    def _fuse_branches(
+        self,
+        bm25_docs: List[Any],
+        dense_docs: List[Any],
+        top_k: Optional[int] = None,
+    ) -> List[ScoredHit]:
+        if not dense_docs:
+            return scored_hits(bm25_docs)
+        return self._weighted_rrf([("bm25", bm25_docs), ("dense", dense_docs)], top_k=top_k)
 
-        sorted_results = sorted(merged.values(), key=lambda item: item["score"], reverse=True)
-        return {
-            "results": sorted_results[:k],
+    @staticmethod
+    def _result_snippet(doc: Any) -> str:
+        # Query-aware highlight, then the index-time snippet, then the body (memory/pipeline paths).
+        meta = doc.meta or {}
+        return str(meta.get("highlight") or meta.get("snippet") or make_snippet(doc.content or ""))
+
+    def _assemble_results(
+        self,
+        *,
+        queries: List[str],
+        k: int,
+        language: Optional[str],
+        hits: Sequence[ScoredHit],
+        depth_info: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        results = []
+        for chunk_id, doc, score in select_top_hits(hits, k, language=language):
+            meta = doc.meta or {}
+            results.append(
+                {
+                    "chunk_id": chunk_id,
+                    "doc_id": str(meta.get("doc_id", "unknown")),
+                    "score": score,
+                    "snippet": self._result_snippet(doc),
+                    "title": str(meta.get("title", "")),
+                    "url": str(meta.get("url", "")),
+                    "source": str(meta.get("source", "")),
+                    "language": str(meta.get("language", "en")),
+                    "published_at": meta.get("published_at"),
+                }
+            )
+        response: Dict[str, Any] = {
+            "results": results,
             "used_queries": queries,
             "index_name": self._index_name,
         }
+        if depth_info is not None:
+            response["meta"] = {"branch_depth": depth_info}
+        return response
+
+    @staticmethod
+    def _adaptive_depth_enabled() -> bool:
+        return settings.retrieval_branch_depth_mode == "adaptive"
+
+    def _language_chunk_counts(self) -> Optional[Dict[str, int]]:
+        cached = self._language_counts
+        if cached is not None and cached[0] == self._index_generation:
+            return cached[1]
+        counts = None
+        source = self._branch_backend
+        if source is not None and hasattr(source, "language_counts"):
+            try:
+                counts = source.language_counts()
+            except Exception as err:
+                if settings.retrieval_log_timing:
+                    logger.warning(f"[retrieval] language counts unavailable ({err})")
+        self._language_counts = (self._index_generation, counts)
+        return counts
+
+    def _adaptive_rounds(
+        self,
+        queries: Sequence[str],
+        k: int,
+        language: Optional[str],
+        prefilter: Optional[str],
+    ) -> Generator[Tuple[int, int, int], Tuple[List[Any], List[Any]], Tuple[List[ScoredHit], Dict[str, Any]]]:
+        """
+        Progressive deepening shared by the sync and async search paths: yields
+        (bm25_depth, dense_depth, offset), receives the ranks below `offset` that round
+        fetched, and returns the fused hits once the fused top_k is stable or the depth
+        budget is spent.
+        """
+        policy = AdaptiveDepthPolicy(
+            max_depth=max(k, settings.max_top_k),
+            max_rounds=settings.retrieval_adaptive_max_rounds,
+        )
+        eligible, share = language_selectivity(
+            self._language_chunk_counts() if language else None,
+            language,
+        )
+        if prefilter:
+            share = None
+        else:
+            eligible = None
+        post_filtered = bool(language and not prefilter)
+        depth = policy.initial_depth(k, language_share=share, eligible=eligible)
+        depths = {"bm25": depth, "dense": depth}
+        fetched: Dict[str, List[Any]] = {"bm25": [], "dense": []}
+        offset = 0
+        rounds = 0
+        while True:
+            rounds += 1
+            tails = yield depths["bm25"], depths["dense"], offset
+            for name, tail in zip(("bm25", "dense"), tails):
+                seen = {self._doc_chunk_id(doc) for doc in fetched[name]}
+                fetched[name].extend(doc for doc in tail if self._doc_chunk_id(doc) not in seen)
+            bm25_docs, dense_docs = fetched["bm25"], fetched["dense"]
+            branches = [RankedBranch("bm25", bm25_docs, depths["bm25"], self._branch_weight("bm25"))]
+            if dense_docs:
+                branches.append(RankedBranch("dense", dense_docs, depths["dense"], self._branch_weight("dense")))
+            hits = self._fuse_branches(bm25_docs, dense_docs)
+            # BM25-only hits keep raw scores; the check needs them on the RRF scale.
+            check_hits = hits if dense_docs else self._weighted_rrf([("bm25", bm25_docs)])
+            stable = (
+                not post_filtered
+                and top_k_has_clear_margin(branches, k, margin=settings.retrieval_adaptive_score_margin)
+            ) or fused_top_k_is_stable(
+                branches,
+                check_hits,
+                k,
+                rrf_k=settings.retrieval_rrf_k,
+                language=language if post_filtered else None,
+            )
+            deeper: Dict[str, int] = {}
+            for branch in branches:
+                next_depth = None if branch.exhausted else policy.next_depth(branch.depth, eligible=eligible)
+                if next_depth is not None:
+                    deeper[branch.name] = next_depth
+            if stable or not deeper or rounds >= policy.max_rounds:
+                break
+            # Branches share one depth schedule, so the deepened ones all resume at the same rank.
+            offset = max(depths[name] for name in deeper)
+            depths.update(deeper)
+        info = {
+            "mode": "adaptive",
+            "rounds": rounds,
+            "bm25_depth": depths["bm25"],
+            "dense_depth": depths["dense"] if dense_docs else 0,
+            "stable": stable,
+        }
+        if settings.retrieval_log_timing:
+            logger.info(
+                f"[retrieval] mode=adaptive_depth rounds={rounds} bm25_depth={info['bm25_depth']} "
+                f"dense_depth={info['dense_depth']} stable={stable}"
+            )
+        return hits, info
+
+    def _run_adaptive(
+        self,
+        queries: Sequence[str],
+        k: int,
+        language: Optional[str],
+        prefilter: Optional[str],
+    ) -> Tuple[List[ScoredHit], Dict[str, Any]]:
+        rounds = self._adaptive_rounds(queries, k, language, prefilter)
+        bm25_depth, dense_depth, offset = next(rounds)
+        while True:
+            tails = self._run_branches(
+                queries=queries,
+                bm25_top_k=bm25_depth,
+                dense_top_k=dense_depth,
+                language=prefilter,
+                offset=offset,
+            )
+            try:
+                bm25_depth, dense_depth, offset = rounds.send(tails)
+            except StopIteration as done:
+                return done.value
+
+    async def _run_adaptive_async(
+        self,
+        queries: Sequence[str],
+        k: int,
+        language: Optional[str],
+        prefilter: Optional[str],
+    ) -> Tuple[List[ScoredHit], Dict[str, Any]]:
+        if language:
+            # A cache miss is a blocking aggregation search; run it where the branch calls run.
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._branch_executor, self._language_chunk_counts)
+        rounds = self._adaptive_rounds(queries, k, language, prefilter)
+        bm25_depth, dense_depth, offset = next(rounds)
+        while True:
+            tails = await self._run_branches_async(
+                queries=queries,
+                bm25_top_k=bm25_depth,
+                dense_top_k=dense_depth,
+                language=prefilter,
+                offset=offset,
+            )
+            try:
+                bm25_depth, dense_depth, offset = rounds.send(tails)
+            except StopIteration as done:
+                return done.value
+
+    def _search_once(
+        self,
+        *,
+        query_original: str,
+        query_en: Optional[str] = None,
+        language: Optional[str] = None,
+        top_k: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        queries, k, dense_top_k = self._plan_queries(query_original, query_en, top_k)
+        prefilter = self._prefilter_language(language)
+        docs = None
+        if self._server_hybrid_enabled():
+            docs = self._run_server_hybrid(queries, k, dense_top_k, prefilter)
+        depth_info = None
+        if docs is not None:
+            hits = scored_hits(docs)
+        elif self._adaptive_depth_enabled():
+            hits, depth_info = self._run_adaptive(queries, k, language, prefilter)
+        else:
+            bm25_docs, dense_docs = self._run_branches(
+                queries=queries,
+                bm25_top_k=k,
+                dense_top_k=dense_top_k,
+                language=prefilter,
+            )
+            # Without the pre-filter, post-filtering may drop fused hits, so keep them all.
+            hits = self._fuse_branches(bm25_docs, dense_docs, top_k=None if language and not prefilter else k)
+        return self._assemble_results(queries=queries, k=k, language=language, hits=hits, depth_info=depth_info)
+
+    async def _search_once_async(
+        self,
+        *,
+        query_original: str,
+        query_en: Optional[str] = None,
+        language: Optional[str] = None,
+        top_k: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        queries, k, dense_top_k = self._plan_queries(query_original, query_en, top_k)
+        prefilter = self._prefilter_language(language)
+        docs = None
+        if self._server_hybrid_enabled():
+            loop = asyncio.get_running_loop()
+            docs = await loop.run_in_executor(
+                self._branch_executor,
+                partial(self._run_server_hybrid, queries, k, dense_top_k, prefilter),
+            )
+        depth_info = None
+        if docs is not None:
+            hits = scored_hits(docs)
+        elif self._adaptive_depth_enabled():
+            hits, depth_info = await self._run_adaptive_async(queries, k, language, prefilter)
+        else:
+            bm25_docs, dense_docs = await self._run_branches_async(
+                queries=queries,
+                bm25_top_k=k,
+                dense_top_k=dense_top_k,
+                language=prefilter,
+            )
+            hits = self._fuse_branches(bm25_docs, dense_docs, top_k=None if language and not prefilter else k)
+        return self._assemble_results(queries=queries, k=k, language=language, hits=hits, depth_info=depth_info)
 
     def _get_corrective_workflow(self) -> CorrectiveRagWorkflow:
         if self._corrective_workflow is not None:
@@ -514,6 +1475,7 @@ class RetrievalService:
                 model=settings.retrieval_corrective_llm_model,
                 timeout_ms=settings.retrieval_corrective_llm_timeout_ms,
                 logger=logger,
+                pool_size=settings.retrieval_corrective_llm_pool_size,
             )
             if llm_client is None:
                 logger.warning(
@@ -521,17 +1483,107 @@ class RetrievalService:
                     "using heuristic grader/rewriter fallback"
                 )
 
+        grade_fn = None
+        if settings.retrieval_corrective_grader == "cross_encoder":
+            grade_fn = self._build_local_grader()
+
         self._corrective_workflow = CorrectiveRagWorkflow(
             retrieve_fn=self._search_once,
             llm_client=llm_client,
+            grade_fn=grade_fn,
             max_attempts=settings.retrieval_corrective_max_attempts,
             budget_ms=settings.retrieval_corrective_budget_ms,
             dialogue_turns=settings.retrieval_corrective_dialogue_turns,
             logger=logger,
             use_langgraph=True,
+            speculative=settings.retrieval_corrective_speculative,
+            fused_grade=settings.retrieval_corrective_fused_grade,
+            grade_cache=self._grade_cache,
+            rewrite_cache=self._rewrite_cache,
         )
         return self._corrective_workflow
 
+    def _build_local_grader(self) -> Optional[Callable[..., Dict[str, Any]]]:
+        from .local_grader import CrossEncoderGrader
+
+        try:
+            grader = CrossEncoderGrader(
+                model=settings.retrieval_cross_encoder_model,
+                top_n=settings.retrieval_cross_encoder_top_n,
+                backend=settings.retrieval_cross_encoder_backend,
+            )
+        except Exception as err:
+            logger.warning(f"[retrieval] cross-encoder grader unavailable; using LLM/heuristic grading ({err})")
+            return None
+        return grader.grade_relevance
+
+    def _response_cache_key(
+        self,
+        query_original: str,
+        query_en: Optional[str],
+        language: Optional[str],
+        top_k: Optional[int],
+        dialogue_context: Optional[Sequence[str]],
+    ) -> Tuple[Any, ...]:
+        original = normalize_cache_text(query_original)
+        english = normalize_cache_text(query_en or "")
+        context: Tuple[str, ...] = ()
+        if settings.retrieval_corrective_rag_enabled:
+            # Dialogue turns only influence results through the corrective loop.
+            context = tuple(
+                normalize_cache_text(turn)
+                for turn in normalize_dialogue_context(
+                    dialogue_context,
+                    max_turns=settings.retrieval_corrective_dialogue_turns,
+                )
+            )
+        return (
+            self._index_generation,
+            original,
+            "" if english == original else english,
+            language or "",
+            min(top_k or settings.default_top_k, settings.max_top_k),
+            context,
+        )
+
+    def _cached_response(self, key: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+        entry = self._response_cache.get_entry(key)
+        if entry is None:
+            return None
+        age_seconds, cached = entry
+        response = copy.deepcopy(cached)
+        meta = dict(response.get("meta") or {})
+        meta["cache"] = {
+            "hit": True,
+            "age_ms": round(age_seconds * 1000.0, 1),
+            "generation": key[0],
+        }
+        response["meta"] = meta
+        return response
+
+    @staticmethod
+    def _cacheable(response: Dict[str, Any]) -> bool:
+        # Degraded corrective answers (low relevance, LLM errors, loop failure) are served
+        # but not cached, so the next identical request gets a fresh attempt.
+        corrective = (response.get("meta") or {}).get("corrective_rag")
+        if not corrective:
+            return True
+        return corrective.get("status") == "ok" and not corrective.get("degraded")
+
+    def _store_response(self, key: Tuple[Any, ...], response: Dict[str, Any]) -> Dict[str, Any]:
+        if key[0] == self._index_generation and self._cacheable(response):
+            self._response_cache.put(key, copy.deepcopy(response))
+        meta = dict(response.get("meta") or {})
+        meta["cache"] = {"hit": False, "generation": key[0]}
+        response["meta"] = meta
+        return response
+
+    def _bump_index_generation(self) -> None:
+        self._index_generation += 1
+        self._response_cache.clear()
+        # Chunk ids can survive a reindex with new content, so grades are regraded.
+        self._grade_cache.clear()
+
     def search(
         self,
         query_original: str,
@@ -540,9 +1592,33 @@ class RetrievalService:
         top_k: Optional[int] = None,
         dialogue_context: Optional[Sequence[str]] = None,
     ) -> Dict[str, Any]:
-        if self._retriever is None:
+        if not self._ready():
             raise RuntimeError(self._bootstrap_error or "Retriever not initialized")
 
+        key = self._response_cache_key(query_original, query_en, language, top_k, dialogue_context)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
+        return self._store_response(
+            key,
+            self._search_uncached(
+                query_original=query_original,
+                query_en=query_en,
+                language=language,
+                top_k=top_k,
+                dialogue_context=dialogue_context,
+            ),
+        )
+
+    def _search_uncached(
+        self,
+        *,
+        query_original: str,
+        query_en: Optional[str],
+        language: Optional[str],
+        top_k: Optional[int],
+        dialogue_context: Optional[Sequence[str]],
+    ) -> Dict[str, Any]:
         if not settings.retrieval_corrective_rag_enabled:
             return self._search_once(
                 query_original=query_original,
@@ -565,9 +1641,167 @@ class RetrievalService:
             logger.warning(
                 f"[retrieval] corrective-rag failed; falling back to standard retrieval ({err})"
             )
-            return self._search_once(
+            result = self._search_once(
+                query_original=query_original,
+                query_en=query_en,
+                language=language,
+                top_k=top_k,
+            )
+            meta = dict(result.get("meta") or {})
+            meta["corrective_rag"] = {
+                "enabled": True,
+                "status": "error",
+                "degraded": True,
+                "fallback_reason": f"Corrective loop failed; returning standard retrieval ({err})",
+            }
+            result["meta"] = meta
+            return result
+
+    async def search_async(
+        self,
+        query_original: str,
+        query_en: Optional[str] = None,
+        language: Optional[str] = None,
+        top_k: Optional[int] = None,
+        dialogue_context: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        if not self._ready():
+            raise RuntimeError(self._bootstrap_error or "Retriever not initialized")
+
+        key = self._response_cache_key(query_original, query_en, language, top_k, dialogue_context)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
+
+        if not settings.retrieval_corrective_rag_enabled:
+            result = await self._search_once_async(
                 query_original=query_original,
                 query_en=query_en,
                 language=language,
                 top_k=top_k,
             )
+            return self._store_response(key, result)
+
+        # The corrective loop is synchronous (LangGraph + blocking LLM calls), so it runs
+        # off the event loop; its retrievals still fan out on the branch pool.
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            None,
+            partial(
+                self._search_uncached,
+                query_original=query_original,
+                query_en=query_en,
+                language=language,
+                top_k=top_k,
+                dialogue_context=dialogue_context,
+            ),
+        )
+        return self._store_response(key, result)
+
+    def _batchable(self) -> bool:
+        return (
+            self._branch_backend is not None
+            and not settings.retrieval_corrective_rag_enabled
+            and not self._server_hybrid_enabled()
+            and not self._adaptive_depth_enabled()
+        )
+
+    def _embed_batch(self, texts: Sequence[str]) -> Optional[Dict[str, List[float]]]:
+        if not self._dense_available():
+            return None
+        unique = list(dict.fromkeys(texts))
+        try:
+            return dict(zip(unique, self._embed_queries(unique)))
+        except Exception as err:
+            if settings.retrieval_log_timing:
+                logger.warning(f"[retrieval] batch query embedding failed; using BM25-only ({err})")
+            return {}
+
+    def _search_batch_once(self, requests: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Every query string of the batch is encoded in one forward pass, and the branch
+        plans of all searches go to the backend as one `_msearch` (or in-process call).
+        """
+        started = perf_counter()
+        planned = []
+        for item in requests:
+            queries, k, dense_top_k = self._plan_queries(
+                item["query_original"],
+                item.get("query_en"),
+                item.get("top_k"),
+            )
+            planned.append((queries, k, dense_top_k, item.get("language")))
+        embeddings = self._embed_batch([query for queries, *_rest in planned for query in queries])
+        plans = [
+            self._branch_plan(queries, k, dense_top_k, self._prefilter_language(language), embeddings=embeddings)
+            for queries, k, dense_top_k, language in planned
+        ]
+        rankings = self._branch_backend.search_many([query for plan in plans for query in plan])
+
+        results: List[Dict[str, Any]] = []
+        offset = 0
+        for (queries, k, _dense_top_k, language), plan in zip(planned, plans):
+            bm25_docs, dense_docs = self._join_plan_rankings(plan, rankings[offset : offset + len(plan)])
+            offset += len(plan)
+            prefilter = self._prefilter_language(language)
+            hits = self._fuse_branches(bm25_docs, dense_docs, top_k=None if language and not prefilter else k)
+            results.append(self._assemble_results(queries=queries, k=k, language=language, hits=hits))
+        if settings.retrieval_log_timing:
+            elapsed = (perf_counter() - started) * 1000.0
+            logger.info(
+                f"[retrieval] mode=batch_search requests={len(requests)} searches={offset} "
+                f"elapsed_ms={elapsed:.1f}"
+            )
+        return results
+
+    def search_batch(self, requests: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Responses for many `SearchRequest`-shaped dicts, in request order. Cached responses
+        are served as-is; the rest share one embedding pass and one branch-backend call.
+        The corrective loop, `es_rrf` and adaptive depth run one search per request.
+        """
+        if not self._ready():
+            raise RuntimeError(self._bootstrap_error or "Retriever not initialized")
+
+        responses: Dict[int, Dict[str, Any]] = {}
+        pending: List[Tuple[int, Tuple[Any, ...], Dict[str, Any]]] = []
+        for idx, item in enumerate(requests):
+            key = self._response_cache_key(
+                item["query_original"],
+                item.get("query_en"),
+                item.get("language"),
+                item.get("top_k"),
+                item.get("dialogue_context"),
+            )
+            cached = self._cached_response(key)
+            if cached is not None:
+                responses[idx] = cached
+            else:
+                pending.append((idx, key, item))
+
+        fresh: Optional[List[Dict[str, Any]]] = None
+        if pending and self._batchable():
+            try:
+                fresh = self._search_batch_once([item for _idx, _key, item in pending])
+            except Exception as err:
+                if self._memory_backend is not None:
+                    raise
+                if settings.retrieval_log_timing:
+                    logger.warning(f"[retrieval] batch msearch failed; searching one request at a time ({err})")
+        for pos, (idx, key, item) in enumerate(pending):
+            if fresh is not None:
+                result = fresh[pos]
+            else:
+                result = self._search_uncached(
+                    query_original=item["query_original"],
+                    query_en=item.get("query_en"),
+                    language=item.get("language"),
+                    top_k=item.get("top_k"),
+                    dialogue_context=item.get("dialogue_context"),
+                )
+            responses[idx] = self._store_response(key, result)
+        return [responses[idx] for idx in range(len(requests))]
+
+    async def search_batch_async(self, requests: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.search_batch, requests))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for client-side fusion + result assembly: the previous dict merge,
+full sort and per-candidate result dicts versus `app.fusion.weighted_rrf` with
+partial top-k selection (numpy and pure-python paths) at several branch depths.
+
+Usage:
+  python scripts/benchmark_fusion.py --depths 50 100 250 500 --lists 4 --top-k 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import timeit
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.documents import RetrievedDocument  # noqa: E402
+from app.fusion import select_top_hits, weighted_rrf  # noqa: E402
+
+
+def _result(chunk_id: str, doc: Any, score: float) -> Dict[str, Any]:
+    meta = doc.meta or {}
+    return {
+        "chunk_id": chunk_id,
+        "doc_id": str(meta.get("doc_id", "unknown")),
+        "score": score,
+        "snippet": (doc.content or "")[:420],
+        "language": str(meta.get("language", "en")),
+    }
+
+
+def legacy_fuse_and_assemble(rankings: List[List[Any]], top_k: int, k: float = 60.0) -> List[Dict[str, Any]]:
+    """The pre-`app.fusion` path: dict merge + full sort, then a result dict per candidate."""
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Any] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            meta = doc.meta or {}
+            key = str(meta.get("chunk_id") or f"{meta.get('doc_id', 'unknown')}::chunk::na")
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            docs.setdefault(key, doc)
+    fused = []
+    for key, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+        doc = docs[key]
+        doc.score = score
+        fused.append(doc)
+    merged: Dict[str, Dict[str, Any]] = {}
+    for doc in fused:
+        meta = doc.meta or {}
+        key = str(meta.get("chunk_id") or f"{meta.get('doc_id', 'unknown')}::chunk::na")
+        existing = merged.get(key)
+        if existing and existing["score"] >= float(doc.score or 0.0):
+            continue
+        merged[key] = _result(key, doc, float(doc.score or 0.0))
+    return sorted(merged.values(), key=lambda item: item["score"], reverse=True)[:top_k]
+
+
+def fused_and_assembled(rankings: List[List[Any]], top_k: int, use_numpy: bool) -> List[Dict[str, Any]]:
+    hits = weighted_rrf(rankings, top_k=top_k, use_numpy=use_numpy)
+    return [_result(*hit) for hit in select_top_hits(hits, top_k)]
+
+
+def make_rankings(lists: int, depth: int, corpus: int, seed: int) -> List[List[RetrievedDocument]]:
+    rng = random.Random(seed)
+    pool = [
+        RetrievedDocument(id=f"doc{idx}::chunk::0", content="", meta={"chunk_id": f"doc{idx}::chunk::0"})
+        for idx in range(corpus)
+    ]
+    return [rng.sample(pool, depth) for _ in range(lists)]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark client-side reciprocal-rank fusion and result assembly")
+    parser.add_argument("--depths", type=int, nargs="+", default=[50, 100, 250, 500])
+    parser.add_argument("--lists", type=int, default=4, help="Ranked lists per fusion (queries x branches)")
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    print(f"{'depth':>6} {'legacy_us':>10} {'numpy_us':>10} {'python_us':>10} {'speedup':>8}")
+    for depth in args.depths:
+        rankings = make_rankings(args.lists, depth, corpus=depth * 2, seed=args.seed)
+        expected = [item["chunk_id"] for item in legacy_fuse_and_assemble(rankings, args.top_k)]
+        for use_numpy in (True, False):
+            got = [item["chunk_id"] for item in fused_and_assembled(rankings, args.top_k, use_numpy)]
+            if got != expected:
+                raise SystemExit(f"Fused ranking differs from legacy at depth={depth} numpy={use_numpy}")
+        timings = {}
+        for name, fn in (
+            ("legacy", partial(legacy_fuse_and_assemble, rankings, args.top_k)),
+            ("numpy", partial(fused_and_assembled, rankings, args.top_k, use_numpy=True)),
+            ("python", partial(fused_and_assembled, rankings, args.top_k, use_numpy=False)),
+        ):
+            timings[name] = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat * 1e6
+        best = min(timings["numpy"], timings["python"])
+        print(
+            f"{depth:>6} {timings['legacy']:>10.1f} {timings['numpy']:>10.1f} "
+            f"{timings['python']:>10.1f} {timings['legacy'] / best:>7.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
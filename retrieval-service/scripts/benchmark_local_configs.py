@@ -30,16 +30,31 @@ PRESET_CONFIGS: Dict[str, Dict[str, str]] = {
         "RETRIEVAL_DENSE_ENABLED": "false",
         "RETRIEVAL_WRITE_EMBEDDINGS": "false",
         "RETRIEVAL_DENSE_TOP_K": "0",
+        "RETRIEVAL_HYBRID_MODE": "client",
     },
     "hybrid_k5": {
         "RETRIEVAL_DENSE_ENABLED": "true",
         "RETRIEVAL_WRITE_EMBEDDINGS": "true",
         "RETRIEVAL_DENSE_TOP_K": "5",
+        "RETRIEVAL_HYBRID_MODE": "client",
     },
     "hybrid_k8": {
         "RETRIEVAL_DENSE_ENABLED": "true",
         "RETRIEVAL_WRITE_EMBEDDINGS": "true",
         "RETRIEVAL_DENSE_TOP_K": "8",
+        "RETRIEVAL_HYBRID_MODE": "client",
+    },
+    "es_rrf_k5": {
+        "RETRIEVAL_DENSE_ENABLED": "true",
+        "RETRIEVAL_WRITE_EMBEDDINGS": "true",
+        "RETRIEVAL_DENSE_TOP_K": "5",
+        "RETRIEVAL_HYBRID_MODE": "es_rrf",
+    },
+    "es_rrf_k8": {
+        "RETRIEVAL_DENSE_ENABLED": "true",
+        "RETRIEVAL_WRITE_EMBEDDINGS": "true",
+        "RETRIEVAL_DENSE_TOP_K": "8",
+        "RETRIEVAL_HYBRID_MODE": "es_rrf",
     },
 }
 
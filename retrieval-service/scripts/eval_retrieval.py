@@ -84,6 +84,23 @@ def parse_args() -> argparse.Namespace:
         default=-1,
         help="Optional absolute failure cap. Set >=0 to enforce; -1 disables (default: -1).",
     )
+    parser.add_argument(
+        "--baseline-json",
+        default="",
+        help="Optional earlier --output-json report to compare against (e.g. the float32 index run).",
+    )
+    parser.add_argument(
+        "--max-pass-rate-drop",
+        type=float,
+        default=0.0,
+        help="Allowed pass_rate drop versus --baseline-json, from 0.0 to 1.0 (default: 0.0).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="Send cases through /search/batch in groups of this size; 0 uses /search per case (default: 0).",
+    )
     parser.add_argument(
         "--ignore-doc-id-checks",
         action="store_true",
@@ -184,14 +201,7 @@ class CaseResult:
     payload: Dict[str, Any]
 
 
-def evaluate_case(
-    base_url: str,
-    timeout: float,
-    case: Dict[str, Any],
-    *,
-    ignore_doc_id_checks: bool = False,
-) -> CaseResult:
-    case_id = str(case.get("id", "unknown"))
+def case_payload(case: Dict[str, Any]) -> Dict[str, Any]:
     payload = {
         "query_original": str(case.get("query_original", "")).strip(),
         "top_k": int(case.get("top_k", 5)),
@@ -200,7 +210,18 @@ def evaluate_case(
         payload["query_en"] = str(case["query_en"])
     if case.get("language"):
         payload["language"] = str(case["language"])
+    return payload
 
+
+def evaluate_case(
+    base_url: str,
+    timeout: float,
+    case: Dict[str, Any],
+    *,
+    ignore_doc_id_checks: bool = False,
+) -> CaseResult:
+    case_id = str(case.get("id", "unknown"))
+    payload = case_payload(case)
     if not payload["query_original"]:
         return CaseResult(
             case_id=case_id,
@@ -215,6 +236,19 @@ def evaluate_case(
         )
 
     status, data, latency_ms = post_json(f"{base_url.rstrip('/')}/search", payload, timeout)
+    return check_case(case, payload, status, data, latency_ms, ignore_doc_id_checks=ignore_doc_id_checks)
+
+
+def check_case(
+    case: Dict[str, Any],
+    payload: Dict[str, Any],
+    status: int,
+    data: Dict[str, Any],
+    latency_ms: float,
+    *,
+    ignore_doc_id_checks: bool = False,
+) -> CaseResult:
+    case_id = str(case.get("id", "unknown"))
     if status != 200:
         return CaseResult(
             case_id=case_id,
@@ -295,6 +329,50 @@ def evaluate_case(
     )
 
 
+def evaluate_batch(
+    base_url: str,
+    timeout: float,
+    cases: Sequence[Dict[str, Any]],
+    *,
+    ignore_doc_id_checks: bool = False,
+) -> List[CaseResult]:
+    """
+    One /search/batch call for `cases`. Each case is charged the batch latency divided
+    by the batch size, so per-case max_latency_ms checks see the amortized cost.
+    """
+    payloads = [case_payload(case) for case in cases]
+    sendable = [idx for idx, payload in enumerate(payloads) if payload["query_original"]]
+    status, data, latency_ms = 0, {}, 0.0
+    if sendable:
+        status, data, latency_ms = post_json(
+            f"{base_url.rstrip('/')}/search/batch",
+            {"searches": [payloads[idx] for idx in sendable]},
+            timeout,
+        )
+    responses = data.get("responses", []) if status == 200 else []
+    by_case = dict(zip(sendable, responses))
+    per_case_ms = latency_ms / max(1, len(sendable))
+
+    results: List[CaseResult] = []
+    for idx, (case, payload) in enumerate(zip(cases, payloads)):
+        if idx not in sendable:
+            results.append(evaluate_case(base_url, timeout, case, ignore_doc_id_checks=ignore_doc_id_checks))
+        elif status != 200:
+            results.append(check_case(case, payload, status, data, per_case_ms))
+        else:
+            results.append(
+                check_case(
+                    case,
+                    payload,
+                    status,
+                    by_case.get(idx, {}),
+                    per_case_ms,
+                    ignore_doc_id_checks=ignore_doc_id_checks,
+                )
+            )
+    return results
+
+
 def summarize(case_results: List[CaseResult]) -> Dict[str, Any]:
     total = len(case_results)
     passed = sum(1 for result in case_results if result.ok)
@@ -457,6 +535,26 @@ def append_history_entry(
     print(f"Appended eval history: {path}")
 
 
+def load_baseline_summary(path: str) -> Optional[Dict[str, Any]]:
+    if not path:
+        return None
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    summary = payload.get("summary") if isinstance(payload, dict) else None
+    if not isinstance(summary, dict) or "pass_rate" not in summary:
+        raise ValueError(f"Baseline report has no summary.pass_rate: {path}")
+    return summary
+
+
+def print_baseline_comparison(summary: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    parts = []
+    for key in ("pass_rate", "hit_at_5", "mrr"):
+        delta = float(summary.get(key, 0.0)) - float(baseline.get(key, 0.0))
+        parts.append(f"{key}={summary.get(key, 0.0):.3f} ({delta:+.3f})")
+    latency_delta = float(summary.get("latency_ms_p95", 0.0)) - float(baseline.get("latency_ms_p95", 0.0))
+    parts.append(f"latency_p95={summary.get('latency_ms_p95', 0.0):.1f}ms ({latency_delta:+.1f}ms)")
+    print("Vs baseline: " + " ".join(parts))
+
+
 def main() -> int:
     args = parse_args()
     if args.min_pass_rate < 0.0 or args.min_pass_rate > 1.0:
@@ -465,6 +563,17 @@ def main() -> int:
     if args.max_failures < -1:
         print("--max-failures must be -1 (disabled) or a non-negative integer")
         return 1
+    if args.max_pass_rate_drop < 0.0 or args.max_pass_rate_drop > 1.0:
+        print("--max-pass-rate-drop must be between 0.0 and 1.0")
+        return 1
+    if args.batch_size < 0 or args.batch_size > 64:
+        print("--batch-size must be between 0 (disabled) and 64")
+        return 1
+    try:
+        baseline = load_baseline_summary(args.baseline_json)
+    except (OSError, ValueError) as err:
+        print(f"Could not load baseline report: {err}")
+        return 1
 
     queries_path = Path(args.queries)
     if not queries_path.exists():
@@ -491,17 +600,31 @@ def main() -> int:
     for idx, case in enumerate(queries, start=1):
         if "id" not in case:
             case["id"] = f"case_{idx}"
-        result = evaluate_case(
-            args.base_url,
-            args.timeout,
-            case,
-            ignore_doc_id_checks=args.ignore_doc_id_checks,
-        )
-        case_results.append(result)
-        print_case_line(result)
+    if args.batch_size > 0:
+        for start in range(0, len(queries), args.batch_size):
+            for result in evaluate_batch(
+                args.base_url,
+                args.timeout,
+                queries[start : start + args.batch_size],
+                ignore_doc_id_checks=args.ignore_doc_id_checks,
+            ):
+                case_results.append(result)
+                print_case_line(result)
+    else:
+        for case in queries:
+            result = evaluate_case(
+                args.base_url,
+                args.timeout,
+                case,
+                ignore_doc_id_checks=args.ignore_doc_id_checks,
+            )
+            case_results.append(result)
+            print_case_line(result)
 
     summary = summarize(case_results)
     print_summary(summary)
+    if baseline is not None:
+        print_baseline_comparison(summary, baseline)
     corpus_context = load_corpus_context(args.corpus_path)
 
     if args.output_json:
@@ -543,6 +666,13 @@ def main() -> int:
         gate_failures.append(
             f"pass_rate {summary['pass_rate'] * 100.0:.1f}% < required {args.min_pass_rate * 100.0:.1f}%"
         )
+    if baseline is not None:
+        floor = float(baseline["pass_rate"]) - args.max_pass_rate_drop
+        if summary["pass_rate"] < floor - 1e-9:
+            gate_failures.append(
+                f"pass_rate {summary['pass_rate'] * 100.0:.1f}% dropped more than "
+                f"{args.max_pass_rate_drop * 100.0:.1f}pp below baseline {float(baseline['pass_rate']) * 100.0:.1f}%"
+            )
     if args.max_failures >= 0 and int(summary["failed_cases"]) > args.max_failures:
         gate_failures.append(
             f"failed_cases {int(summary['failed_cases'])} > max_failures {args.max_failures}"
@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from app.branch_depth import (
+    AdaptiveDepthPolicy,
+    RankedBranch,
+    fused_top_k_is_stable,
+    language_selectivity,
+    rank_k_margin,
+    top_k_has_clear_margin,
+)
+from app.config import settings
+from app.documents import RetrievedDocument
+from app.fusion import weighted_rrf
+from app.search import RetrievalService
+
+
+def _doc(name: str, language: str = "en", score=None) -> RetrievedDocument:
+    return RetrievedDocument(
+        id=name,
+        content=name,
+        meta={"chunk_id": f"{name}::chunk::0", "language": language},
+        score=score,
+    )
+
+
+def _scored(*scores):
+    return [_doc(f"d{idx}", score=score) for idx, score in enumerate(scores)]
+
+
+POOL = [_doc(f"d{idx}") for idx in range(10)]
+
+
+def _check(bm25, dense, depth, top_k, language=None):
+    branches = [RankedBranch("bm25", bm25, depth), RankedBranch("dense", dense, depth)]
+    hits = weighted_rrf([bm25, dense])
+    return fused_top_k_is_stable(branches, hits, top_k, rrf_k=60.0, language=language)
+
+
+class StabilityCheckTests(unittest.TestCase):
+    def test_agreeing_branches_are_stable(self):
+        self.assertTrue(_check(POOL[:3], POOL[:3], depth=3, top_k=2))
+
+    def test_disagreeing_branches_need_more_depth(self):
+        self.assertFalse(_check(POOL[:3], POOL[::-1][:3], depth=3, top_k=2))
+
+    def test_exhausted_branches_cannot_change_the_top_k(self):
+        self.assertTrue(_check(POOL[:3], POOL[::-1][:3], depth=5, top_k=2))
+
+    def test_too_few_eligible_hits_is_unstable_while_branches_have_more(self):
+        spanish = [_doc("es0", "es"), *POOL[:2]]
+        self.assertFalse(_check(spanish, spanish, depth=3, top_k=2, language="es"))
+
+
+class ScoreMarginTests(unittest.TestCase):
+    def test_margin_compares_the_rank_k_drop_with_the_mean_step(self):
+        self.assertEqual(rank_k_margin(_scored(10.0, 9.0, 8.0, 2.0), 3), 6.0)
+        self.assertEqual(rank_k_margin(_scored(10.0, 9.0, 8.0, 8.0), 3), 0.0)
+        self.assertIsNone(rank_k_margin(_scored(10.0, 9.0, 8.0), 3))
+
+    def test_every_unexhausted_branch_needs_a_clear_margin(self):
+        cliff = RankedBranch("bm25", _scored(10.0, 9.0, 2.0), 3)
+        smooth = RankedBranch("dense", _scored(0.9, 0.8, 0.7), 3)
+        short = RankedBranch("dense", _scored(0.9), 3)
+
+        self.assertTrue(top_k_has_clear_margin([cliff, short], 2, margin=2.0))
+        self.assertFalse(top_k_has_clear_margin([cliff, smooth], 2, margin=2.0))
+
+
+class AdaptiveDepthPolicyTests(unittest.TestCase):
+    def setUp(self):
+        self.policy = AdaptiveDepthPolicy(max_depth=20)
+
+    def test_first_round_looks_one_rank_past_top_k(self):
+        self.assertEqual(self.policy.initial_depth(5), 6)
+        self.assertEqual(self.policy.initial_depth(5, language_share=0.5), 12)
+        self.assertEqual(AdaptiveDepthPolicy(max_depth=5).initial_depth(5), 5)
+
+    def test_pre_filter_caps_depth_at_eligible_chunks(self):
+        self.assertEqual(self.policy.initial_depth(5, eligible=3), 3)
+        self.assertIsNone(self.policy.next_depth(3, eligible=3))
+
+    def test_next_depth_grows_until_max_depth(self):
+        self.assertEqual(self.policy.next_depth(8), 16)
+        self.assertEqual(self.policy.next_depth(16), 20)
+        self.assertIsNone(self.policy.next_depth(20))
+
+    def test_language_selectivity(self):
+        self.assertEqual(language_selectivity({"en": 3, "es": 1}, "es"), (1, 0.25))
+        self.assertEqual(language_selectivity(None, "es"), (None, None))
+
+
+class _RankedStub:
+    """Branch backend whose bm25 and dense rankings agree or disagree on POOL."""
+
+    def __init__(self, agree: bool, scores=None):
+        self.agree = agree
+        self.scores = scores
+        self.pages = []
+        self.count_threads = []
+
+    def search_many(self, queries):
+        self.pages.append([(query.offset, query.top_k) for query in queries])
+        rankings = []
+        for query in queries:
+            order = POOL if self.agree or query.branch == "bm25" else POOL[::-1]
+            page = []
+            for rank, doc in enumerate(order[query.offset : query.top_k], start=query.offset):
+                score = None if self.scores is None else self.scores[rank]
+                page.append(RetrievedDocument(id=doc.id, content=doc.content, meta=doc.meta, score=score))
+            rankings.append(page)
+        return rankings
+
+    def language_counts(self):
+        self.count_threads.append(threading.get_ident())
+        return {"en": len(POOL)}
+
+
+class _Embedder:
+    def embed_queries(self, texts):
+        return [[1.0] for _ in texts]
+
+
+class AdaptiveSearchTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            settings,
+            retrieval_branch_depth_mode="adaptive",
+            max_top_k=10,
+            retrieval_dense_enabled=True,
+            retrieval_corrective_rag_enabled=False,
+            retrieval_log_timing=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _service(self, agree: bool, scores=None) -> RetrievalService:
+        service = RetrievalService()
+        self.addCleanup(service._branch_executor.shutdown, wait=False)
+        service._retriever = object()
+        service._bootstrap_error = None
+        service._embedder = _Embedder()
+        service._es_search = _RankedStub(agree, scores)
+        return service
+
+    def test_agreeing_branches_stop_after_one_shallow_round(self):
+        service = self._service(agree=True)
+
+        result = service.search(query_original="history of panot tiles", top_k=2)
+
+        self.assertEqual(service._es_search.pages, [[(0, 3), (0, 3)]])
+        self.assertEqual(result["meta"]["branch_depth"]["rounds"], 1)
+        self.assertTrue(result["meta"]["branch_depth"]["stable"])
+        self.assertEqual([item["chunk_id"] for item in result["results"]], ["d0::chunk::0", "d1::chunk::0"])
+
+    def test_easy_query_with_a_score_cliff_stops_after_round_one(self):
+        # The branches disagree, so only the rank-k margin can call this stable.
+        service = self._service(agree=False, scores=[10.0, 9.0, 2.0, 1.9, 1.8, 1.7, 1.6, 1.5, 1.4, 1.3])
+
+        result = service.search(query_original="history of panot tiles", top_k=2)
+
+        self.assertEqual(service._es_search.pages, [[(0, 3), (0, 3)]])
+        self.assertEqual(result["meta"]["branch_depth"]["rounds"], 1)
+        self.assertTrue(result["meta"]["branch_depth"]["stable"])
+
+    def test_hard_query_fetches_only_new_tails_up_to_max_top_k(self):
+        service = self._service(agree=False)
+
+        result = service.search(query_original="history of panot tiles", top_k=2)
+
+        self.assertEqual(
+            service._es_search.pages,
+            [[(0, 3), (0, 3)], [(3, 6), (3, 6)], [(6, 10), (6, 10)]],
+        )
+        self.assertEqual(result["meta"]["branch_depth"]["rounds"], 3)
+        self.assertEqual(result["meta"]["branch_depth"]["bm25_depth"], 10)
+        self.assertEqual(len(result["results"]), 2)
+
+    def test_async_search_reads_language_counts_off_the_event_loop(self):
+        service = self._service(agree=True)
+
+        result = asyncio.run(service.search_async(query_original="history of panot tiles", language="en", top_k=2))
+
+        self.assertEqual(result["meta"]["branch_depth"]["rounds"], 1)
+        self.assertEqual(len(service._es_search.count_threads), 1)
+        self.assertNotEqual(service._es_search.count_threads[0], threading.get_ident())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from app.caching import QueryEmbeddingCache, TTLCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_lru_eviction_and_counters(self):
+        cache = TTLCache(maxsize=2, ttl_seconds=0)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 1, 1))
+
+    def test_entries_expire_after_ttl(self):
+        clock = _Clock()
+        cache = TTLCache(maxsize=4, ttl_seconds=10, now_fn=clock)
+        cache.put("a", 1)
+        clock.now += 5
+        self.assertEqual(cache.get_entry("a"), (5.0, 1))
+        clock.now += 6
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = TTLCache(maxsize=0, ttl_seconds=10)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertFalse(cache.stats()["enabled"])
+
+    def test_concurrent_puts_respect_maxsize(self):
+        cache = TTLCache(maxsize=50, ttl_seconds=0)
+
+        def writer(offset):
+            for idx in range(200):
+                cache.put(offset * 1000 + idx, idx)
+                cache.get(offset * 1000 + idx)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(cache), 50)
+        self.assertEqual(cache.stats()["hits"] + cache.stats()["misses"], 1600)
+
+
+class QueryEmbeddingCacheTests(unittest.TestCase):
+    def test_only_misses_are_computed_in_one_batch(self):
+        cache = QueryEmbeddingCache(maxsize=16, ttl_seconds=60)
+        batches = []
+
+        def compute(texts):
+            batches.append(list(texts))
+            return [[float(len(text))] for text in texts]
+
+        cache.get_or_compute("m", ["hola", "hello"], compute)
+        result = cache.get_or_compute("m", [" hola ", "adios"], compute)
+
+        self.assertEqual(batches, [["hola", "hello"], ["adios"]])
+        self.assertEqual(result, [[4.0], [5.0]])
+
+    def test_keys_are_scoped_by_model(self):
+        cache = QueryEmbeddingCache(maxsize=16, ttl_seconds=60)
+        cache.put("model-a", "hola", [1.0])
+        self.assertIsNone(cache.get("model-b", "hola"))
+
+    def test_persists_and_reloads(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "embeddings.json"
+            first = QueryEmbeddingCache(maxsize=16, ttl_seconds=3600, persist_path=str(path))
+            first.put("m", "hola", [0.25, 0.5])
+            first.save()
+
+            second = QueryEmbeddingCache(maxsize=16, ttl_seconds=3600, persist_path=str(path))
+            self.assertEqual(second.load(), 1)
+            self.assertEqual(second.get("m", "hola"), [0.25, 0.5])
+
+    def test_periodic_persist_runs_off_the_calling_thread(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "embeddings.json"
+            cache = QueryEmbeddingCache(maxsize=16, ttl_seconds=3600, persist_path=str(path), persist_every=2)
+            release = threading.Event()
+            save = cache.save
+            savers = []
+
+            def slow_save():
+                savers.append(threading.current_thread())
+                release.wait(2.0)
+                save()
+
+            cache.save = slow_save
+            cache.put("m", "hola", [0.25])
+            cache.put("m", "adios", [0.5])
+
+            self.assertFalse(path.exists())
+            release.set()
+            cache.wait_for_save(2.0)
+
+            self.assertEqual(len(savers), 1)
+            self.assertIsNot(savers[0], threading.current_thread())
+            self.assertEqual(len(json.loads(path.read_text(encoding="utf-8"))["entries"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,10 @@
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-from app.corrective_rag_graph import CorrectiveRagWorkflow
+from app.caching import TTLCache
+from app.corrective_rag_graph import CorrectiveRagWorkflow, OpenAICorrectiveClient
 
 
 class _NoopLogger:
@@ -157,5 +161,352 @@ class CorrectiveRagWorkflowTests(unittest.TestCase):
         self.assertEqual(result["results"][0]["chunk_id"], "c1")
 
 
+class _SlowLLM(_StubLLM):
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+
+    def grade_relevance(self, **kwargs):
+        time.sleep(self.delay_s)
+        return super().grade_relevance(**kwargs)
+
+    def rewrite_query(self, **kwargs):
+        time.sleep(self.delay_s)
+        return super().rewrite_query(**kwargs)
+
+
+class SpeculativeRewriteTests(unittest.TestCase):
+    def _retrieve_fn(self, calls, delay_s=0.0):
+        def retrieve_fn(*, query_original, query_en, language, top_k):
+            _ = (query_original, language, top_k)
+            time.sleep(delay_s)
+            calls.append(query_en)
+            score = 1.31 if "panot" in query_en.lower() else 0.12
+            return {
+                "results": [{"chunk_id": f"c-{query_en}", "doc_id": "d1", "score": score, "snippet": query_en}],
+                "used_queries": [query_original, query_en],
+                "index_name": "idx_test",
+            }
+
+        return retrieve_fn
+
+    def _run(self, workflow, query_en):
+        return workflow.run(
+            query_original=query_en,
+            query_en=query_en,
+            language="en",
+            top_k=3,
+            dialogue_context=[],
+            index_name="idx_test",
+        )
+
+    def _workflow(self, calls, *, speculative, delay_s=0.0, executor=None):
+        workflow = CorrectiveRagWorkflow(
+            retrieve_fn=self._retrieve_fn(calls, delay_s),
+            llm_client=_SlowLLM(delay_s),
+            max_attempts=2,
+            budget_ms=5000,
+            logger=_NoopLogger(),
+            use_langgraph=False,
+            speculative=speculative,
+            executor=executor,
+        )
+        self.addCleanup(workflow.close)
+        return workflow
+
+    def test_low_grade_adopts_branch_started_during_grading(self):
+        delay_s = 0.15
+        serial_calls, speculative_calls = [], []
+
+        started = time.perf_counter()
+        serial = self._run(self._workflow(serial_calls, speculative=False, delay_s=delay_s), "street tiles")
+        serial_s = time.perf_counter() - started
+        started = time.perf_counter()
+        result = self._run(self._workflow(speculative_calls, speculative=True, delay_s=delay_s), "street tiles")
+        speculative_s = time.perf_counter() - started
+
+        self.assertEqual(result["results"], serial["results"])
+        self.assertEqual(result["used_queries"], serial["used_queries"])
+        meta = result["meta"]["corrective_rag"]
+        self.assertEqual(meta["final_label"], "high")
+        self.assertEqual(meta["attempts_used"], 1)
+        self.assertEqual(meta["rewrite_history"], ["barcelona panot street tile history"])
+        self.assertEqual(meta["speculation"]["used"], 1)
+        self.assertIn("rewrite_total", meta["timings_ms"])
+        # Serial: retrieve, grade, rewrite, retrieve, grade (5 x delay). Speculative overlaps the
+        # first grade with rewrite + retrieve (4 x delay); keep half a step of scheduling slack.
+        self.assertLess(speculative_s, serial_s - delay_s / 2)
+
+    def test_high_grade_discards_speculative_branch(self):
+        calls = []
+        workflow = self._workflow(calls, speculative=True)
+
+        result = self._run(workflow, "panot history")
+        workflow._speculation_executor().shutdown(wait=True)
+
+        meta = result["meta"]["corrective_rag"]
+        self.assertEqual(meta["attempts_used"], 0)
+        self.assertEqual(meta["rewrite_history"], [])
+        self.assertEqual(meta["speculation"], {"launched": 1, "used": 0, "discarded": 1})
+        self.assertEqual(result["used_queries"], ["panot history"])
+        self.assertEqual(result["results"][0]["chunk_id"], "c-panot history")
+
+    def test_no_speculation_once_attempts_are_used_up(self):
+        calls = []
+        workflow = self._workflow(calls, speculative=True)
+        workflow.max_attempts = 0
+
+        result = self._run(workflow, "street tiles")
+
+        self.assertEqual(calls, ["street tiles"])
+        self.assertEqual(result["meta"]["corrective_rag"]["speculation"]["launched"], 0)
+
+    def test_close_shuts_down_only_the_pool_it_created(self):
+        owned = self._workflow([], speculative=True)
+        self._run(owned, "panot history")
+        pool = owned._speculation_executor()
+        shared = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(shared.shutdown)
+        borrowed = self._workflow([], speculative=True, executor=shared)
+
+        owned.close()
+        borrowed.close()
+
+        with self.assertRaises(RuntimeError):
+            pool.submit(int)
+        self.assertEqual(shared.submit(int).result(), 0)
+
+    def test_close_releases_the_llm_connection_pool(self):
+        client = OpenAICorrectiveClient(api_key="k", model="m", logger=_NoopLogger())
+        idle = mock.Mock()
+        client.http._idle.append(idle)
+        workflow = CorrectiveRagWorkflow(
+            retrieve_fn=self._retrieve_fn([], 0.0),
+            llm_client=client,
+            logger=_NoopLogger(),
+            use_langgraph=False,
+        )
+
+        workflow.close()
+
+        idle.close.assert_called_once_with()
+        self.assertEqual(client.http._idle, [])
+
+
+class _FusedLLM(_StubLLM):
+    def __init__(self):
+        self.calls = []
+
+    def grade_and_rewrite(self, **kwargs):
+        self.calls.append("grade_and_rewrite")
+        grade = self.grade_relevance(**kwargs)
+        if grade["label"] == "low":
+            grade["rewrite"] = {"query_en": "barcelona panot street tile history", "reason": "Added entity."}
+        return grade
+
+    def rewrite_query(self, **kwargs):
+        self.calls.append("rewrite_query")
+        return super().rewrite_query(**kwargs)
+
+
+class FusedGradeTests(unittest.TestCase):
+    def _run(self, llm, **kwargs):
+        calls = []
+
+        def retrieve_fn(*, query_original, query_en, language, top_k):
+            _ = (query_original, language, top_k)
+            calls.append(query_en)
+            score = 1.31 if "panot" in query_en.lower() else 0.12
+            return {
+                "results": [{"chunk_id": f"c-{query_en}", "doc_id": "d1", "score": score, "snippet": query_en}],
+                "used_queries": [query_en],
+                "index_name": "idx_test",
+            }
+
+        workflow = CorrectiveRagWorkflow(
+            retrieve_fn=retrieve_fn,
+            llm_client=llm,
+            max_attempts=2,
+            logger=_NoopLogger(),
+            use_langgraph=False,
+            **kwargs,
+        )
+        result = workflow.run(
+            query_original="street tiles",
+            query_en="street tiles",
+            language="en",
+            top_k=3,
+            dialogue_context=[],
+            index_name="idx_test",
+        )
+        return result, calls
+
+    def test_low_grade_carries_the_rewrite(self):
+        llm = _FusedLLM()
+
+        result, calls = self._run(llm)
+
+        self.assertEqual(llm.calls, ["grade_and_rewrite", "grade_and_rewrite"])
+        self.assertEqual(calls, ["street tiles", "barcelona panot street tile history"])
+        meta = result["meta"]["corrective_rag"]
+        self.assertTrue(meta["fused_grade"])
+        self.assertEqual(meta["final_label"], "high")
+        self.assertEqual(meta["rewrite_history"], ["barcelona panot street tile history"])
+
+    def test_disabled_fused_grade_uses_separate_rewrite_call(self):
+        llm = _FusedLLM()
+
+        result, _calls = self._run(llm, fused_grade=False)
+
+        self.assertEqual(llm.calls, ["rewrite_query"])
+        self.assertEqual(result["meta"]["corrective_rag"]["final_label"], "high")
+
+    def test_client_parses_grade_and_rewrite(self):
+        client = OpenAICorrectiveClient(api_key="k", model="m", logger=_NoopLogger())
+        kwargs = dict(
+            query_original="q",
+            query_en="q",
+            dialogue_context=[],
+            retrieval_results=[{"title": "t", "snippet": "s", "score": 0.3}],
+            deadline_monotonic=0.0,
+        )
+        low = {"label": "LOW", "score": 0.2, "reason": "weak", "query_en": " q refined ", "rewrite_reason": "why"}
+        high = {"label": "high", "score": 0.9, "reason": "good", "query_en": "unused"}
+
+        with mock.patch.object(client, "_invoke_json", side_effect=[low, high]) as invoke:
+            graded_low = client.grade_and_rewrite(**kwargs)
+            graded_high = client.grade_and_rewrite(**kwargs)
+
+        self.assertEqual(invoke.call_count, 2)
+        self.assertEqual(graded_low["label"], "low")
+        self.assertEqual(graded_low["rewrite"], {"query_en": "q refined", "reason": "why"})
+        self.assertNotIn("rewrite", graded_high)
+
+
+class _CountingLLM(_StubLLM):
+    def __init__(self):
+        self.calls = []
+
+    def grade_relevance(self, **kwargs):
+        self.calls.append("grade")
+        return super().grade_relevance(**kwargs)
+
+    def rewrite_query(self, **kwargs):
+        self.calls.append("rewrite")
+        return super().rewrite_query(**kwargs)
+
+
+class GradeRewriteCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.retrieved = []
+
+        def retrieve_fn(*, query_original, query_en, language, top_k):
+            _ = (query_original, language, top_k)
+            self.retrieved.append(query_en)
+            relevant = "panot" in query_en.lower()
+            return {
+                "results": [
+                    {
+                        "chunk_id": "c-panot" if relevant else "c-generic",
+                        "doc_id": "d1",
+                        "score": 1.31 if relevant else 0.12,
+                        "snippet": query_en,
+                    }
+                ],
+                "used_queries": [query_en],
+                "index_name": "idx_test",
+            }
+
+        self.retrieve_fn = retrieve_fn
+
+    def _workflow(self, llm, **kwargs):
+        return CorrectiveRagWorkflow(
+            retrieve_fn=self.retrieve_fn,
+            llm_client=llm,
+            max_attempts=2,
+            logger=_NoopLogger(),
+            use_langgraph=False,
+            grade_cache=TTLCache(maxsize=16, ttl_seconds=60),
+            rewrite_cache=TTLCache(maxsize=16, ttl_seconds=60),
+            **kwargs,
+        )
+
+    def _run(self, workflow, query_en="Street  Tiles", dialogue_context=None):
+        return workflow.run(
+            query_original=query_en,
+            query_en=query_en,
+            language="en",
+            top_k=3,
+            dialogue_context=dialogue_context or ["u: tiles?"],
+            index_name="idx_test",
+        )
+
+    def test_repeat_question_skips_llm_calls(self):
+        llm = _CountingLLM()
+        workflow = self._workflow(llm)
+
+        first = self._run(workflow)
+        second = self._run(workflow, query_en="street tiles")
+
+        self.assertEqual(llm.calls, ["grade", "rewrite", "grade"])
+        self.assertEqual(second["results"], first["results"])
+        self.assertEqual(first["meta"]["corrective_rag"]["cache"], {"grade_hits": 0, "rewrite_hits": 0})
+        self.assertEqual(first["meta"]["corrective_rag"]["status"], "ok")
+        self.assertFalse(first["meta"]["corrective_rag"]["degraded"])
+        self.assertEqual(second["meta"]["corrective_rag"]["cache"], {"grade_hits": 2, "rewrite_hits": 1})
+        self.assertEqual(workflow.grade_cache.stats()["hits"], 2)
+
+    def test_new_dialogue_context_is_regraded_and_rewritten(self):
+        llm = _CountingLLM()
+        workflow = self._workflow(llm)
+
+        self._run(workflow)
+        self._run(workflow, dialogue_context=["u: something else"])
+
+        self.assertEqual(llm.calls, ["grade", "rewrite", "grade", "grade", "rewrite", "grade"])
+        self.assertEqual(workflow.grade_cache.stats()["hits"], 0)
+
+    def test_different_results_are_regraded(self):
+        llm = _CountingLLM()
+        workflow = self._workflow(llm)
+        workflow.max_attempts = 0
+
+        self._run(workflow)
+        workflow.retrieve_fn = lambda **kwargs: {"results": [{"chunk_id": "c-new", "score": 0.1}]}
+        self._run(workflow)
+
+        self.assertEqual(llm.calls, ["grade", "grade"])
+
+    def test_heuristic_fallback_is_not_cached(self):
+        class FailingLLM(_CountingLLM):
+            def grade_relevance(self, **kwargs):
+                self.calls.append("grade")
+                raise RuntimeError("timeout")
+
+        llm = FailingLLM()
+        workflow = self._workflow(llm)
+        workflow.max_attempts = 0
+
+        self._run(workflow)
+        result = self._run(workflow)
+
+        self.assertEqual(llm.calls, ["grade", "grade"])
+        self.assertTrue(result["meta"]["corrective_rag"]["degraded"])
+
+    def test_cached_low_grade_still_rewrites_in_speculative_mode(self):
+        llm = _CountingLLM()
+        workflow = self._workflow(llm, speculative=True)
+
+        self._run(workflow)
+        workflow._speculation_executor().shutdown(wait=True)
+        llm.calls.clear()
+        result = self._run(workflow)
+
+        meta = result["meta"]["corrective_rag"]
+        self.assertEqual(llm.calls, [])
+        self.assertEqual(meta["final_label"], "high")
+        self.assertEqual(meta["speculation"]["launched"], 0)
+        self.assertEqual(meta["cache"], {"grade_hits": 2, "rewrite_hits": 1})
+
+
 if __name__ == "__main__":
     unittest.main()
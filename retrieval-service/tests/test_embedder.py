@@ -0,0 +1,54 @@
+import unittest
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.embedder import SharedSentenceEmbedder
+
+
+class _StubModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size, show_progress_bar, convert_to_numpy, normalize_embeddings):
+        _ = (show_progress_bar, convert_to_numpy)
+        self.calls.append((list(texts), batch_size, normalize_embeddings))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+@dataclass
+class _Doc:
+    content: Optional[str]
+    embedding: Optional[List[float]] = None
+
+
+class SharedSentenceEmbedderTests(unittest.TestCase):
+    def test_queries_encode_in_one_call(self):
+        model = _StubModel()
+        embedder = SharedSentenceEmbedder(model="stub", batch_size=16, backend=model)
+
+        vectors = embedder.embed_queries(["hola", "hello there"])
+
+        self.assertEqual(vectors, [[4.0, 0.5], [11.0, 0.5]])
+        self.assertEqual(model.calls, [(["hola", "hello there"], 16, False)])
+
+    def test_documents_share_the_same_model(self):
+        model = _StubModel()
+        embedder = SharedSentenceEmbedder(model="stub", backend=model)
+        docs = [_Doc("abc"), _Doc(None)]
+
+        embedder.embed_queries(["q"])
+        embedder.embed_documents(docs)
+
+        self.assertEqual(len(model.calls), 2)
+        self.assertEqual(docs[0].embedding, [3.0, 0.5])
+        self.assertEqual(docs[1].embedding, [0.0, 0.5])
+
+    def test_empty_input_skips_model(self):
+        model = _StubModel()
+        embedder = SharedSentenceEmbedder(model="stub", backend=model)
+        self.assertEqual(embedder.embed_queries([]), [])
+        self.assertEqual(model.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from app.embedding_pool import ProcessPoolDocumentEmbedder
+
+
+class _Doc:
+    def __init__(self, content):
+        self.content = content
+        self.embedding = None
+
+
+def _encode(texts):
+    # Later shards finish first, so ordering must come from the pool, not completion time.
+    time.sleep(0.01 * (3 - min(3, int(texts[0].split("-")[1]) // 2)))
+    worker_id = threading.get_ident() % 1000
+    return worker_id, [[float(text.split("-")[1])] for text in texts], 0.5
+
+
+class ProcessPoolDocumentEmbedderTests(unittest.TestCase):
+    def make_embedder(self, shard_size=2):
+        executor = ThreadPoolExecutor(max_workers=3)
+        self.addCleanup(executor.shutdown)
+        return ProcessPoolDocumentEmbedder(
+            model="stub",
+            workers=3,
+            shard_size=shard_size,
+            executor=executor,
+            encode_fn=_encode,
+        )
+
+    def test_vectors_are_assigned_in_input_order(self):
+        embedder = self.make_embedder()
+        docs = [_Doc(f"text-{idx}") for idx in range(7)]
+
+        embedder.embed_documents(docs)
+
+        self.assertEqual([doc.embedding for doc in docs], [[float(idx)] for idx in range(7)])
+
+    def test_per_worker_throughput_is_reported(self):
+        embedder = self.make_embedder(shard_size=3)
+        embedder.embed_documents([_Doc(f"text-{idx}") for idx in range(6)])
+
+        stats = embedder.stats()
+        self.assertEqual(sum(worker["texts"] for worker in stats), 6)
+        for worker in stats:
+            self.assertEqual(worker["texts_per_second"], round(worker["texts"] / worker["seconds"], 1))
+
+        embedder.reset_stats()
+        self.assertEqual(embedder.stats(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.embedding_store import PersistentEmbeddingStore, embed_with_store
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+class _Doc:
+    def __init__(self, content):
+        self.content = content
+        self.embedding = None
+
+
+class _CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, docs):
+        self.calls.append([doc.content for doc in docs])
+        for doc in docs:
+            doc.embedding = [float(len(doc.content)), 0.5, -1.0]
+        return docs
+
+
+class _DictStore:
+    def __init__(self, vectors=None):
+        self.vectors = dict(vectors or {})
+
+    def get_many(self, texts):
+        return [self.vectors.get(text) for text in texts]
+
+    def put_many(self, texts, vectors):
+        self.vectors.update(zip(texts, vectors))
+        return len(texts)
+
+
+class EmbedWithStoreTests(unittest.TestCase):
+    def test_only_misses_are_embedded_and_stored(self):
+        store = _DictStore({"known": [9.0, 9.0, 9.0]})
+        embedder = _CountingEmbedder()
+        docs = [_Doc("known"), _Doc("fresh")]
+
+        embed_with_store(store, docs, embedder.embed_documents)
+
+        self.assertEqual(embedder.calls, [["fresh"]])
+        self.assertEqual(docs[0].embedding, [9.0, 9.0, 9.0])
+        self.assertEqual(store.vectors["fresh"], [5.0, 0.5, -1.0])
+
+    def test_without_store_embeds_everything(self):
+        embedder = _CountingEmbedder()
+        embed_with_store(None, [_Doc("a"), _Doc("b")], embedder.embed_documents)
+        self.assertEqual(embedder.calls, [["a", "b"]])
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class PersistentEmbeddingStoreTests(unittest.TestCase):
+    def test_vectors_survive_reopen(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PersistentEmbeddingStore(path=tmp, model="org/model")
+            store.put_many(["alpha", "beta"], [[1.0, 2.0], [3.0, 4.0]])
+            store.flush()
+
+            reopened = PersistentEmbeddingStore(path=tmp, model="org/model")
+
+            self.assertEqual(reopened.get_many(["beta", "gamma"]), [[3.0, 4.0], None])
+            self.assertEqual(reopened.stats()["rows"], 2)
+
+    def test_models_do_not_share_vectors(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            PersistentEmbeddingStore(path=tmp, model="a").put_many(["alpha"], [[1.0, 2.0]])
+            other = PersistentEmbeddingStore(path=tmp, model="b")
+            self.assertEqual(other.get_many(["alpha"]), [None])
+
+    def test_unflushed_rows_are_dropped_on_reopen(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PersistentEmbeddingStore(path=tmp, model="m", dtype="float16")
+            store.put_many(["alpha"], [[1.0, 2.0]])
+            store.flush()
+            store.put_many(["beta"], [[3.0, 4.0]])
+
+            reopened = PersistentEmbeddingStore(path=tmp, model="m", dtype="float16")
+            reopened.put_many(["gamma"], [[5.0, 6.0]])
+
+            self.assertEqual(reopened.get_many(["alpha", "beta", "gamma"]), [[1.0, 2.0], None, [5.0, 6.0]])
+            matrix_bytes = (Path(tmp) / "m" / "vectors.float16").stat().st_size
+            self.assertEqual(matrix_bytes, 2 * 2 * 2)
+
+    def test_dimension_mismatch_is_rejected(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PersistentEmbeddingStore(path=tmp, model="m")
+            store.put_many(["alpha"], [[1.0, 2.0]])
+            with self.assertRaises(ValueError):
+                store.put_many(["beta"], [[1.0, 2.0, 3.0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import unittest
+from types import SimpleNamespace
+
+from app.documents import BranchQuery
+from app.es_search import (
+    SEARCH_SOURCE_FIELDS,
+    ElasticsearchMultiSearch,
+    build_hybrid_rrf_body,
+    build_search_body,
+    hits_to_documents,
+    is_rejected_request,
+)
+
+
+class _StubClient:
+    def __init__(self, responses):
+        self.responses = responses
+        self.searches = None
+
+    def msearch(self, searches):
+        self.searches = searches
+        return {"responses": self.responses}
+
+
+class MultiSearchBodyTests(unittest.TestCase):
+    def test_bm25_and_knn_bodies(self):
+        bm25 = build_search_body(BranchQuery(branch="bm25", query="panot", top_k=4))
+        knn = build_search_body(BranchQuery(branch="dense", query="panot", top_k=4, embedding=[0.1, 0.2]))
+
+        self.assertEqual(bm25["size"], 4)
+        self.assertEqual(bm25["query"]["bool"]["must"][0]["multi_match"]["query"], "panot")
+        self.assertEqual(knn["knn"]["k"], 4)
+        self.assertEqual(knn["knn"]["num_candidates"], 40)
+        self.assertEqual(knn["knn"]["query_vector"], [0.1, 0.2])
+        self.assertIn("embedding", knn["_source"]["excludes"])
+
+    def test_offset_pages_to_the_tail_below_an_earlier_fetch(self):
+        bm25 = build_search_body(BranchQuery(branch="bm25", query="panot", top_k=8, offset=4))
+        knn = build_search_body(BranchQuery(branch="dense", query="panot", top_k=8, embedding=[0.1], offset=4))
+
+        self.assertEqual((bm25["from"], bm25["size"]), (4, 4))
+        self.assertEqual((knn["from"], knn["size"], knn["knn"]["k"]), (4, 4, 8))
+
+    def test_rescore_oversamples_then_reorders_exactly(self):
+        body = build_search_body(
+            BranchQuery(branch="dense", query="panot", top_k=4, embedding=[0.1, 0.2]),
+            rescore_oversample=2.5,
+        )
+
+        self.assertNotIn("knn", body)
+        self.assertEqual(body["size"], 4)
+        self.assertEqual(body["query"]["knn"]["num_candidates"], 40)
+        self.assertEqual(body["rescore"]["window_size"], 10)
+        script = body["rescore"]["query"]["rescore_query"]["script_score"]["script"]
+        self.assertIn("cosineSimilarity", script["source"])
+        self.assertEqual(script["params"]["query_vector"], [0.1, 0.2])
+        self.assertEqual(body["rescore"]["query"]["query_weight"], 0.0)
+
+    def test_language_is_a_pre_filter_on_every_branch_shape(self):
+        bm25 = build_search_body(BranchQuery(branch="bm25", query="panot", top_k=4, language="es"))
+        dense = BranchQuery(branch="dense", query="panot", top_k=4, embedding=[0.1], language="es")
+        knn = build_search_body(dense)
+        rescored = build_search_body(dense, rescore_oversample=2.0)
+        hybrid = build_hybrid_rrf_body(
+            [BranchQuery(branch="bm25", query="panot", top_k=4, language="es"), dense], top_k=4
+        )
+
+        term = {"term": {"language": "es"}}
+        self.assertEqual(bm25["query"]["bool"]["filter"], [term])
+        self.assertEqual(knn["knn"]["filter"], term)
+        self.assertEqual(rescored["query"]["knn"]["filter"], term)
+        standard, hybrid_knn = hybrid["retriever"]["rrf"]["retrievers"]
+        self.assertEqual(standard["standard"]["query"]["bool"]["filter"], [term])
+        self.assertEqual(hybrid_knn["knn"]["filter"], term)
+        self.assertNotIn("filter", build_search_body(BranchQuery(branch="bm25", query="p", top_k=1))["query"]["bool"])
+
+    def test_stored_snippets_keep_chunk_bodies_on_the_server(self):
+        for query in (
+            BranchQuery(branch="bm25", query="panot", top_k=4),
+            BranchQuery(branch="dense", query="panot", top_k=4, embedding=[0.1]),
+        ):
+            body = build_search_body(query, snippet_mode="stored")
+
+            self.assertEqual(body["_source"], {"includes": SEARCH_SOURCE_FIELDS})
+            self.assertNotIn("content", body["_source"]["includes"])
+            self.assertNotIn("highlight", body)
+
+    def test_highlight_mode_asks_for_one_plain_fragment_of_the_query(self):
+        body = build_search_body(
+            BranchQuery(branch="dense", query="panot tiles", top_k=4, embedding=[0.1]),
+            snippet_mode="highlight",
+        )
+
+        content = body["highlight"]["fields"]["content"]
+        self.assertEqual(content["number_of_fragments"], 1)
+        self.assertEqual(content["highlight_query"], {"match": {"content": "panot tiles"}})
+        self.assertEqual(body["highlight"]["pre_tags"], [""])
+
+        docs = hits_to_documents(
+            {"hits": {"hits": [{"_id": "h1", "_source": {"snippet": "s"}, "highlight": {"content": ["frag"]}}]}}
+        )
+        self.assertEqual(docs[0].meta, {"snippet": "s", "highlight": "frag"})
+
+    def test_unknown_snippet_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ElasticsearchMultiSearch(hosts="http://unused", index="idx", snippet_mode="full", client=object())
+
+    def test_dense_query_requires_embedding(self):
+        with self.assertRaises(ValueError):
+            build_search_body(BranchQuery(branch="dense", query="panot", top_k=4))
+
+    def test_hybrid_rrf_body_combines_all_branches(self):
+        body = build_hybrid_rrf_body(
+            [
+                BranchQuery(branch="bm25", query="hola", top_k=5),
+                BranchQuery(branch="bm25", query="hello", top_k=5),
+                BranchQuery(branch="dense", query="hola", top_k=8, embedding=[0.5]),
+            ],
+            top_k=5,
+            rank_constant=60,
+        )
+
+        rrf = body["retriever"]["rrf"]
+        self.assertEqual(body["size"], 5)
+        self.assertEqual(rrf["rank_constant"], 60)
+        self.assertEqual(rrf["rank_window_size"], 8)
+        self.assertEqual([next(iter(item)) for item in rrf["retrievers"]], ["standard", "standard", "knn"])
+        self.assertEqual(rrf["retrievers"][2]["knn"]["query_vector"], [0.5])
+
+    def test_search_many_interleaves_headers_and_parses_hits(self):
+        client = _StubClient(
+            [
+                {
+                    "hits": {
+                        "hits": [
+                            {
+                                "_id": "h1",
+                                "_score": 2.5,
+                                "_source": {
+                                    "id": "h1",
+                                    "content": "Panots are pavement tiles.",
+                                    "chunk_id": "d1::chunk::0",
+                                    "language": "en",
+                                },
+                            }
+                        ]
+                    }
+                },
+                {"hits": {"hits": []}},
+            ]
+        )
+        backend = ElasticsearchMultiSearch(hosts="http://unused", index="idx_test", client=client)
+
+        rankings = backend.search_many(
+            [
+                BranchQuery(branch="bm25", query="panot", top_k=3),
+                BranchQuery(branch="dense", query="panot", top_k=3, embedding=[1.0]),
+            ]
+        )
+
+        self.assertEqual(len(client.searches), 4)
+        self.assertEqual(client.searches[0], {"index": "idx_test"})
+        self.assertEqual(rankings[0][0].meta, {"chunk_id": "d1::chunk::0", "language": "en"})
+        self.assertEqual(rankings[0][0].score, 2.5)
+        self.assertEqual(rankings[1], [])
+
+    def test_branch_error_raises(self):
+        client = _StubClient([{"error": {"type": "index_not_found_exception"}}])
+        backend = ElasticsearchMultiSearch(hosts="http://unused", index="idx_test", client=client)
+
+        with self.assertRaises(RuntimeError):
+            backend.search_many([BranchQuery(branch="bm25", query="panot", top_k=3)])
+
+    def test_only_lasting_client_errors_count_as_rejected(self):
+        def error(status):
+            err = Exception("failed")
+            err.meta = SimpleNamespace(status=status)
+            return err
+
+        self.assertTrue(is_rejected_request(error(400)))
+        self.assertFalse(is_rejected_request(error(429)))
+        self.assertFalse(is_rejected_request(error(503)))
+        self.assertFalse(is_rejected_request(RuntimeError("connection reset")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import importlib.util
+import unittest
+
+from app.documents import RetrievedDocument
+from app.fusion import scored_hits, select_top_hits, weighted_rrf
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def _doc(chunk_id: str, score: float = 0.0, language: str = "en") -> RetrievedDocument:
+    return RetrievedDocument(
+        id=chunk_id,
+        content=chunk_id,
+        meta={"chunk_id": chunk_id, "doc_id": chunk_id.split("::")[0], "language": language},
+        score=score,
+    )
+
+
+def _reference_rrf(rankings, weights, k):
+    # The dict + full sort merge this module replaced.
+    scores = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc in enumerate(ranking, start=1):
+            scores[doc.meta["chunk_id"]] = scores.get(doc.meta["chunk_id"], 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class WeightedRrfTests(unittest.TestCase):
+    def setUp(self):
+        self.bm25 = [_doc("a::chunk::0"), _doc("b::chunk::0"), _doc("c::chunk::0")]
+        self.dense = [_doc("c::chunk::0"), _doc("d::chunk::0"), _doc("a::chunk::0")]
+
+    def _modes(self):
+        return [False, True] if HAS_NUMPY else [False]
+
+    def test_matches_reference_merge(self):
+        for use_numpy in self._modes():
+            with self.subTest(use_numpy=use_numpy):
+                hits = weighted_rrf([self.bm25, self.dense], weights=[1.0, 0.5], k=10, use_numpy=use_numpy)
+                expected = _reference_rrf([self.bm25, self.dense], [1.0, 0.5], 10)
+
+                self.assertEqual([hit[0] for hit in hits], [key for key, _score in expected])
+                for hit, (_key, score) in zip(hits, expected):
+                    self.assertAlmostEqual(hit[2], score)
+
+    def test_ties_keep_first_seen_order_and_top_k_truncates(self):
+        left = [_doc("x::chunk::0"), _doc("y::chunk::0")]
+        right = [_doc("y::chunk::0"), _doc("x::chunk::0")]
+        for use_numpy in self._modes():
+            with self.subTest(use_numpy=use_numpy):
+                hits = weighted_rrf([left, right], top_k=1, use_numpy=use_numpy)
+
+                self.assertEqual([hit[0] for hit in hits], ["x::chunk::0"])
+
+    def test_documents_are_not_mutated(self):
+        weighted_rrf([self.bm25, self.dense])
+
+        self.assertEqual([doc.score for doc in self.bm25], [0.0, 0.0, 0.0])
+
+    def test_weight_count_must_match_rankings(self):
+        with self.assertRaises(ValueError):
+            weighted_rrf([self.bm25, self.dense], weights=[1.0])
+
+    def test_empty_rankings(self):
+        self.assertEqual(weighted_rrf([[], []]), [])
+
+
+class SelectTopHitsTests(unittest.TestCase):
+    def test_dedupes_by_best_score_and_filters_language(self):
+        hits = scored_hits(
+            [
+                _doc("a::chunk::0", 0.2),
+                _doc("b::chunk::0", 0.9, language="es"),
+                _doc("a::chunk::0", 0.7),
+                _doc("c::chunk::0", 0.5),
+            ]
+        )
+
+        top = select_top_hits(hits, 5, language="en")
+
+        self.assertEqual([(hit[0], hit[2]) for hit in top], [("a::chunk::0", 0.7), ("c::chunk::0", 0.5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
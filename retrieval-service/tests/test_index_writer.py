@@ -0,0 +1,276 @@
+import unittest
+from datetime import datetime, timezone
+
+from app.index_writer import (
+    ElasticsearchBulkWriter,
+    delete_documents,
+    document_store_mapping,
+    document_to_action,
+    drop_index,
+    existing_chunk_hashes,
+    swap_alias,
+    versioned_index_name,
+)
+
+
+class _Doc:
+    def __init__(self, doc_id, content):
+        self.id = doc_id
+        self.content = content
+
+    def to_dict(self):
+        return {"id": self.id, "content": self.content, "chunk_id": f"{self.id}::chunk::0", "sparse_embedding": None}
+
+
+class _Indices:
+    def __init__(self, refresh_interval=None):
+        self.refresh_interval = refresh_interval
+        self.put_calls = []
+        self.refreshed = 0
+
+    def get_settings(self, index, name):
+        _ = name
+        if self.refresh_interval is None:
+            return {}
+        return {index: {"settings": {"index": {"refresh_interval": self.refresh_interval}}}}
+
+    def put_settings(self, index, settings):
+        _ = index
+        self.put_calls.append(settings["index"]["refresh_interval"])
+
+    def refresh(self, index):
+        _ = index
+        self.refreshed += 1
+
+
+class _Client:
+    def __init__(self, refresh_interval=None):
+        self.indices = _Indices(refresh_interval)
+
+
+class _FlakyBulk:
+    """Fails the given ids on the first N calls, as parallel_bulk would report them."""
+
+    def __init__(self, failing_ids, failing_calls=1):
+        self.failing_ids = set(failing_ids)
+        self.failing_calls = failing_calls
+        self.calls = []
+
+    def __call__(self, client, actions, **kwargs):
+        _ = client
+        self.calls.append(([action["_id"] for action in actions], kwargs))
+        fail = len(self.calls) <= self.failing_calls
+        for action in actions:
+            if fail and action["_id"] in self.failing_ids:
+                yield False, {"index": {"_id": action["_id"], "status": 429, "error": "es_rejected_execution"}}
+            else:
+                yield True, {"index": {"_id": action["_id"], "status": 201}}
+
+
+class BulkWriterTests(unittest.TestCase):
+    def make_writer(self, bulk, client=None, max_retries=3):
+        self.sleeps = []
+        return ElasticsearchBulkWriter(
+            client=client or _Client(),
+            index="idx_test",
+            chunk_size=2,
+            thread_count=3,
+            max_retries=max_retries,
+            backoff_s=0.1,
+            parallel_bulk_fn=bulk,
+            sleep_fn=self.sleeps.append,
+        )
+
+    def test_action_matches_document_store_layout(self):
+        action = document_to_action(_Doc("a", "text"), "idx_test")
+        self.assertEqual(action["_id"], "a")
+        self.assertEqual(action["_index"], "idx_test")
+        self.assertNotIn("sparse_embedding", action["_source"])
+        self.assertEqual(action["_source"]["chunk_id"], "a::chunk::0")
+
+    def test_only_failed_items_are_retried_with_backoff(self):
+        bulk = _FlakyBulk(failing_ids={"b"}, failing_calls=2)
+        writer = self.make_writer(bulk)
+
+        written = writer.write([_Doc("a", "x"), _Doc("b", "y"), _Doc("c", "z")])
+
+        self.assertEqual(written, 3)
+        self.assertEqual([ids for ids, _ in bulk.calls], [["a", "b", "c"], ["b"], ["b"]])
+        self.assertEqual(bulk.calls[0][1]["chunk_size"], 2)
+        self.assertEqual(bulk.calls[0][1]["thread_count"], 3)
+        self.assertEqual(self.sleeps, [0.1, 0.2])
+        self.assertEqual(writer.retried_items, 2)
+
+    def test_gives_up_after_max_retries(self):
+        bulk = _FlakyBulk(failing_ids={"a"}, failing_calls=10)
+        writer = self.make_writer(bulk, max_retries=1)
+
+        with self.assertRaises(RuntimeError):
+            writer.write([_Doc("a", "x")])
+        self.assertEqual(len(bulk.calls), 2)
+
+    def test_ingest_pauses_and_restores_refresh(self):
+        client = _Client(refresh_interval="5s")
+        writer = self.make_writer(_FlakyBulk(failing_ids=set()), client=client)
+
+        with writer.ingest():
+            writer.write([_Doc("a", "x")])
+            self.assertEqual(client.indices.put_calls, ["-1"])
+
+        self.assertEqual(client.indices.put_calls, ["-1", "5s"])
+        self.assertEqual(client.indices.refreshed, 1)
+
+    def test_ingest_restores_default_when_unset(self):
+        client = _Client()
+        writer = self.make_writer(_FlakyBulk(failing_ids=set()), client=client)
+
+        with self.assertRaises(ValueError):
+            with writer.ingest():
+                raise ValueError("embedding failed")
+
+        self.assertEqual(client.indices.put_calls, ["-1", None])
+        self.assertEqual(client.indices.refreshed, 1)
+
+
+class DocumentStoreMappingTests(unittest.TestCase):
+    def test_quantized_index_options(self):
+        mapping = document_store_mapping("int8_hnsw")
+        embedding = mapping["properties"]["embedding"]
+        self.assertEqual(embedding["type"], "dense_vector")
+        self.assertEqual(embedding["similarity"], "cosine")
+        self.assertEqual(embedding["index_options"], {"type": "int8_hnsw"})
+
+    def test_unknown_index_type_is_rejected(self):
+        with self.assertRaises(ValueError):
+            document_store_mapping("float16")
+
+
+class IncrementalHelperTests(unittest.TestCase):
+    def test_existing_hashes_group_versions_by_chunk_id(self):
+        hits = [
+            {"_id": "a1", "_source": {"chunk_id": "a::chunk::0", "content_hash": "h1"}},
+            {"_id": "a0", "_source": {"chunk_id": "a::chunk::0"}},
+            {"_id": "b1", "_source": {"chunk_id": "b::chunk::0", "content_hash": "h2"}},
+            {"_id": "x", "_source": {}},
+        ]
+        calls = []
+
+        def scan(client, **kwargs):
+            calls.append(kwargs)
+            return iter(hits)
+
+        existing = existing_chunk_hashes(object(), "idx", scan_fn=scan)
+
+        self.assertEqual(
+            existing,
+            {"a::chunk::0": [("a1", "h1"), ("a0", None)], "b::chunk::0": [("b1", "h2")]},
+        )
+        self.assertEqual(calls[0]["query"]["_source"], ["chunk_id", "content_hash"])
+
+    def test_delete_ignores_already_missing_ids(self):
+        sent = []
+
+        def bulk(client, actions, **kwargs):
+            sent.extend(actions)
+            return 1, [{"delete": {"_id": "gone", "status": 404}}]
+
+        deleted = delete_documents(object(), "idx", ["a0", "gone"], bulk_fn=bulk)
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual([action["_op_type"] for action in sent], ["delete", "delete"])
+
+    def test_delete_raises_on_real_failures(self):
+        def bulk(client, actions, **kwargs):
+            return 0, [{"delete": {"_id": "a0", "status": 429}}]
+
+        with self.assertRaises(RuntimeError):
+            delete_documents(object(), "idx", ["a0"], bulk_fn=bulk)
+
+    def test_delete_without_ids_skips_request(self):
+        def bulk(*_args, **_kwargs):
+            raise AssertionError("bulk should not be called")
+
+        self.assertEqual(delete_documents(object(), "idx", [], bulk_fn=bulk), 0)
+
+
+class _AliasIndices:
+    def __init__(self, aliases=None, concrete=()):
+        self.aliases = dict(aliases or {})
+        self.concrete = set(concrete)
+        self.actions = []
+        self.deleted = []
+
+    def exists_alias(self, name):
+        return any(name in names for names in self.aliases.values())
+
+    def get_alias(self, name):
+        return {index: {"aliases": {name: {}}} for index, names in self.aliases.items() if name in names}
+
+    def exists(self, index):
+        return index in self.concrete or self.exists_alias(index)
+
+    def update_aliases(self, actions):
+        self.actions.append(actions)
+
+    def delete(self, index):
+        self.deleted.append(index)
+
+
+class _AliasClient:
+    def __init__(self, **kwargs):
+        self.indices = _AliasIndices(**kwargs)
+
+
+class AliasSwapTests(unittest.TestCase):
+    def test_versioned_name_sorts_by_build_time(self):
+        first = versioned_index_name("tinge", datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+        second = versioned_index_name("tinge", datetime(2026, 1, 2, 3, 4, 6, tzinfo=timezone.utc))
+        self.assertTrue(first.startswith("tinge__2026"))
+        self.assertLess(first, second)
+
+    def test_swap_moves_alias_in_one_request(self):
+        client = _AliasClient(aliases={"tinge__old": ["tinge"]})
+
+        retired = swap_alias(client, "tinge", "tinge__new")
+
+        self.assertEqual(retired, ["tinge__old"])
+        self.assertEqual(
+            client.indices.actions,
+            [
+                [
+                    {"remove": {"index": "tinge__old", "alias": "tinge"}},
+                    {"add": {"index": "tinge__new", "alias": "tinge"}},
+                ]
+            ],
+        )
+
+    def test_first_swap_replaces_concrete_index_atomically(self):
+        client = _AliasClient(concrete={"tinge"})
+
+        retired = swap_alias(client, "tinge", "tinge__new")
+
+        self.assertEqual(retired, [])
+        self.assertEqual(
+            client.indices.actions[0],
+            [
+                {"remove_index": {"index": "tinge"}},
+                {"add": {"index": "tinge__new", "alias": "tinge"}},
+            ],
+        )
+
+    def test_drop_resolves_an_alias_to_its_indices(self):
+        client = _AliasClient(aliases={"tinge__old": ["tinge"]})
+
+        self.assertEqual(drop_index(client, "tinge"), ["tinge__old"])
+        self.assertEqual(client.indices.deleted, [["tinge__old"]])
+
+    def test_drop_deletes_a_concrete_index_and_skips_a_missing_one(self):
+        client = _AliasClient(concrete={"tinge"})
+
+        self.assertEqual(drop_index(client, "tinge"), ["tinge"])
+        self.assertEqual(drop_index(client, "other"), [])
+        self.assertEqual(client.indices.deleted, [["tinge"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
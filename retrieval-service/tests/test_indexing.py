@@ -0,0 +1,100 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.indexing import (
+    SNIPPET_CHARS,
+    batched,
+    build_chunk_records,
+    chunk_fingerprint,
+    iter_chunk_records,
+    iter_corpus_records,
+    load_corpus_records,
+)
+
+
+def _record(idx: int, content: str) -> dict:
+    return {"id": f"doc{idx}", "title": f"Doc {idx}", "content": content, "language": "en"}
+
+
+class CorpusStreamingTests(unittest.TestCase):
+    def test_missing_corpus_fails_before_iteration(self):
+        with self.assertRaises(FileNotFoundError):
+            iter_corpus_records("/nonexistent/corpus.jsonl")
+
+    def test_records_are_read_lazily(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "corpus.jsonl"
+            lines = [json.dumps(_record(0, "alpha")), "", json.dumps(_record(1, "beta")), "{broken"]
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+            records = iter_corpus_records(str(path))
+            self.assertEqual(next(records)["id"], "doc0")
+            self.assertEqual(next(records)["id"], "doc1")
+            with self.assertRaises(json.JSONDecodeError):
+                next(records)
+
+    def test_list_helpers_match_streaming_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "corpus.jsonl"
+            path.write_text(
+                "\n".join(json.dumps(_record(idx, "word " * 120)) for idx in range(3)),
+                encoding="utf-8",
+            )
+
+            records = load_corpus_records(str(path))
+            streamed = list(
+                iter_chunk_records(iter_corpus_records(str(path)), chunk_size=300, chunk_overlap=50)
+            )
+
+            self.assertEqual(build_chunk_records(records, chunk_size=300, chunk_overlap=50), streamed)
+            self.assertEqual(streamed[1]["chunk_id"], "doc0::chunk::1")
+            self.assertEqual(streamed[0]["snippet"], streamed[0]["content"][:SNIPPET_CHARS])
+
+    def test_chunking_pulls_records_on_demand(self):
+        pulled = []
+
+        def source():
+            for idx in range(100):
+                pulled.append(idx)
+                yield _record(idx, "short text")
+
+        first_batch = next(batched(iter_chunk_records(source(), chunk_size=200, chunk_overlap=0), 4))
+
+        self.assertEqual(len(first_batch), 4)
+        self.assertLessEqual(len(pulled), 5)
+
+
+class BatchedTests(unittest.TestCase):
+    def test_batches_have_fixed_size_with_short_tail(self):
+        self.assertEqual(list(batched(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(list(batched([], 3)), [])
+
+
+class ChunkFingerprintTests(unittest.TestCase):
+    def _chunk(self, **overrides) -> dict:
+        chunk = next(iter_chunk_records([_record(0, "alpha beta gamma")], chunk_size=300, chunk_overlap=0))
+        chunk.update(overrides)
+        return chunk
+
+    def test_fingerprint_is_stable(self):
+        first = chunk_fingerprint(self._chunk(), chunk_size=300, chunk_overlap=0, embed_model="m")
+        second = chunk_fingerprint(self._chunk(), chunk_size=300, chunk_overlap=0, embed_model="m")
+        self.assertEqual(first, second)
+
+    def test_content_params_model_and_meta_change_fingerprint(self):
+        base = chunk_fingerprint(self._chunk(), chunk_size=300, chunk_overlap=0, embed_model="m")
+        variants = [
+            chunk_fingerprint(self._chunk(content="alpha beta"), chunk_size=300, chunk_overlap=0, embed_model="m"),
+            chunk_fingerprint(self._chunk(), chunk_size=400, chunk_overlap=0, embed_model="m"),
+            chunk_fingerprint(self._chunk(), chunk_size=300, chunk_overlap=0, embed_model="other"),
+            chunk_fingerprint(self._chunk(), chunk_size=300, chunk_overlap=0, embed_model=""),
+            chunk_fingerprint(self._chunk(title="Renamed"), chunk_size=300, chunk_overlap=0, embed_model="m"),
+        ]
+        self.assertNotIn(base, variants)
+        self.assertEqual(len(set(variants)), len(variants))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.corrective_rag_graph import OpenAICorrectiveClient
+from app.llm_http import HttpStatusError, PooledJsonClient, deadline_timeout
+
+
+class _StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        server.requests.append((self.client_address, self.headers.get("Authorization"), body))
+        time.sleep(float(body.get("delay_s", 0.0)))
+        if body.get("status"):
+            payload = {"error": "boom"}
+            self.send_response(int(body["status"]))
+        else:
+            content = json.dumps({"label": "high", "score": 0.9, "reason": "ok"})
+            payload = {"choices": [{"message": {"content": content}}]}
+            self.send_response(200)
+        data = json.dumps(payload).encode("utf-8")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on its deadline.
+            return
+        if body.get("drop_after"):
+            # Close without announcing it, like a load balancer reaping an idle connection.
+            self.close_connection = True
+
+    def log_message(self, *_args):
+        return None
+
+
+class LocalServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubLLMHandler)
+        self.server.daemon_threads = True
+        self.server.requests = []
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+
+    def client_ports(self):
+        return {address[1] for address, _auth, _body in self.server.requests}
+
+
+class PooledJsonClientTests(LocalServerTestCase):
+    def test_sequential_calls_reuse_one_connection(self):
+        client = PooledJsonClient(self.url, headers={"Authorization": "Bearer k"})
+        self.addCleanup(client.close)
+
+        for _ in range(3):
+            self.assertIn("choices", client.post_json({"x": 1}, timeout_s=2.0))
+
+        self.assertEqual(client.connections_opened, 1)
+        self.assertEqual(len(self.client_ports()), 1)
+        self.assertEqual(self.server.requests[0][1], "Bearer k")
+
+    def test_stale_pooled_connection_is_replaced(self):
+        client = PooledJsonClient(self.url)
+        self.addCleanup(client.close)
+
+        client.post_json({"drop_after": True}, timeout_s=2.0)
+        time.sleep(0.05)
+        client.post_json({}, timeout_s=2.0)
+
+        self.assertEqual(client.connections_opened, 2)
+
+    def test_slow_response_hits_the_deadline(self):
+        client = PooledJsonClient(self.url)
+        self.addCleanup(client.close)
+
+        with self.assertRaises(TimeoutError):
+            client.post_json({"delay_s": 0.5}, timeout_s=0.1)
+
+    def test_error_status_raises(self):
+        client = PooledJsonClient(self.url)
+        self.addCleanup(client.close)
+
+        with self.assertRaises(HttpStatusError) as ctx:
+            client.post_json({"status": 500}, timeout_s=2.0)
+        self.assertEqual(ctx.exception.status, 500)
+        self.assertIn("boom", ctx.exception.detail)
+
+
+class DeadlineTests(unittest.TestCase):
+    def test_timeout_is_capped_by_remaining_budget(self):
+        self.assertEqual(deadline_timeout(10.0, cap_s=0.9, now_fn=lambda: 9.0), 0.9)
+        self.assertAlmostEqual(deadline_timeout(10.0, cap_s=0.9, now_fn=lambda: 9.7), 0.25)
+        with self.assertRaises(TimeoutError):
+            deadline_timeout(10.0, cap_s=0.9, now_fn=lambda: 10.0)
+
+
+class OpenAIClientTests(LocalServerTestCase):
+    def test_grades_reuse_the_pooled_connection(self):
+        client = OpenAICorrectiveClient(api_key="k", model="m", endpoint=self.url)
+        self.addCleanup(client.http.close)
+        kwargs = dict(
+            query_original="q",
+            query_en="q",
+            dialogue_context=[],
+            retrieval_results=[],
+        )
+
+        for _ in range(2):
+            grade = client.grade_relevance(**kwargs, deadline_monotonic=time.perf_counter() + 5.0)
+            self.assertEqual(grade["label"], "high")
+
+        self.assertEqual(client.http.connections_opened, 1)
+        self.assertEqual(self.server.requests[0][2]["model"], "m")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+
+from app.corrective_rag_graph import CorrectiveRagWorkflow
+from app.local_grader import CrossEncoderGrader
+
+
+class _StubEncoder:
+    """Returns raw logits, like ms-marco cross-encoders: high when the passage mentions the query's last word."""
+
+    def __init__(self, logits=None):
+        self.calls = []
+        self.logits = logits
+
+    def predict(self, pairs, batch_size, show_progress_bar, convert_to_numpy):
+        _ = (show_progress_bar, convert_to_numpy)
+        self.calls.append((list(pairs), batch_size))
+        if self.logits is not None:
+            return list(self.logits)
+        return [8.6 if query.split()[-1] in passage else -4.3 for query, passage in pairs]
+
+
+class _NoopLogger:
+    def warning(self, *_args, **_kwargs):
+        return None
+
+
+def _result(chunk_id, snippet, title="Barcelona"):
+    return {"chunk_id": chunk_id, "title": title, "snippet": snippet, "score": 0.1}
+
+
+RESULTS = [
+    _result("c1", "Opening hours of the market."),
+    _result("c2", "The panot is a pavement tile."),
+    _result("c3", "More panot designs."),
+    _result("c4", "Panot tail end."),
+]
+
+
+class CrossEncoderGraderTests(unittest.TestCase):
+    def test_scores_top_n_in_one_batch_and_reranks(self):
+        encoder = _StubEncoder()
+        grader = CrossEncoderGrader(model="stub", top_n=3, batch_size=8, encoder=encoder)
+
+        grade = grader.grade_relevance(
+            query_original="panot",
+            query_en="history of panot",
+            dialogue_context=[],
+            retrieval_results=RESULTS,
+        )
+
+        self.assertEqual(len(encoder.calls), 1)
+        pairs, batch_size = encoder.calls[0]
+        self.assertEqual(batch_size, 8)
+        self.assertEqual(pairs[1], ("history of panot", "Barcelona. The panot is a pavement tile."))
+        self.assertEqual(len(pairs), 3)
+        self.assertEqual(grade["label"], "high")
+        self.assertEqual(grade["model"], "stub")
+        self.assertEqual(grade["rerank_order"], [1, 2, 0, 3])
+
+    def test_weak_matches_grade_none(self):
+        grader = CrossEncoderGrader(model="stub", encoder=_StubEncoder())
+
+        grade = grader.grade_relevance(
+            query_original="x",
+            query_en="mosaic",
+            dialogue_context=[],
+            retrieval_results=RESULTS[:1],
+        )
+        empty = grader.grade_relevance(query_original="x", query_en="mosaic", dialogue_context=[], retrieval_results=[])
+
+        self.assertEqual(grade["label"], "none")
+        self.assertEqual(empty["label"], "none")
+
+    def test_logits_go_through_a_sigmoid_and_rank_unsaturated(self):
+        grader = CrossEncoderGrader(model="stub", top_n=4, encoder=_StubEncoder([-1.2, 0.3, 12.0, 11.0]))
+
+        grade = grader.grade_relevance(
+            query_original="q",
+            query_en="q",
+            dialogue_context=[],
+            retrieval_results=RESULTS,
+        )
+        medium = CrossEncoderGrader(model="stub", encoder=_StubEncoder([0.0, -3.0])).grade_relevance(
+            query_original="q",
+            query_en="q",
+            dialogue_context=[],
+            retrieval_results=RESULTS[:2],
+        )
+
+        self.assertEqual(grade["rerank_order"], [2, 3, 1, 0])
+        self.assertEqual(grade["label"], "high")
+        self.assertEqual(medium["label"], "medium")
+        self.assertEqual(medium["score"], 0.5)
+        self.assertAlmostEqual(CrossEncoderGrader.probability(-4.3), 0.0134, places=4)
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            CrossEncoderGrader(model="stub", backend="tensorrt", encoder=_StubEncoder())
+
+    def test_workflow_returns_reranked_results(self):
+        grader = CrossEncoderGrader(model="stub", top_n=3, encoder=_StubEncoder())
+        workflow = CorrectiveRagWorkflow(
+            retrieve_fn=lambda **kwargs: {"results": list(RESULTS), "used_queries": ["panot"]},
+            grade_fn=grader.grade_relevance,
+            logger=_NoopLogger(),
+            use_langgraph=False,
+        )
+
+        result = workflow.run(
+            query_original="panot",
+            query_en="history of panot",
+            language="en",
+            top_k=4,
+            dialogue_context=[],
+            index_name="idx_test",
+        )
+
+        self.assertEqual([item["chunk_id"] for item in result["results"]], ["c2", "c3", "c1", "c4"])
+        self.assertEqual(result["meta"]["corrective_rag"]["relevance_model"], "stub")
+        self.assertEqual(result["meta"]["corrective_rag"]["attempts_used"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
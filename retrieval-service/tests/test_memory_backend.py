@@ -0,0 +1,227 @@
+import importlib.util
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.config import settings
+from app.documents import BranchQuery, RetrievedDocument
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def _chunk(chunk_id: str, content: str, language: str = "en", embedding=None) -> RetrievedDocument:
+    return RetrievedDocument(
+        id=chunk_id,
+        content=content,
+        meta={"chunk_id": chunk_id, "doc_id": chunk_id.split("::")[0], "title": "", "language": language},
+        embedding=embedding,
+    )
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class InMemoryBackendTests(unittest.TestCase):
+    def setUp(self):
+        from app.memory_backend import InMemoryRetrievalBackend
+
+        self.backend = InMemoryRetrievalBackend.build(
+            [
+                _chunk("tiles::chunk::0", "Panot tiles pave the streets of Barcelona", embedding=[1.0, 0.0]),
+                _chunk("gaudi::chunk::0", "Gaudi designed the Sagrada Familia in Barcelona", embedding=[0.6, 0.8]),
+                _chunk("food::chunk::0", "Paella is a rice dish from Valencia", embedding=[0.0, 1.0]),
+            ]
+        )
+
+    def test_bm25_ranks_rarer_term_matches_first(self):
+        hits = self.backend.search_bm25("barcelona tiles", top_k=5)
+
+        self.assertEqual([hit.id for hit in hits], ["tiles::chunk::0", "gaudi::chunk::0"])
+        self.assertGreater(hits[0].score, hits[1].score)
+        self.assertIsNone(hits[0].embedding)
+
+    def test_bm25_without_matching_terms_is_empty(self):
+        self.assertEqual(self.backend.search_bm25("zzz", top_k=3), [])
+
+    def test_dense_uses_cosine_on_es_scale(self):
+        hits = self.backend.search_dense([2.0, 0.0], top_k=2)
+
+        self.assertEqual([hit.id for hit in hits], ["tiles::chunk::0", "gaudi::chunk::0"])
+        self.assertAlmostEqual(hits[0].score, 1.0, places=5)
+        self.assertAlmostEqual(hits[1].score, 0.8, places=5)
+
+    def test_search_many_follows_plan_order(self):
+        rankings = self.backend.search_many(
+            [
+                BranchQuery(branch="bm25", query="paella", top_k=1),
+                BranchQuery(branch="dense", query="paella", top_k=1, embedding=[0.0, 1.0]),
+            ]
+        )
+        self.assertEqual(
+            [[hit.id for hit in ranking] for ranking in rankings],
+            [["food::chunk::0"], ["food::chunk::0"]],
+        )
+
+    def test_language_pre_filter_returns_only_eligible_chunks(self):
+        from app.memory_backend import InMemoryRetrievalBackend
+
+        backend = InMemoryRetrievalBackend.build(
+            [
+                _chunk("en1::chunk::0", "Barcelona tiles", embedding=[1.0, 0.0]),
+                _chunk("en2::chunk::0", "Barcelona tiles again", embedding=[0.9, 0.1]),
+                _chunk("es1::chunk::0", "Baldosas de Barcelona", language="es", embedding=[0.5, 0.5]),
+            ]
+        )
+
+        bm25 = backend.search_bm25("barcelona", 2, language="es")
+        self.assertEqual([hit.id for hit in bm25], ["es1::chunk::0"])
+        self.assertEqual([hit.id for hit in backend.search_dense([1.0, 0.0], 1, language="es")], ["es1::chunk::0"])
+        self.assertEqual(backend.search_dense([1.0, 0.0], 1, language="ca"), [])
+
+    def test_top_k_indices_matches_full_sort(self):
+        import numpy as np
+
+        from app.memory_backend import top_k_indices
+
+        scores = np.array([0.1, 0.9, 0.5, 0.9, 0.3], dtype=np.float32)
+        self.assertEqual(top_k_indices(scores, 3).tolist(), [1, 3, 2])
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class SnapshotTests(unittest.TestCase):
+    def _backend(self):
+        from app.memory_backend import InMemoryRetrievalBackend
+
+        return InMemoryRetrievalBackend.build(
+            [
+                _chunk("tiles::chunk::0", "Panot tiles pave Barcelona", embedding=[1.0, 0.0]),
+                _chunk("cafe::chunk::0", "Café con leche in Madrid", language="es", embedding=[0.0, 1.0]),
+            ]
+        )
+
+    def test_snapshot_round_trip_matches_built_engine(self):
+        import numpy as np
+
+        from app.memory_backend import InMemoryRetrievalBackend
+
+        built = self._backend()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = built.save_snapshot(str(Path(tmp) / "snap"), metadata={"embed_model": "m"})
+            loaded = InMemoryRetrievalBackend.load_snapshot(str(path))
+
+            self.assertIsInstance(loaded.indptr, np.memmap)
+            self.assertEqual(loaded.metadata["embed_model"], "m")
+            self.assertEqual(loaded.terms.get("café"), built.terms["café"])
+            self.assertIsNone(loaded.terms.get("zzz"))
+            for query in ("barcelona tiles", "café madrid"):
+                self.assertEqual(loaded.search_bm25(query, 2), built.search_bm25(query, 2))
+            self.assertEqual(loaded.search_dense([0.0, 3.0], 1)[0].meta["language"], "es")
+            self.assertEqual(loaded.languages, ["en", "es"])
+            self.assertEqual(loaded.search_bm25("barcelona tiles", 2, language="es"), [])
+            self.assertEqual(list(loaded.documents), list(built.documents))
+            self.assertEqual(loaded.documents[-1], built.documents[1])
+            self.assertEqual(loaded.documents[:1], [built.documents[0]])
+
+    def test_resave_replaces_snapshot_atomically(self):
+        from app.memory_backend import InMemoryRetrievalBackend, snapshot_exists
+
+        with tempfile.TemporaryDirectory() as tmp:
+            target = str(Path(tmp) / "snap")
+            self._backend().save_snapshot(target)
+            InMemoryRetrievalBackend.build([_chunk("solo::chunk::0", "only one")]).save_snapshot(target)
+
+            loaded = InMemoryRetrievalBackend.load_snapshot(target)
+            self.assertTrue(snapshot_exists(target))
+            self.assertEqual(len(loaded), 1)
+            self.assertIsNone(loaded.vectors)
+            self.assertTrue(Path(target).is_symlink())
+            # The live version plus the one it replaced, for readers that resolved it mid-swap.
+            self.assertEqual(len(list(Path(tmp).glob("snap.v*"))), 2)
+
+            previous = Path(target).resolve()
+            self._backend().save_snapshot(target)
+            versions = sorted(path.name for path in Path(tmp).glob("snap.v*"))
+            self.assertEqual(len(versions), 2)
+            self.assertIn(previous.name, versions)
+            self.assertEqual(len(InMemoryRetrievalBackend.load_snapshot(target)), 2)
+
+    def test_legacy_snapshot_directory_is_replaced_by_a_link(self):
+        from app.memory_backend import InMemoryRetrievalBackend
+
+        with tempfile.TemporaryDirectory() as tmp:
+            target = Path(tmp) / "snap"
+            staged = self._backend().save_snapshot(str(Path(tmp) / "old"))
+            shutil.copytree(staged.resolve(), target)
+
+            self._backend().save_snapshot(str(target))
+
+            self.assertTrue(target.is_symlink())
+            self.assertTrue((Path(tmp) / "snap.v0-legacy").is_dir())
+            self.assertEqual(len(InMemoryRetrievalBackend.load_snapshot(str(target))), 2)
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class MemoryBackendServiceTests(unittest.TestCase):
+    def test_service_serves_search_without_elasticsearch(self):
+        from app.search import RetrievalService
+
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = Path(tmp) / "corpus.jsonl"
+            records = [
+                {"id": "tiles", "title": "Panot", "content": "Panot tiles pave Barcelona streets.", "language": "en"},
+                {"id": "rajola", "title": "Rajola", "content": "Les rajoles de Barcelona.", "language": "ca"},
+            ]
+            corpus.write_text("\n".join(json.dumps(record) for record in records), encoding="utf-8")
+            with mock.patch.multiple(
+                settings,
+                retrieval_backend="memory",
+                default_corpus_path=str(corpus),
+                retrieval_dense_enabled=False,
+                retrieval_corrective_rag_enabled=False,
+                retrieval_log_timing=False,
+            ):
+                service = RetrievalService()
+                self.addCleanup(service._branch_executor.shutdown, wait=False)
+
+                result = service.search(query_original="barcelona tiles", language="en")
+                reindexed = service.index_corpus(path=str(corpus), chunk_size=300, chunk_overlap=0)
+
+        self.assertTrue(service.ping())
+        self.assertIsNone(service.elasticsearch_reachable())
+        self.assertEqual([item["chunk_id"] for item in result["results"]], ["tiles::chunk::0"])
+        self.assertEqual(reindexed["indexed_chunks"], 2)
+
+    def test_workers_start_from_snapshot_without_corpus(self):
+        from app.search import RetrievalService
+
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = Path(tmp) / "corpus.jsonl"
+            corpus.write_text(
+                json.dumps({"id": "tiles", "title": "Panot", "content": "Panot tiles.", "language": "en"}),
+                encoding="utf-8",
+            )
+            snapshot = str(Path(tmp) / "snapshot")
+            common = dict(
+                retrieval_backend="memory",
+                retrieval_snapshot_path=snapshot,
+                retrieval_dense_enabled=False,
+                retrieval_corrective_rag_enabled=False,
+                retrieval_log_timing=False,
+            )
+            with mock.patch.multiple(settings, default_corpus_path=str(corpus), **common):
+                builder = RetrievalService()
+                self.addCleanup(builder._branch_executor.shutdown, wait=False)
+                result = builder.index_corpus(snapshot=True)
+            with mock.patch.multiple(settings, default_corpus_path=str(Path(tmp) / "missing.jsonl"), **common):
+                worker = RetrievalService()
+                self.addCleanup(worker._branch_executor.shutdown, wait=False)
+                hits = worker.search(query_original="panot")
+
+        self.assertEqual(result["snapshot_path"], snapshot)
+        self.assertIsNone(worker.bootstrap_error)
+        self.assertEqual([item["chunk_id"] for item in hits["results"]], ["tiles::chunk::0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
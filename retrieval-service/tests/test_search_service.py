@@ -0,0 +1,730 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+from unittest import mock
+
+from app.config import settings
+from app.documents import RetrievedDocument
+from app.embedding_pool import ProcessPoolDocumentEmbedder
+from app.indexing import chunk_fingerprint
+from app.search import RetrievalService
+
+
+@dataclass
+class _Doc:
+    content: str
+    meta: Dict[str, Any] = field(default_factory=dict)
+    score: Optional[float] = None
+    embedding: Optional[list] = None
+
+
+def _doc(chunk_id: str, score: float, language: str = "en") -> _Doc:
+    return _Doc(
+        content=f"content for {chunk_id}",
+        meta={
+            "chunk_id": chunk_id,
+            "doc_id": chunk_id.split("::")[0],
+            "title": chunk_id,
+            "url": f"https://example.org/{chunk_id}",
+            "source": "example",
+            "language": language,
+        },
+        score=score,
+    )
+
+
+class _StubEmbedder:
+    """Encodes text as code points so stub retrievers can recover the query."""
+
+    def __init__(self):
+        self.batches = []
+
+    @property
+    def texts(self):
+        return [text for batch in self.batches for text in batch]
+
+    def embed_queries(self, texts):
+        self.batches.append(list(texts))
+        return [[float(ord(ch)) for ch in text] for text in texts]
+
+
+def _decode(embedding) -> str:
+    return "".join(chr(int(value)) for value in embedding)
+
+
+class _SlowPipeline:
+    """Mimics Pipeline.run for the single-query bm25/dense graphs."""
+
+    def __init__(self, component: str, delay_s: float, docs_by_query: Dict[str, list]):
+        self.component = component
+        self.delay_s = delay_s
+        self.docs_by_query = docs_by_query
+        self.calls = []
+
+    def run(self, data, include_outputs_from=None):
+        _ = include_outputs_from
+        time.sleep(self.delay_s)
+        if "query_embedding" in data[self.component]:
+            query = _decode(data[self.component]["query_embedding"])
+        else:
+            query = data[self.component]["query"]
+        self.calls.append(query)
+        return {self.component: {"documents": list(self.docs_by_query.get(query, []))}}
+
+
+class RetrievalServiceTestCase(unittest.TestCase):
+    def make_service(self) -> RetrievalService:
+        service = RetrievalService()
+        service._retriever = object()
+        service._bootstrap_error = None
+        self.addCleanup(service._branch_executor.shutdown, wait=False)
+        return service
+
+
+class ConcurrentBranchTests(RetrievalServiceTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            settings,
+            retrieval_dense_enabled=True,
+            retrieval_corrective_rag_enabled=False,
+            retrieval_log_timing=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _wire(self, service: RetrievalService, delay_s: float) -> None:
+        service._embedder = _StubEmbedder()
+        service._pipeline_single = _SlowPipeline(
+            "bm25",
+            delay_s,
+            {
+                "barcelona tiles": [_doc("d1::chunk::0", 3.0), _doc("d2::chunk::0", 2.0)],
+                "panot history": [_doc("d3::chunk::0", 4.0)],
+            },
+        )
+        service._pipeline_dense_single = _SlowPipeline(
+            "dense",
+            delay_s,
+            {
+                "barcelona tiles": [_doc("d2::chunk::0", 0.9)],
+                "panot history": [_doc("d3::chunk::0", 0.8), _doc("d4::chunk::0", 0.7, "es")],
+            },
+        )
+
+    def test_branches_and_sub_queries_run_concurrently(self):
+        service = self.make_service()
+        delay_s = 0.2
+        self._wire(service, delay_s)
+
+        started = time.perf_counter()
+        result = service.search(query_original="barcelona tiles", query_en="panot history", top_k=5)
+        elapsed = time.perf_counter() - started
+
+        # Four sub-queries at 200ms each would take ~800ms serially.
+        self.assertLess(elapsed, delay_s * 3)
+        self.assertEqual(len(service._pipeline_single.calls), 2)
+        self.assertEqual(len(service._pipeline_dense_single.calls), 2)
+        self.assertEqual(result["used_queries"], ["barcelona tiles", "panot history"])
+        chunk_ids = [item["chunk_id"] for item in result["results"]]
+        self.assertEqual(len(chunk_ids), len(set(chunk_ids)))
+        self.assertIn("d3::chunk::0", chunk_ids)
+
+    def test_async_search_matches_sync_results(self):
+        service = self.make_service()
+        self._wire(service, 0.0)
+
+        expected = service.search(query_original="barcelona tiles", query_en="panot history", language="en")
+        actual = asyncio.run(
+            service.search_async(query_original="barcelona tiles", query_en="panot history", language="en")
+        )
+
+        self.assertEqual(
+            [item["chunk_id"] for item in actual["results"]],
+            [item["chunk_id"] for item in expected["results"]],
+        )
+        self.assertNotIn("d4::chunk::0", [item["chunk_id"] for item in actual["results"]])
+
+    def test_async_search_encodes_queries_off_the_event_loop(self):
+        service = self.make_service()
+        self._wire(service, 0.0)
+        encode = service._embedder.embed_queries
+        threads = []
+
+        def embed_queries(texts):
+            threads.append(threading.get_ident())
+            return encode(texts)
+
+        service._embedder.embed_queries = embed_queries
+        asyncio.run(service.search_async(query_original="barcelona tiles", query_en="panot history"))
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+
+    def test_dense_failure_keeps_bm25_results(self):
+        service = self.make_service()
+        self._wire(service, 0.0)
+
+        def broken(*_args, **_kwargs):
+            raise RuntimeError("embedder offline")
+
+        service._pipeline_dense_single.run = broken
+        result = service.search(query_original="barcelona tiles", top_k=3)
+
+        self.assertEqual(
+            [item["chunk_id"] for item in result["results"]],
+            ["d1::chunk::0", "d2::chunk::0"],
+        )
+
+    def test_repeat_queries_reuse_cached_embeddings(self):
+        service = self.make_service()
+        self._wire(service, 0.0)
+
+        service.search(query_original="barcelona tiles", query_en="panot history")
+        service._bump_index_generation()
+        service.search(query_original="barcelona  tiles ", query_en="panot history")
+
+        self.assertEqual(service._embedder.texts, ["barcelona tiles", "panot history"])
+        stats = service.cache_stats()["query_embedding"]
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 2)
+
+
+class _StubMultiSearch:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    def search_many(self, queries):
+        self.calls.append(list(queries))
+        if self.fail:
+            raise RuntimeError("cluster unavailable")
+        rankings = []
+        for query in queries:
+            prefix = "b" if query.branch == "bm25" else "v"
+            rankings.append(
+                [
+                    RetrievedDocument(
+                        id=f"{prefix}-{query.query}",
+                        content=f"{query.branch} hit for {query.query}",
+                        meta={"chunk_id": f"{prefix}-{query.query}::chunk::0", "doc_id": prefix},
+                        score=1.0,
+                    )
+                ]
+            )
+        return rankings
+
+
+class _BadRequest(Exception):
+    """Shape of an elasticsearch-py 7.x `RequestError`."""
+
+    status_code = 400
+
+
+class _StubHybridSearch(_StubMultiSearch):
+    def __init__(self, fail: bool = False, error: Optional[Exception] = None):
+        super().__init__()
+        self.hybrid_error = error or (RuntimeError("connection reset") if fail else None)
+        self.hybrid_calls = []
+
+    def search_hybrid(self, queries, *, top_k, rank_constant):
+        self.hybrid_calls.append((list(queries), top_k, rank_constant))
+        if self.hybrid_error is not None:
+            raise self.hybrid_error
+        return [
+            RetrievedDocument(
+                id="h1",
+                content="fused hit",
+                meta={"chunk_id": "h1::chunk::0", "doc_id": "h1"},
+                score=0.032,
+            )
+        ]
+
+
+class MultiSearchTests(RetrievalServiceTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            settings,
+            retrieval_dense_enabled=True,
+            retrieval_corrective_rag_enabled=False,
+            retrieval_log_timing=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_all_branches_share_one_round_trip(self):
+        service = self.make_service()
+        service._embedder = _StubEmbedder()
+        service._es_search = _StubMultiSearch()
+
+        result = service.search(query_original="hola barcelona", query_en="hello barcelona", top_k=4)
+
+        self.assertEqual(len(service._es_search.calls), 1)
+        plan = service._es_search.calls[0]
+        self.assertEqual(
+            [(query.branch, query.query) for query in plan],
+            [
+                ("bm25", "hola barcelona"),
+                ("bm25", "hello barcelona"),
+                ("dense", "hola barcelona"),
+                ("dense", "hello barcelona"),
+            ],
+        )
+        self.assertTrue(all(query.embedding for query in plan if query.branch == "dense"))
+        self.assertEqual(service._embedder.batches, [["hola barcelona", "hello barcelona"]])
+        self.assertEqual(len(result["results"]), 4)
+
+    def test_language_is_pushed_into_every_branch(self):
+        service = self.make_service()
+        service._embedder = _StubEmbedder()
+        service._es_search = _StubMultiSearch()
+
+        service.search(query_original="hola", language="es", top_k=4)
+        with mock.patch.object(settings, "retrieval_language_prefilter", False):
+            service.search(query_original="adios", language="es", top_k=4)
+
+        self.assertEqual([query.language for query in service._es_search.calls[0]], ["es", "es"])
+        self.assertEqual([query.language for query in service._es_search.calls[1]], [None, None])
+
+    def test_pipeline_fallback_passes_language_filters(self):
+        service = self.make_service()
+        service._es_search = _StubMultiSearch(fail=True)
+        service._pipeline_single = _SlowPipeline("bm25", 0.0, {"tiles": [_doc("d1::chunk::0", 1.0, "es")]})
+
+        with mock.patch.object(service._pipeline_single, "run", wraps=service._pipeline_single.run) as run:
+            service.search(query_original="tiles", language="es")
+
+        self.assertEqual(
+            run.call_args.kwargs["data"]["bm25"]["filters"],
+            {"field": "meta.language", "operator": "==", "value": "es"},
+        )
+
+    def test_results_use_highlight_then_stored_snippet_then_content(self):
+        service = self.make_service()
+        docs = [
+            RetrievedDocument(id="a", content=None, meta={"chunk_id": "a", "snippet": "s", "highlight": "h"}),
+            RetrievedDocument(id="b", content=None, meta={"chunk_id": "b", "snippet": "stored"}),
+            RetrievedDocument(id="c", content="x" * 500, meta={"chunk_id": "c"}),
+        ]
+
+        snippets = [service._result_snippet(doc) for doc in docs]
+
+        self.assertEqual(snippets, ["h", "stored", "x" * 420])
+
+    def test_msearch_failure_falls_back_to_pipelines(self):
+        service = self.make_service()
+        service._es_search = _StubMultiSearch(fail=True)
+        service._pipeline_single = _SlowPipeline("bm25", 0.0, {"tiles": [_doc("d1::chunk::0", 1.0)]})
+
+        result = service.search(query_original="tiles")
+
+        self.assertEqual(len(service._es_search.calls), 1)
+        self.assertEqual([item["chunk_id"] for item in result["results"]], ["d1::chunk::0"])
+
+
+class ServerHybridTests(RetrievalServiceTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            settings,
+            retrieval_dense_enabled=True,
+            retrieval_hybrid_mode="es_rrf",
+            retrieval_corrective_rag_enabled=False,
+            retrieval_log_timing=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_es_rrf_mode_skips_client_fusion(self):
+        service = self.make_service()
+        service._embedder = _StubEmbedder()
+        service._es_search = _StubHybridSearch()
+
+        result = service.search(query_original="hola", query_en="hello", top_k=3)
+
+        self.assertEqual(len(service._es_search.hybrid_calls), 1)
+        self.assertEqual(service._es_search.calls, [])
+        plan, top_k, _ = service._es_search.hybrid_calls[0]
+        self.assertEqual(top_k, 3)
+        self.assertEqual(sorted(query.branch for query in plan), ["bm25", "bm25", "dense", "dense"])
+        self.assertEqual([item["chunk_id"] for item in result["results"]], ["h1::chunk::0"])
+
+    def test_es_rrf_failure_uses_client_fusion(self):
+        service = self.make_service()
+        service._embedder = _StubEmbedder()
+        service._es_search = _StubHybridSearch(fail=True)
+
+        result = service.search(query_original="hola", top_k=3)
+        service.search(query_original="adios", top_k=3)
+
+        self.assertEqual(len(service._es_search.calls), 2)
+        self.assertEqual(len(result["results"]), 2)
+        # A transient failure keeps trying the server-side path.
+        self.assertEqual(len(service._es_search.hybrid_calls), 2)
+        self.assertTrue(service.server_hybrid_status()["enabled"])
+
+    def test_rejected_es_rrf_request_disables_server_hybrid_until_restart(self):
+        service = self.make_service()
+        service._embedder = _StubEmbedder()
+        service._es_search = _StubHybridSearch(error=_BadRequest("unknown retriever [rrf]"))
+
+        with self.assertLogs("retrieval-service", level="WARNING") as logs:
+            service.search(query_original="hola", top_k=3)
+            service.search(query_original="adios", top_k=3)
+
+        self.assertEqual(len(service._es_search.hybrid_calls), 1)
+        self.assertEqual(len(service._es_search.calls), 2)
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(
+            service.server_hybrid_status(),
+            {"enabled": False, "disabled_reason": "unknown retriever [rrf]"},
+        )
+
+
+class ResponseCacheTests(RetrievalServiceTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            settings,
+            retrieval_dense_enabled=False,
+            retrieval_corrective_rag_enabled=False,
+            retrieval_log_timing=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _service(self) -> RetrievalService:
+        service = self.make_service()
+        service._pipeline_single = _SlowPipeline("bm25", 0.0, {"tiles": [_doc("d1::chunk::0", 1.0)]})
+        return service
+
+    def test_identical_requests_hit_cache(self):
+        service = self._service()
+
+        first = service.search(query_original="tiles", top_k=3)
+        second = service.search(query_original=" tiles", query_en="tiles", top_k=3)
+
+        self.assertEqual(len(service._pipeline_single.calls), 1)
+        self.assertFalse(first["meta"]["cache"]["hit"])
+        self.assertTrue(second["meta"]["cache"]["hit"])
+        self.assertEqual(second["results"], first["results"])
+
+    def test_cached_results_are_isolated_from_caller_mutation(self):
+        service = self._service()
+
+        first = service.search(query_original="tiles")
+        first["results"][0]["title"] = "mutated"
+        second = service.search(query_original="tiles")
+
+        self.assertEqual(second["results"][0]["title"], "d1::chunk::0")
+
+    def test_index_generation_bump_invalidates(self):
+        service = self._service()
+
+        service.search(query_original="tiles")
+        service._bump_index_generation()
+        result = service.search(query_original="tiles")
+
+        self.assertEqual(len(service._pipeline_single.calls), 2)
+        self.assertEqual(result["meta"]["cache"], {"hit": False, "generation": 1})
+
+    def test_different_top_k_is_a_different_entry(self):
+        service = self._service()
+
+        service.search(query_original="tiles", top_k=3)
+        asyncio.run(service.search_async(query_original="tiles", top_k=4))
+
+        self.assertEqual(len(service._pipeline_single.calls), 2)
+
+
+class _StubWorkflow:
+    def __init__(self, corrective_meta=None, error=None):
+        self.corrective_meta = corrective_meta
+        self.error = error
+        self.calls = 0
+
+    def run(self, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return {
+            "results": [{"chunk_id": "c1", "snippet": kwargs["query_en"]}],
+            "used_queries": [kwargs["query_en"]],
+            "index_name": kwargs["index_name"],
+            "meta": {"corrective_rag": dict(self.corrective_meta)},
+        }
+
+    def close(self):
+        return None
+
+
+class CorrectiveResponseCacheTests(RetrievalServiceTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            settings,
+            retrieval_dense_enabled=False,
+            retrieval_corrective_rag_enabled=True,
+            retrieval_log_timing=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _search_twice(self, workflow):
+        service = self.make_service()
+        service._corrective_workflow = workflow
+        service._pipeline_single = _SlowPipeline("bm25", 0.0, {"tiles": [_doc("d1::chunk::0", 1.0)]})
+        first = service.search(query_original="tiles")
+        second = service.search(query_original="tiles")
+        return first, second
+
+    def test_ok_corrective_response_is_cached(self):
+        workflow = _StubWorkflow({"status": "ok", "degraded": False})
+
+        _first, second = self._search_twice(workflow)
+
+        self.assertEqual(workflow.calls, 1)
+        self.assertTrue(second["meta"]["cache"]["hit"])
+
+    def test_degraded_corrective_responses_are_not_cached(self):
+        for corrective_meta in (
+            {"status": "fallback", "degraded": False},
+            {"status": "failed", "degraded": False},
+            {"status": "ok", "degraded": True},
+        ):
+            with self.subTest(corrective_meta=corrective_meta):
+                workflow = _StubWorkflow(corrective_meta)
+
+                _first, second = self._search_twice(workflow)
+
+                self.assertEqual(workflow.calls, 2)
+                self.assertFalse(second["meta"]["cache"]["hit"])
+
+    def test_workflow_error_falls_back_uncached(self):
+        workflow = _StubWorkflow(error=RuntimeError("graph broke"))
+
+        with self.assertLogs("retrieval-service", level="WARNING"):
+            first, second = self._search_twice(workflow)
+
+        self.assertEqual(workflow.calls, 2)
+        self.assertEqual(first["meta"]["corrective_rag"]["status"], "error")
+        self.assertEqual([item["chunk_id"] for item in second["results"]], ["d1::chunk::0"])
+        self.assertFalse(second["meta"]["cache"]["hit"])
+
+
+class BatchSearchTests(RetrievalServiceTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            settings,
+            retrieval_dense_enabled=True,
+            retrieval_corrective_rag_enabled=False,
+            retrieval_log_timing=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _service(self, fail: bool = False) -> RetrievalService:
+        service = self.make_service()
+        service._embedder = _StubEmbedder()
+        service._es_search = _StubMultiSearch(fail=fail)
+        return service
+
+    def test_batch_shares_one_embedding_pass_and_one_msearch(self):
+        service = self._service()
+
+        responses = service.search_batch(
+            [
+                {"query_original": "hola", "query_en": "hello", "top_k": 4},
+                {"query_original": "adios", "language": "es", "top_k": 2},
+            ]
+        )
+
+        self.assertEqual(service._embedder.batches, [["hola", "hello", "adios"]])
+        self.assertEqual(len(service._es_search.calls), 1)
+        self.assertEqual(
+            [(query.branch, query.query) for query in service._es_search.calls[0]],
+            [
+                ("bm25", "hola"),
+                ("bm25", "hello"),
+                ("dense", "hola"),
+                ("dense", "hello"),
+                ("bm25", "adios"),
+                ("dense", "adios"),
+            ],
+        )
+        self.assertEqual(
+            sorted(item["chunk_id"] for item in responses[0]["results"]),
+            ["b-hello::chunk::0", "b-hola::chunk::0", "v-hello::chunk::0", "v-hola::chunk::0"],
+        )
+        self.assertEqual(
+            sorted(item["chunk_id"] for item in responses[1]["results"]),
+            ["b-adios::chunk::0", "v-adios::chunk::0"],
+        )
+
+    def test_batch_matches_single_searches_and_serves_cache_hits(self):
+        service = self._service()
+        single = service.search(query_original="tiles", top_k=3)
+
+        responses = service.search_batch(
+            [{"query_original": "mosaic", "top_k": 3}, {"query_original": "tiles", "top_k": 3}]
+        )
+
+        self.assertTrue(responses[1]["meta"]["cache"]["hit"])
+        self.assertEqual(responses[1]["results"], single["results"])
+        self.assertEqual([query.query for query in service._es_search.calls[1]], ["mosaic", "mosaic"])
+        again = service.search(query_original="mosaic", top_k=3)
+        self.assertTrue(again["meta"]["cache"]["hit"])
+        self.assertEqual(again["results"], responses[0]["results"])
+
+    def test_msearch_failure_searches_each_request(self):
+        service = self._service(fail=True)
+        service._pipeline_single = _SlowPipeline("bm25", 0.0, {"tiles": [_doc("d1::chunk::0", 1.0)]})
+        service._pipeline_dense_single = _SlowPipeline("dense", 0.0, {})
+
+        responses = asyncio.run(
+            service.search_batch_async([{"query_original": "tiles"}, {"query_original": "mosaic"}])
+        )
+
+        self.assertEqual([item["chunk_id"] for item in responses[0]["results"]], ["d1::chunk::0"])
+        self.assertEqual(responses[1]["results"], [])
+        self.assertEqual(service._pipeline_single.calls, ["tiles", "mosaic"])
+
+
+class _StubDocumentEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, docs):
+        self.calls += 1
+        for doc in docs:
+            doc.embedding = [float(len(doc.content))]
+        return docs
+
+
+class _BrokenPool:
+    def __init__(self):
+        self.closed = False
+
+    def embed_documents(self, docs):
+        raise BrokenProcessPool("worker died")
+
+    def close(self, wait=False):
+        self.closed = True
+
+
+class _RejectingIndices:
+    def exists_alias(self, name):
+        return True
+
+    def get_alias(self, name):
+        return {"tinge__2026": {"aliases": {name: {}}}}
+
+    def delete(self, index):
+        raise PermissionError("action [indices:admin/delete] is unauthorized")
+
+
+class IndexResetTests(RetrievalServiceTestCase):
+    def test_failed_reset_raises_instead_of_indexing_over_stale_docs(self):
+        service = self.make_service()
+        service._es_search = SimpleNamespace(client=SimpleNamespace(indices=_RejectingIndices()))
+        service._init_haystack = mock.Mock()
+
+        with self.assertRaisesRegex(RuntimeError, "Could not reset index"):
+            service._reset_index_hard()
+
+        service._init_haystack.assert_not_called()
+
+
+def _encode_in_worker(texts):
+    return os.getpid(), [[float(len(text))] for text in texts], 0.0
+
+
+class IndexEmbeddingTests(RetrievalServiceTestCase):
+    def test_embedding_workers_exit_when_indexing_returns(self):
+        pools = []
+
+        def start_pool(**kwargs):
+            executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork"))
+            pools.append(ProcessPoolDocumentEmbedder(executor=executor, encode_fn=_encode_in_worker, **kwargs))
+            return pools[-1]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = Path(tmp) / "corpus.jsonl"
+            corpus.write_text(json.dumps({"id": "tiles", "title": "Panot", "content": "Panot tiles."}), encoding="utf-8")
+            with mock.patch.multiple(
+                settings,
+                retrieval_backend="memory",
+                default_corpus_path=str(corpus),
+                retrieval_dense_enabled=True,
+                retrieval_write_embeddings=True,
+                retrieval_embed_workers=1,
+                retrieval_embed_store_path="",
+                retrieval_corrective_rag_enabled=False,
+                retrieval_log_timing=False,
+            ), mock.patch("app.search.ProcessPoolDocumentEmbedder", side_effect=start_pool):
+                with self.assertLogs("retrieval-service", level="WARNING"):
+                    service = self.make_service()
+                service._embedder = _StubDocumentEmbedder()
+                service.index_corpus()
+                service.index_corpus()
+
+        self.assertIsNone(service._embedding_pool)
+        self.assertEqual(len(pools), 2)
+        for pool in pools:
+            [worker] = pool.stats()
+            with self.assertRaises(ProcessLookupError):
+                os.kill(worker["worker"], 0)
+
+    def test_broken_worker_pool_is_dropped_and_batch_embedded_in_process(self):
+        patcher = mock.patch.multiple(
+            settings,
+            retrieval_dense_enabled=True,
+            retrieval_write_embeddings=True,
+            retrieval_embed_workers=2,
+            retrieval_embed_store_path="",
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        service = self.make_service()
+        service._embedder = _StubDocumentEmbedder()
+        pool = _BrokenPool()
+        service._embedding_pool = pool
+
+        with self.assertLogs("retrieval-service", level="WARNING"):
+            docs = service._maybe_embed_documents([_Doc(content="panot"), _Doc(content="mosaic")])
+
+        self.assertEqual([doc.embedding for doc in docs], [[5.0], [6.0]])
+        self.assertEqual(service._embedder.calls, 1)
+        self.assertTrue(pool.closed)
+        self.assertIsNone(service._embedding_pool)
+
+    def test_unembedded_docs_get_a_bm25_only_fingerprint(self):
+        chunks = [
+            {"chunk_id": "a::chunk::0", "content": "panot tiles"},
+            {"chunk_id": "b::chunk::0", "content": "mosaic"},
+        ]
+        embedded_hash = chunk_fingerprint(chunks[0], chunk_size=100, chunk_overlap=10, embed_model="m")
+        docs = [
+            _Doc(content="panot tiles", meta={"chunk_id": "a::chunk::0", "content_hash": embedded_hash}, embedding=[0.1]),
+            _Doc(content="mosaic", meta={"chunk_id": "b::chunk::0", "content_hash": "stale"}),
+        ]
+
+        RetrievalService._mark_unembedded(docs, chunks, chunk_size=100, chunk_overlap=10)
+
+        self.assertEqual(docs[0].meta["content_hash"], embedded_hash)
+        self.assertEqual(docs[1].meta["content_hash"], chunk_fingerprint(chunks[1], chunk_size=100, chunk_overlap=10))
+        self.assertNotEqual(
+            docs[1].meta["content_hash"],
+            chunk_fingerprint(chunks[1], chunk_size=100, chunk_overlap=10, embed_model="m"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,8 @@ class SettingsTests(unittest.TestCase):
         self.assertFalse(settings.retrieval_corrective_rag_enabled)
         self.assertEqual(settings.retrieval_corrective_max_attempts, 2)
         self.assertEqual(settings.retrieval_corrective_budget_ms, 3000)
+        # Indexes built before stored snippets existed must keep returning snippets.
+        self.assertEqual(settings.retrieval_snippet_mode, "content")
 
     def test_dense_flag_parsing(self):
         original = os.environ.get("RETRIEVAL_DENSE_ENABLED")